@@ -3,17 +3,95 @@ Simple HTTP API server for GitHub Actions automation endpoints.
 Runs separately from the MCP server.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+import asyncio
 import datetime
-import json
+import functools
+import logging
+import logging.handlers
 import os
+import queue
+import orjson
+
+from config import API_WORKERS
 
 # Import des fonctions Odoo
 from services.odoo_client import get_odoo_connection
+from services import report_jobs
+from services.cache import TTLCache
 from tools.data import odoo_execute
+from tools.activity_report import (
+    odoo_activity_report,
+    prefetch_activity_reports_bulk,
+    generate_user_activity_report
+)
+from tools.business_report import odoo_business_report
+from automation_config import (
+    ACTIVITY_USER_IDS,
+    ACTIVITY_PROJECT_IDS,
+    ACTIVITY_TASK_COLUMN_IDS,
+    BUSINESS_USER_IDS,
+    BUSINESS_PROJECT_IDS,
+    BUSINESS_TASK_COLUMN_IDS
+)
+
+# Batch logger: records go through a queue and are written to stderr by a
+# listener thread, so report workers never block on console I/O
+logger = logging.getLogger("automation")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue = queue.Queue(-1)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _log_listener.start()
+    # Resume report jobs left pending by a previous run (restart mid-batch)
+    app.state.resume_tasks = [
+        asyncio.create_task(generate_all_activity_reports()),
+        asyncio.create_task(generate_all_business_reports())
+    ]
+    yield
+    # Stop the resume tasks still running: they put their claimed jobs back to pending
+    for task in app.state.resume_tasks:
+        task.cancel()
+    await asyncio.gather(*app.state.resume_tasks, return_exceptions=True)
+    _log_listener.stop()
+
+
+app = FastAPI(
+    title="Odoo MCP Automation API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Maximum number of reports generated at the same time in a batch.
+# Each report mostly waits on Odoo RPC round-trips, so they overlap well.
+REPORT_CONCURRENCY = 8
+
+# Short-lived cache of test endpoint responses
+REPORT_CACHE_TTL = 60
+REPORT_CACHE_MAXSIZE = 64
+_report_cache = TTLCache(REPORT_CACHE_TTL, REPORT_CACHE_MAXSIZE)
+
+
+@functools.lru_cache(maxsize=4)
+def _last_week_range(ordinal: int) -> tuple[str, str]:
+    """
+    Return (start_date, end_date) of the week before the given day, Monday to Sunday.
+    Keyed on date.toordinal() so the result is computed once per day.
+    """
+    today = datetime.date.fromordinal(ordinal)
+    last_monday = today - datetime.timedelta(days=today.weekday() + 7)
+    last_sunday = last_monday + datetime.timedelta(days=6)
+    return last_monday.isoformat(), last_sunday.isoformat()
 
-app = FastAPI(title="Odoo MCP Automation API")
 
 @app.get("/")
 async def root():
@@ -40,7 +118,7 @@ async def test_automation():
             args=[task_data]
         )
 
-        response_data = json.loads(result)
+        response_data = orjson.loads(result)
         if response_data.get('status') == 'success':
             return {
                 "status": "success",
@@ -52,7 +130,7 @@ async def test_automation():
             raise Exception(f"Task creation failed: {response_data.get('error')}")
 
     except Exception as e:
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "error",
             "message": str(e)
         }, status_code=500)
@@ -62,14 +140,13 @@ async def test_activity_report():
     """Test activity report generation for user 7"""
     try:
         # Calculer la semaine précédente
-        today = datetime.date.today()
-        last_monday = today - datetime.timedelta(days=today.weekday() + 7)
-        last_sunday = last_monday + datetime.timedelta(days=6)
-        start_date = last_monday.isoformat()
-        end_date = last_sunday.isoformat()
+        start_date, end_date = _last_week_range(datetime.date.today().toordinal())
 
-        # Importer la fonction activity_report
-        from tools.activity_report import odoo_activity_report
+        # Réponse récente pour la même période : ne pas régénérer (ni recréer la tâche)
+        cache_key = ("activity", start_date, end_date, 7)
+        cached = _report_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         # Générer le rapport
         result = odoo_activity_report(
@@ -80,125 +157,240 @@ async def test_activity_report():
             task_column_id=726
         )
 
-        return json.loads(result)
+        response = orjson.loads(result)
+        if response.get("status") == "success":
+            _report_cache.set(cache_key, response)
+        return response
 
     except Exception as e:
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "error",
             "message": str(e)
         }, status_code=500)
 
 
-def generate_all_activity_reports(start_date: str, end_date: str):
+async def _claim_jobs(kind: str, claimed: set):
     """
-    Background task: Generate activity reports for all users in automation_config.
-    This runs asynchronously to avoid HTTP timeouts.
+    Atomically claim the pending jobs of a kind, skipping those taken by another worker.
+    The IDs of the claimed jobs are also added to claimed as soon as they are taken.
     """
-    from automation_config import ACTIVITY_REPORTS
-    from tools.activity_report import odoo_activity_report
+    jobs = await asyncio.to_thread(report_jobs.pending_jobs, kind)
+    taken = []
+    for job_id, payload in jobs:
+        if await asyncio.to_thread(report_jobs.claim_job, job_id):
+            claimed.add(job_id)
+            taken.append((job_id, payload))
+    return taken
 
-    print(f"[INFO] Starting generation of {len(ACTIVITY_REPORTS)} activity reports...")
-    print(f"[INFO] Period: {start_date} to {end_date}")
 
+async def _wait_for_retries(kind: str) -> bool:
+    """
+    Wait until the next failed job of a kind is due for its retry.
+
+    Returns:
+        False if no job of that kind is pending any more
+    """
+    delay = await asyncio.to_thread(report_jobs.next_retry_delay, kind)
+    if delay is None:
+        return False
+    logger.info("Next %s report retry in %.0f s", kind, delay)
+    await asyncio.sleep(delay)
+    return True
+
+
+async def _finish_job(job_id: int, result_data, label: str) -> bool:
+    """Record the outcome of a report job in the journal; returns True on success"""
+    if isinstance(result_data, Exception):
+        error = f"Exception: {str(result_data)}"
+    elif result_data.get("status") == "success":
+        await asyncio.to_thread(report_jobs.complete_job, job_id)
+        logger.info("Report generated for %s, task_id=%s", label, result_data.get('task_id'))
+        return True
+    else:
+        error = result_data.get("message")
+
+    will_retry = await asyncio.to_thread(report_jobs.fail_job, job_id, error)
+    logger.error("Failed for %s: %s%s", label, error, " (will retry)" if will_retry else "")
+    return False
+
+
+async def generate_all_activity_reports():
+    """
+    Background task: process the pending activity report jobs.
+    This runs asynchronously to avoid HTTP timeouts.
+    Reports are generated concurrently (up to REPORT_CONCURRENCY at a time);
+    failed jobs are retried with exponential backoff until report_jobs.MAX_ATTEMPTS.
+    """
+    await asyncio.to_thread(report_jobs.requeue_stale_jobs)
+    semaphore = asyncio.Semaphore(REPORT_CONCURRENCY)
     successful = 0
     failed = 0
 
-    for config in ACTIVITY_REPORTS:
-        try:
-            print(f"[INFO] Generating report for user_id={config['user_id']}...")
+    async def generate_one(payload, prefetched):
+        user_data = prefetched.get(payload["user_id"])
+        if user_data is None:
+            return {
+                "status": "error",
+                "message": f"User with ID {payload['user_id']} not found"
+            }
 
-            result = odoo_activity_report(
-                user_id=config["user_id"],
-                start_date=start_date,
-                end_date=end_date,
-                project_id=config["project_id"],
-                task_column_id=config["task_column_id"]
+        async with semaphore:
+            logger.info("Generating report for user_id=%s...", payload["user_id"])
+            return await asyncio.to_thread(
+                generate_user_activity_report,
+                user_id=payload["user_id"],
+                user_name=user_data["user_name"],
+                start_date=payload["start_date"],
+                end_date=payload["end_date"],
+                project_id=payload["project_id"],
+                task_column_id=payload["task_column_id"],
+                partner_id=user_data["partner_id"],
+                timeline_sources=user_data["timeline_sources"]
             )
 
-            result_data = json.loads(result)
-            if result_data.get("status") == "success":
-                successful += 1
-                print(f"[SUCCESS] Report generated for user_id={config['user_id']}, task_id={result_data.get('task_id')}")
-            else:
-                failed += 1
-                print(f"[ERROR] Failed for user_id={config['user_id']}: {result_data.get('message')}")
-
-        except Exception as e:
-            failed += 1
-            print(f"[ERROR] Exception for user_id={config['user_id']}: {str(e)}")
-
-    print(f"[INFO] Activity reports batch complete: {successful} successful, {failed} failed out of {len(ACTIVITY_REPORTS)} total")
-
-def generate_all_business_reports(start_date: str, end_date: str):
+    claimed = set()
+    try:
+        while True:
+            jobs = await _claim_jobs("activity", claimed)
+            if not jobs:
+                if await _wait_for_retries("activity"):
+                    continue
+                break
+            logger.info("Starting generation of %d activity reports...", len(jobs))
+
+            # Jobs of the same period share one bulk prefetch
+            periods = {}
+            for job_id, payload in jobs:
+                periods.setdefault((payload["start_date"], payload["end_date"]), []).append((job_id, payload))
+
+            for (start_date, end_date), period_jobs in periods.items():
+                logger.info("Period: %s to %s", start_date, end_date)
+
+                # Fetch users and their timeline sources for the whole period in one go
+                # instead of re-querying res.users / mail.message / mail.activity per user
+                try:
+                    prefetched = await asyncio.to_thread(
+                        prefetch_activity_reports_bulk,
+                        [payload["user_id"] for _, payload in period_jobs],
+                        start_date,
+                        end_date
+                    )
+                    results = await asyncio.gather(
+                        *[generate_one(payload, prefetched) for _, payload in period_jobs],
+                        return_exceptions=True
+                    )
+                except Exception as e:
+                    results = [e] * len(period_jobs)
+
+                for (job_id, payload), result_data in zip(period_jobs, results):
+                    # generate_user_activity_report returns a dict, no JSON round-trip needed
+                    if await _finish_job(job_id, result_data, f"user_id={payload['user_id']}"):
+                        successful += 1
+                    else:
+                        failed += 1
+                    claimed.discard(job_id)
+    except asyncio.CancelledError:
+        # Shutdown: hand the unfinished jobs back to the next run instead of
+        # leaving them 'running' until report_jobs.STALE_AFTER
+        report_jobs.release_jobs(list(claimed))
+        raise
+
+    logger.info("Activity reports batch complete: %d successful, %d failed attempts", successful, failed)
+
+
+async def generate_all_business_reports():
     """
-    Background task: Generate business reports for all teams in automation_config.
+    Background task: process the pending business report jobs.
     This runs asynchronously to avoid HTTP timeouts.
+    Reports are generated concurrently (up to REPORT_CONCURRENCY at a time);
+    failed jobs are retried with exponential backoff until report_jobs.MAX_ATTEMPTS.
     """
-    from automation_config import BUSINESS_REPORTS
-    from tools.business_report import odoo_business_report
-
-    print(f"[INFO] Starting generation of {len(BUSINESS_REPORTS)} business reports...")
-    print(f"[INFO] Period: {start_date} to {end_date}")
-
+    await asyncio.to_thread(report_jobs.requeue_stale_jobs)
+    semaphore = asyncio.Semaphore(REPORT_CONCURRENCY)
     successful = 0
     failed = 0
 
-    for idx, config in enumerate(BUSINESS_REPORTS, 1):
-        try:
-            user_ids = config["user_ids"]
-            print(f"[INFO] Generating business report {idx}/{len(BUSINESS_REPORTS)} for user_ids={user_ids}...")
-
-            result = odoo_business_report(
-                user_ids=user_ids,
-                start_date=start_date,
-                end_date=end_date,
-                project_id=config["project_id"],
-                task_column_id=config["task_column_id"]
+    async def generate_one(payload):
+        async with semaphore:
+            logger.info("Generating business report for user_ids=%s (%s to %s)...",
+                        payload["user_ids"], payload["start_date"], payload["end_date"])
+            result = await asyncio.to_thread(
+                odoo_business_report,
+                user_ids=payload["user_ids"],
+                start_date=payload["start_date"],
+                end_date=payload["end_date"],
+                project_id=payload["project_id"],
+                task_column_id=payload["task_column_id"]
+            )
+            return orjson.loads(result)
+
+    claimed = set()
+    try:
+        while True:
+            jobs = await _claim_jobs("business", claimed)
+            if not jobs:
+                if await _wait_for_retries("business"):
+                    continue
+                break
+            logger.info("Starting generation of %d business reports...", len(jobs))
+
+            results = await asyncio.gather(
+                *[generate_one(payload) for _, payload in jobs],
+                return_exceptions=True
             )
 
-            result_data = json.loads(result)
-            if result_data.get("status") == "success":
-                successful += 1
-                print(f"[SUCCESS] Business report generated for user_ids={user_ids}, task_id={result_data.get('task_id')}")
-            else:
-                failed += 1
-                print(f"[ERROR] Failed for user_ids={user_ids}: {result_data.get('message')}")
+            for (job_id, payload), result_data in zip(jobs, results):
+                if await _finish_job(job_id, result_data, f"user_ids={payload['user_ids']}"):
+                    successful += 1
+                else:
+                    failed += 1
+                claimed.discard(job_id)
+    except asyncio.CancelledError:
+        # Shutdown: hand the unfinished jobs back to the next run instead of
+        # leaving them 'running' until report_jobs.STALE_AFTER
+        report_jobs.release_jobs(list(claimed))
+        raise
 
-        except Exception as e:
-            failed += 1
-            print(f"[ERROR] Exception for user_ids={user_ids}: {str(e)}")
+    logger.info("Business reports batch complete: %d successful, %d failed attempts", successful, failed)
 
-    print(f"[INFO] Business reports batch complete: {successful} successful, {failed} failed out of {len(BUSINESS_REPORTS)} total")
 
 @app.get("/generate_weekly_activity_reports")
 async def generate_weekly_activity_reports(background_tasks: BackgroundTasks):
     """
     Generate weekly activity reports for all users defined in automation_config.
-    Reports are generated asynchronously in the background to avoid timeouts.
+    One job per user is recorded in the report journal, then processed in the
+    background to avoid timeouts (jobs left pending resume at the next startup).
     """
     try:
-        from automation_config import ACTIVITY_REPORTS
-
         # Calculate last week (Monday to Sunday)
-        today = datetime.date.today()
-        last_monday = today - datetime.timedelta(days=today.weekday() + 7)
-        last_sunday = last_monday + datetime.timedelta(days=6)
-        start_date = last_monday.isoformat()
-        end_date = last_sunday.isoformat()
+        start_date, end_date = _last_week_range(datetime.date.today().toordinal())
+
+        queued = await asyncio.to_thread(report_jobs.enqueue_jobs, "activity", [
+            {
+                "user_id": user_id,
+                "project_id": project_id,
+                "task_column_id": task_column_id,
+                "start_date": start_date,
+                "end_date": end_date
+            }
+            for user_id, project_id, task_column_id
+            in zip(ACTIVITY_USER_IDS, ACTIVITY_PROJECT_IDS, ACTIVITY_TASK_COLUMN_IDS)
+        ])
 
-        # Launch background task
-        background_tasks.add_task(generate_all_activity_reports, start_date, end_date)
+        # Launch background task (coroutine, awaited by Starlette after the response)
+        background_tasks.add_task(generate_all_activity_reports)
 
         return {
             "status": "success",
             "message": "Activity reports generation started in background",
             "period": f"{start_date} to {end_date}",
-            "total_users": len(ACTIVITY_REPORTS),
+            "total_users": len(ACTIVITY_USER_IDS),
+            "queued_jobs": queued,
             "note": "Reports are being generated asynchronously. Check Odoo project 151 for results."
         }
 
     except Exception as e:
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "error",
             "message": str(e)
         }, status_code=500)
@@ -207,31 +399,39 @@ async def generate_weekly_activity_reports(background_tasks: BackgroundTasks):
 async def auto_business_reports(background_tasks: BackgroundTasks):
     """
     Generate weekly business reports for all teams defined in automation_config.
-    Reports are generated asynchronously in the background to avoid timeouts.
+    One job per team is recorded in the report journal, then processed in the
+    background to avoid timeouts (jobs left pending resume at the next startup).
     """
     try:
-        from automation_config import BUSINESS_REPORTS
-
         # Calculate last week (Monday to Sunday)
-        today = datetime.date.today()
-        last_monday = today - datetime.timedelta(days=today.weekday() + 7)
-        last_sunday = last_monday + datetime.timedelta(days=6)
-        start_date = last_monday.isoformat()
-        end_date = last_sunday.isoformat()
+        start_date, end_date = _last_week_range(datetime.date.today().toordinal())
+
+        queued = await asyncio.to_thread(report_jobs.enqueue_jobs, "business", [
+            {
+                "user_ids": list(user_ids),
+                "project_id": project_id,
+                "task_column_id": task_column_id,
+                "start_date": start_date,
+                "end_date": end_date
+            }
+            for user_ids, project_id, task_column_id
+            in zip(BUSINESS_USER_IDS, BUSINESS_PROJECT_IDS, BUSINESS_TASK_COLUMN_IDS)
+        ])
 
-        # Launch background task
-        background_tasks.add_task(generate_all_business_reports, start_date, end_date)
+        # Launch background task (coroutine, awaited by Starlette after the response)
+        background_tasks.add_task(generate_all_business_reports)
 
         return {
             "status": "success",
             "message": "Business reports generation started in background",
             "period": f"{start_date} to {end_date}",
-            "total_reports": len(BUSINESS_REPORTS),
+            "total_reports": len(BUSINESS_USER_IDS),
+            "queued_jobs": queued,
             "note": "Reports are being generated asynchronously. Check respective Odoo projects for results."
         }
 
     except Exception as e:
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "error",
             "message": str(e)
         }, status_code=500)
@@ -241,4 +441,7 @@ if __name__ == "__main__":
     # Railway sets PORT env variable automatically
     # Use PORT for Railway, fallback to 8002 for local dev
     port = int(os.getenv("PORT", 8002))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Several worker processes so CPU-bound PDF rendering does not block other requests.
+    # A batch is processed by the worker that received the trigger request; the
+    # report journal's atomic claims keep workers resuming at startup from overlapping.
+    uvicorn.run("api_server:app", host="0.0.0.0", port=port, workers=API_WORKERS)
@@ -60,3 +60,13 @@ BUSINESS_REPORTS = [
     # À configurer selon tes binômes commerciaux
     # Exemple: {"user_ids": [9, 862], "project_id": 151, "task_column_id": 756},  # Cameron + Corentin
 ]
+
+# Vues en colonnes des listes ci-dessus (dérivées automatiquement, ne pas modifier)
+# Utilisées par les batchs pour éviter de relire chaque dict à chaque itération
+ACTIVITY_USER_IDS = tuple(config["user_id"] for config in ACTIVITY_REPORTS)
+ACTIVITY_PROJECT_IDS = tuple(config["project_id"] for config in ACTIVITY_REPORTS)
+ACTIVITY_TASK_COLUMN_IDS = tuple(config["task_column_id"] for config in ACTIVITY_REPORTS)
+
+BUSINESS_USER_IDS = tuple(tuple(config["user_ids"]) for config in BUSINESS_REPORTS)
+BUSINESS_PROJECT_IDS = tuple(config["project_id"] for config in BUSINESS_REPORTS)
+BUSINESS_TASK_COLUMN_IDS = tuple(config["task_column_id"] for config in BUSINESS_REPORTS)
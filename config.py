@@ -15,19 +15,29 @@ ODOO_DB = os.getenv('ODOO_DB')
 ODOO_USER = os.getenv('ODOO_USER')
 ODOO_PASSWORD = os.getenv('ODOO_PASSWORD')
 
+# Odoo RPC protocol: 'xmlrpc' (default) or 'jsonrpc' (lighter payloads for large search_read results)
+ODOO_PROTOCOL = os.getenv('ODOO_PROTOCOL', 'xmlrpc').lower()
+
 # Anthropic API configuration
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
 
 # Connection timeout in seconds
 TIMEOUT = 30
 
+# SQLite journal of the weekly report jobs (use a persistent volume in production)
+REPORT_JOBS_DB = os.getenv('REPORT_JOBS_DB', 'report_jobs.sqlite3')
+
+# uvicorn worker processes of the automation API server
+API_WORKERS = int(os.getenv('API_WORKERS', min(4, os.cpu_count() or 1)))
+
 # Security blacklist - operations that should never be allowed
-SECURITY_BLACKLIST = {
+# Immutable: checked on every odoo_execute call, before any other work
+SECURITY_BLACKLIST: frozenset[tuple[str, str]] = frozenset({
     ('res.users', 'unlink'),  # Never delete users
     ('ir.model', 'unlink'),   # Never delete models
     ('ir.model.fields', 'unlink'),  # Never delete fields
     ('ir.module.module', 'button_immediate_uninstall'),  # Never uninstall modules
-}
+})
 
 # Mapping des subtypes mail.message vers actions francaises
 # Ce mapping permet de traduire les subtypes Odoo en actions comprehensibles
@@ -57,6 +67,16 @@ SUBTYPE_MAPPING = {
     7: "Facture creee",
 }
 
+# Meme mapping sous forme de table indexee par subtype id (lookup par index, sans hash)
+_SUBTYPE_ARRAY = [SUBTYPE_MAPPING.get(i) for i in range(max(SUBTYPE_MAPPING) + 1)]
+
+
+def translate_subtype(subtype_id: int):
+    """Return the label mapped to a mail.message subtype id, or None if unmapped"""
+    if 0 <= subtype_id < len(_SUBTYPE_ARRAY):
+        return _SUBTYPE_ARRAY[subtype_id]
+    return None
+
 # Hard-coded IDs - update if CRM stages or categories change
 STAGE_IDS = {
     "rdv_degustation": 2,
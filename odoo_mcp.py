@@ -8,23 +8,32 @@ This is the refactored lightweight entry point that imports and initializes all
 from mcp.server.fastmcp import FastMCP
 from config import PORT
 
-# Import tool modules (they will register themselves)
-import tools.discovery
-import tools.data
-import tools.business_report
-import tools.activity_report
+
+def init_mcp_tools(mcp_instance):
+    """
+    Import the tool modules and register their tools on the given server.
+
+    Imports are done here rather than at module level so that importing this
+    module (e.g. from odoo_mcp_stdio) does not load the whole tool graph.
+    """
+    import tools.discovery
+    import tools.data
+    import tools.business_report
+    import tools.activity_report
+
+    tools.discovery.init_mcp(mcp_instance)
+    tools.data.init_mcp(mcp_instance)
+    tools.business_report.init_mcp(mcp_instance)
+    tools.activity_report.init_mcp(mcp_instance)
 
 
 # Initialize FastMCP server with host and port
 mcp = FastMCP("odoo-mcp", host="0.0.0.0", port=PORT)
 
-# Initialize all tool modules by passing them the mcp instance
-tools.discovery.init_mcp(mcp)
-tools.data.init_mcp(mcp)
-tools.business_report.init_mcp(mcp)
-tools.activity_report.init_mcp(mcp)
-
 
 if __name__ == "__main__":
+    # Initialize all tool modules by passing them the mcp instance
+    init_mcp_tools(mcp)
+
     # Run the server
     mcp.run(transport="sse")
@@ -1,16 +1,9 @@
 from mcp.server.fastmcp import FastMCP
 
-import tools.discovery
-import tools.data
-import tools.business_report
-import tools.activity_report
+from odoo_mcp import init_mcp_tools
 
 mcp = FastMCP("odoo-mcp")
 
-tools.discovery.init_mcp(mcp)
-tools.data.init_mcp(mcp)
-tools.business_report.init_mcp(mcp)
-tools.activity_report.init_mcp(mcp)
-
 if __name__ == "__main__":
+    init_mcp_tools(mcp)
     mcp.run(transport="stdio")  # stdio pour Claude Desktop
@@ -0,0 +1,52 @@
+"""
+Cache module.
+
+Small in-memory cache with expiring entries, shared by the API server and the
+tools instead of a hand-rolled {key: (expires_at, value)} dict in each module.
+"""
+
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Thread-safe dict cache whose entries expire ttl seconds after being set.
+
+    When maxsize is reached, the oldest entry (insertion order) is evicted.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}  # {key: (expires_at, value)}, ordre d'insertion = ancienneté
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return default
+            return entry[1]
+
+    def set(self, key, value):
+        """Cache a value for ttl seconds, evicting the oldest entry when full"""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.maxsize is not None and len(self._entries) >= self.maxsize:
+                self._entries.pop(next(iter(self._entries)), None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key):
+        """Forget the entry of key, if any"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Forget every entry"""
+        with self._lock:
+            self._entries.clear()
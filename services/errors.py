@@ -0,0 +1,27 @@
+"""
+Errors module.
+
+Error handling helpers shared by the report tools.
+"""
+
+import functools
+
+
+def wrap_errors(label: str):
+    """
+    Decorator re-raising any exception of the decorated function as
+    Exception(f"Error {label}: ..."), chained to the original one so that its
+    traceback is kept.
+
+    Args:
+        label: Action described in the message (e.g. "getting orders count")
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                raise Exception(f"Error {label}: {str(e)}") from e
+        return wrapper
+    return decorator
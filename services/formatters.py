@@ -5,6 +5,7 @@ Contains all HTML formatting and text processing functions for reports.
 """
 
 import re
+from functools import lru_cache
 from typing import Optional
 
 
@@ -28,16 +29,33 @@ def strip_html_tags(html_text):
     return clean.strip()
 
 
+# Séparateurs français en une seule passe : milliers "," -> espace insécable, décimales "." -> ","
+_FR_NUMBER = str.maketrans({",": "\u00a0", ".": ","})
+
+_ZERO_CURRENCY = "0,00\u00a0€"
+
+
+@lru_cache(maxsize=1024)
+def _format_amount(amount: float) -> str:
+    return f"{amount:,.2f}".translate(_FR_NUMBER) + "\u00a0€"
+
+
 def format_currency(amount):
     """
     Format amount as currency with cents - CORRIGÉ pour gérer None
+
+    Espaces insécables (milliers et symbole) pour qu'un montant ne soit jamais
+    coupé en fin de cellule ; les montants répétés sont servis depuis un cache.
     """
     if amount is None or amount == 0:
-        return "0,00 €"
+        return _ZERO_CURRENCY
+    # Cas courant (montants Odoo) : float ou int servis directement, sans conversion
+    if type(amount) in (float, int):
+        return _format_amount(amount)
     try:
-        return f"{float(amount):,.2f} €".replace(",", " ").replace(".", ",")
+        return _format_amount(float(amount))
     except (ValueError, TypeError):
-        return "0,00 €"
+        return _ZERO_CURRENCY
 
 
 def extract_text_from_html(html_content: str, max_length: int = None) -> str:
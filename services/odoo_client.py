@@ -2,29 +2,246 @@
 Odoo client module.
 
 Provides connection management and XML-RPC communication functions for Odoo.
+JSON-RPC can be used instead by setting ODOO_PROTOCOL=jsonrpc.
 """
 
 import xmlrpc.client
+import itertools
 import socket
-from config import ODOO_URL, ODOO_DB, ODOO_USER, ODOO_PASSWORD, TIMEOUT
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import httpx
+import orjson
+from config import ODOO_URL, ODOO_DB, ODOO_USER, ODOO_PASSWORD, ODOO_PROTOCOL, TIMEOUT
+
+# XML-RPC endpoint URLs, built once (None when ODOO_URL is not configured)
+COMMON_URL = f'{ODOO_URL}/xmlrpc/2/common' if ODOO_URL else None
+OBJECT_URL = f'{ODOO_URL}/xmlrpc/2/object' if ODOO_URL else None
+JSONRPC_URL = f'{ODOO_URL}/jsonrpc' if ODOO_URL else None
+
+# Calls go through Odoo's /jsonrpc endpoint instead of XML-RPC
+USE_JSONRPC = ODOO_PROTOCOL == 'jsonrpc'
+
+# How long an authenticated uid is reused before re-authenticating (seconds)
+AUTH_CACHE_TTL = 1800
+
+# uid returned by common.authenticate, shared by all threads
+_auth_lock = threading.Lock()
+# 'generation' counts the authentications, so that concurrent calls rejected with
+# the same stale uid trigger a single re-authentication
+_auth_cache = {'uid': None, 'expires': 0.0, 'generation': 0}
+
+# Keep-alive connections kept open to Odoo by the shared HTTP client
+HTTP_POOL_SIZE = 32
+
+# Worker threads run_concurrently may have running at once, all calls and requests
+# together; kept below HTTP_POOL_SIZE so the calling threads still get a connection
+RPC_WORKERS = 24
+_rpc_workers = threading.BoundedSemaphore(RPC_WORKERS)
+
+# Shared HTTP client: keep-alive connection pool reused by every proxy and thread
+_http_client = None
+_http_client_lock = threading.Lock()
+
+# Endpoint proxies (stateless on top of the shared client, safe to share)
+_common_proxy = None
+_models_proxy = None
+
+# How long the set of installed model names is reused (seconds)
+MODEL_CACHE_TTL = 3600
+
+# Technical names of the installed models (ir.model), shared by all threads
+_model_cache_lock = threading.Lock()
+_model_cache = {'names': None, 'expires': 0.0}
+
+# Whether the object endpoint accepts system.multicall (None until first tried)
+# JSON-RPC has no multicall: calls are always sent one by one
+_multicall_supported = False if USE_JSONRPC else None
+
+
+def _get_http_client():
+    """Return the shared httpx client, created on first use"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    # No pool timeout: concurrent report workers wait for a free connection
+                    timeout=httpx.Timeout(TIMEOUT, pool=None),
+                    limits=httpx.Limits(
+                        max_connections=HTTP_POOL_SIZE,
+                        max_keepalive_connections=HTTP_POOL_SIZE
+                    )
+                )
+    return _http_client
+
+
+class HttpxTransport(xmlrpc.client.Transport):
+    """
+    XML-RPC transport sending requests through the shared httpx client.
+
+    Unlike the stdlib Transport, which opens a connection per proxy and is not
+    thread-safe, connections are pooled and kept alive across calls and threads.
+    """
+
+    def __init__(self, scheme='https'):
+        super().__init__()
+        self.scheme = scheme
+
+    def request(self, host, handler, request_body, verbose=False):
+        try:
+            response = _get_http_client().post(
+                f"{self.scheme}://{host}{handler}",
+                content=request_body,
+                headers={
+                    'Content-Type': 'text/xml',
+                    'User-Agent': self.user_agent,
+                    # Compressed replies, decoded by httpx (request bodies stay plain:
+                    # Odoo does not decode a gzipped XML-RPC request)
+                    'Accept-Encoding': 'gzip, deflate'
+                }
+            )
+        except httpx.TimeoutException as e:
+            # Surface as socket errors so callers keep their existing handling
+            raise socket.timeout(str(e))
+        except httpx.TransportError as e:
+            raise socket.error(str(e))
+
+        if response.status_code != 200:
+            raise xmlrpc.client.ProtocolError(
+                host + handler,
+                response.status_code,
+                response.reason_phrase,
+                dict(response.headers)
+            )
+
+        parser, unmarshaller = self.getparser()
+        parser.feed(response.content)
+        parser.close()
+        return unmarshaller.close()
+
+
+# Request ids of the JSON-RPC calls
+_jsonrpc_ids = itertools.count(1)
+
+
+class JsonRpcProxy:
+    """
+    Proxy for a service of Odoo's /jsonrpc endpoint ('common' or 'object').
+
+    Used like a ServerProxy (proxy.version(), proxy.execute_kw(...)) over the
+    shared httpx client. Errors returned by Odoo are raised as
+    xmlrpc.client.Fault so that callers keep their existing handling.
+    """
+
+    def __init__(self, service):
+        self._service = service
+
+    def __getattr__(self, method):
+        if method.startswith('_'):
+            raise AttributeError(method)
+        return lambda *args: self._call(method, args)
+
+    def _call(self, method, args):
+        url = _endpoint_url(JSONRPC_URL)
+        payload = {
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': {'service': self._service, 'method': method, 'args': list(args)},
+            'id': next(_jsonrpc_ids)
+        }
+        try:
+            response = _get_http_client().post(
+                url,
+                content=orjson.dumps(payload),
+                headers={'Content-Type': 'application/json', 'Accept-Encoding': 'gzip, deflate'}
+            )
+        except httpx.TimeoutException as e:
+            raise socket.timeout(str(e))
+        except httpx.TransportError as e:
+            raise socket.error(str(e))
+
+        if response.status_code != 200:
+            raise xmlrpc.client.ProtocolError(
+                url,
+                response.status_code,
+                response.reason_phrase,
+                dict(response.headers)
+            )
+
+        reply = orjson.loads(response.content)
+        error = reply.get('error')
+        if error:
+            data = error.get('data') or {}
+            raise xmlrpc.client.Fault(
+                error.get('code', 1),
+                data.get('debug') or data.get('message') or error.get('message', 'Unknown error')
+            )
+        return reply.get('result')
 
 
 def create_server_proxy(url):
-    """Create ServerProxy with timeout"""
-    transport = xmlrpc.client.Transport()
-    transport.timeout = TIMEOUT
+    """Create ServerProxy using the pooled HTTP transport"""
+    transport = HttpxTransport(scheme=urlsplit(url).scheme or 'https')
     return xmlrpc.client.ServerProxy(url, transport=transport)
 
 
+def _endpoint_url(url):
+    """Return an endpoint URL, failing clearly if ODOO_URL is missing"""
+    if url is None:
+        raise Exception("ODOO_URL is not configured - set it in the environment")
+    return url
+
+
+def get_common_proxy():
+    """Return the shared common endpoint proxy (version, authenticate)"""
+    global _common_proxy
+    if _common_proxy is None:
+        if USE_JSONRPC:
+            _common_proxy = JsonRpcProxy('common')
+        else:
+            _common_proxy = create_server_proxy(_endpoint_url(COMMON_URL))
+    return _common_proxy
+
+
+def get_models_proxy():
+    """Return the shared object endpoint proxy"""
+    global _models_proxy
+    if _models_proxy is None:
+        if USE_JSONRPC:
+            _models_proxy = JsonRpcProxy('object')
+        else:
+            _models_proxy = create_server_proxy(_endpoint_url(OBJECT_URL))
+    return _models_proxy
+
+
 def get_odoo_connection():
-    """Establish connection to Odoo with better error handling"""
+    """
+    Establish connection to Odoo with better error handling.
+
+    The uid is cached for AUTH_CACHE_TTL seconds so that only the first call
+    pays the authenticate round-trip.
+    """
+    models, uid, _generation = _connection()
+    return models, uid
+
+
+def _connection():
+    """Return (models proxy, uid, auth generation), authenticating if needed"""
     try:
-        common = create_server_proxy(f'{ODOO_URL}/xmlrpc/2/common')
-        uid = common.authenticate(ODOO_DB, ODOO_USER, ODOO_PASSWORD, {})
-        if not uid:
-            raise Exception("Authentication failed - check username/password")
-        models = create_server_proxy(f'{ODOO_URL}/xmlrpc/2/object')
-        return models, uid
+        with _auth_lock:
+            if _auth_cache['uid'] is None or time.monotonic() >= _auth_cache['expires']:
+                uid = get_common_proxy().authenticate(ODOO_DB, ODOO_USER, ODOO_PASSWORD, {})
+                if not uid:
+                    raise Exception("Authentication failed - check username/password")
+                _auth_cache['uid'] = uid
+                _auth_cache['expires'] = time.monotonic() + AUTH_CACHE_TTL
+                _auth_cache['generation'] += 1
+            uid = _auth_cache['uid']
+            generation = _auth_cache['generation']
+        return get_models_proxy(), uid, generation
     except socket.timeout:
         raise Exception(f"Connection timeout after {TIMEOUT} seconds - Odoo server may be down")
     except socket.error as e:
@@ -33,3 +250,203 @@ def get_odoo_connection():
         raise Exception(f"Odoo XML-RPC error: {fault.faultString}")
     except Exception as e:
         raise
+
+
+def invalidate_odoo_connection():
+    """Forget the cached uid so that the next call re-authenticates"""
+    with _auth_lock:
+        _auth_cache['uid'] = None
+        _auth_cache['expires'] = 0.0
+
+
+def _reauthenticate(generation):
+    """
+    Re-authenticate after Odoo rejected the uid of the given generation.
+
+    Only the first caller clears the cache; the others find a newer generation
+    and reuse its uid instead of authenticating again.
+    """
+    with _auth_lock:
+        if _auth_cache['generation'] == generation:
+            _auth_cache['uid'] = None
+            _auth_cache['expires'] = 0.0
+    return _connection()
+
+
+def get_uid(force=False):
+    """
+    Return the authenticated uid from the cache, authenticating only when the
+    cache is cold or expired (or when force=True).
+    """
+    if force:
+        invalidate_odoo_connection()
+    return get_odoo_connection()[1]
+
+
+def _is_auth_fault(fault):
+    """Check whether an XML-RPC fault means the cached credentials were rejected"""
+    message = str(fault.faultString).lower()
+    return 'access denied' in message or 'accessdenied' in message or 'session expired' in message
+
+
+def execute_kw(model, method, args, kwargs=None):
+    """
+    Call execute_kw on the cached connection.
+
+    If Odoo rejects the cached uid (access denied / session expired), the cache
+    is cleared and the call is retried once with a fresh authentication.
+    """
+    models, uid, generation = _connection()
+    try:
+        return models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model, method, args, kwargs or {})
+    except xmlrpc.client.Fault as fault:
+        if not _is_auth_fault(fault):
+            raise
+        models, uid, _generation = _reauthenticate(generation)
+        return models.execute_kw(ODOO_DB, uid, ODOO_PASSWORD, model, method, args, kwargs or {})
+
+
+def execute_kw_multi(calls, _retried=False):
+    """
+    Run several execute_kw calls, given as (model, method, args, kwargs) tuples.
+
+    Sent as a single system.multicall request when the server accepts it; stock
+    Odoo only dispatches execute/execute_kw on the object endpoint, in which case
+    the calls are sent one by one.
+
+    Returns:
+        List of results in call order; a call that failed yields its
+        xmlrpc.client.Fault (or OSError) instead of raising
+
+    As with execute_kw, the batch is retried once with a fresh authentication
+    if Odoo rejects the cached uid.
+    """
+    global _multicall_supported
+    models, uid, generation = _connection()
+    params = [
+        [ODOO_DB, uid, ODOO_PASSWORD, model, method, args, kwargs or {}]
+        for model, method, args, kwargs in calls
+    ]
+
+    if _multicall_supported is not False:
+        try:
+            replies = models.system.multicall([
+                {'methodName': 'execute_kw', 'params': call_params} for call_params in params
+            ])
+            _multicall_supported = True
+            results = [
+                xmlrpc.client.Fault(reply['faultCode'], reply['faultString'])
+                if isinstance(reply, dict) else reply[0]
+                for reply in replies
+            ]
+        except xmlrpc.client.Fault:
+            _multicall_supported = False
+
+    if _multicall_supported is False:
+        results = []
+        for call_params in params:
+            try:
+                results.append(models.execute_kw(*call_params))
+            except (xmlrpc.client.Fault, OSError) as e:
+                results.append(e)
+
+    if not _retried and any(
+        isinstance(result, xmlrpc.client.Fault) and _is_auth_fault(result) for result in results
+    ):
+        _reauthenticate(generation)
+        return execute_kw_multi(calls, _retried=True)
+    return results
+
+
+def get_model_names():
+    """
+    Return the technical names of all installed models.
+
+    Fetched from ir.model in a single search_read, then served from memory for
+    MODEL_CACHE_TTL seconds.
+    """
+    with _model_cache_lock:
+        if _model_cache['names'] is None or time.monotonic() >= _model_cache['expires']:
+            records = execute_kw('ir.model', 'search_read', [[]], {'fields': ['model']})
+            _model_cache['names'] = frozenset(record['model'] for record in records)
+            _model_cache['expires'] = time.monotonic() + MODEL_CACHE_TTL
+        return _model_cache['names']
+
+
+def model_exists(model):
+    """
+    Check whether a model is installed, without an RPC once the cache is warm.
+
+    Only hits are served from the cache: a name missing from it is checked on
+    ir.model (a model installed since the last fetch refreshes the cache).
+    """
+    if model in get_model_names():
+        return True
+    if not execute_kw('ir.model', 'search_count', [[('model', '=', model)]]):
+        return False
+    invalidate_model_cache()
+    return True
+
+
+def invalidate_model_cache():
+    """Forget the installed model names (e.g. after a module install/uninstall)"""
+    with _model_cache_lock:
+        _model_cache['names'] = None
+        _model_cache['expires'] = 0.0
+
+
+def is_unknown_model_fault(fault):
+    """Check whether an XML-RPC fault means the model is not in the registry"""
+    return isinstance(fault, xmlrpc.client.Fault) and 'KeyError' in str(fault.faultString)
+
+
+def run_concurrently(tasks):
+    """
+    Run independent callables (typically RPCs) in parallel threads.
+    Safe with the shared proxies: the pooled transport is thread-safe.
+
+    The calling thread runs the first task itself instead of waiting idle, so
+    a single task needs no extra thread and n tasks only n - 1 of them.
+
+    Extra threads are taken from a process-wide budget (RPC_WORKERS) without
+    waiting: when it is exhausted the remaining tasks run in the calling
+    thread, so nested calls cannot deadlock and the number of concurrent
+    RPCs stays bounded however many reports run at once.
+
+    Args:
+        tasks: Dict {key: callable without arguments}
+
+    Returns:
+        Dict {key: result, or the exception raised by the callable}
+    """
+    items = list(tasks.items())
+    results = {}
+    if not items:
+        return results
+
+    def run(task):
+        try:
+            return task()
+        except Exception as e:
+            return e
+
+    workers = 0
+    while workers < len(items) - 1 and _rpc_workers.acquire(blocking=False):
+        workers += 1
+    if not workers:
+        for key, task in items:
+            results[key] = run(task)
+        return results
+
+    first_key, first_task = items[0]
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(key, executor.submit(run, task)) for key, task in items[1:]]
+            results[first_key] = run(first_task)
+    finally:
+        for _ in range(workers):
+            _rpc_workers.release()
+
+    for key, future in futures:
+        results[key] = future.result()
+    return results
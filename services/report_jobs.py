@@ -0,0 +1,214 @@
+"""
+Report jobs module.
+
+Persists the weekly report batches in a small SQLite journal: every report is
+an independent job that survives a restart of the API server and is retried
+a few times before being marked as failed.
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from typing import List, Optional, Tuple
+from config import REPORT_JOBS_DB
+
+# Number of attempts before a job is marked as failed
+MAX_ATTEMPTS = 3
+
+# A job still 'running' after this delay (seconds) was interrupted (restart, crash)
+STALE_AFTER = 1800
+
+# Delay (seconds) before the first retry of a failed job, doubled at each attempt
+RETRY_BACKOFF = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+def _connect():
+    """Open the journal in autocommit mode (each UPDATE is atomic on its own)"""
+    conn = sqlite3.connect(REPORT_JOBS_DB, timeout=30, isolation_level=None)
+    conn.execute(_SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(report_jobs)")}
+    if 'not_before' not in columns:
+        # Journal created before the retry backoff
+        try:
+            conn.execute("ALTER TABLE report_jobs ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # Added meanwhile by another worker
+    return conn
+
+
+def enqueue_jobs(kind: str, payloads: List[dict]) -> int:
+    """
+    Add one pending job per payload.
+
+    A payload identical to a job that is still pending or running is skipped,
+    so triggering the same batch twice does not generate reports twice.
+
+    Returns:
+        Number of jobs actually added
+    """
+    now = time.time()
+    added = 0
+    with closing(_connect()) as conn:
+        for payload in payloads:
+            payload_json = json.dumps(payload, sort_keys=True)
+            cursor = conn.execute(
+                """
+                INSERT INTO report_jobs (kind, payload, created_at, updated_at)
+                SELECT ?, ?, ?, ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM report_jobs
+                    WHERE kind = ? AND payload = ? AND status IN ('pending', 'running')
+                )
+                """,
+                (kind, payload_json, now, now, kind, payload_json)
+            )
+            added += cursor.rowcount
+    return added
+
+
+def pending_jobs(kind: str) -> List[Tuple[int, dict]]:
+    """Return the (job_id, payload) of the pending jobs of a kind due now, oldest first"""
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, payload FROM report_jobs
+            WHERE kind = ? AND status = 'pending' AND not_before <= ?
+            ORDER BY id
+            """,
+            (kind, time.time())
+        ).fetchall()
+    return [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+
+def next_retry_delay(kind: str) -> Optional[float]:
+    """
+    Seconds until the next pending job of a kind is due (0 if one is due now).
+
+    Returns:
+        None if no job of that kind is pending
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute(
+            "SELECT MIN(not_before) FROM report_jobs WHERE kind = ? AND status = 'pending'",
+            (kind,)
+        ).fetchone()
+    if row[0] is None:
+        return None
+    return max(0.0, row[0] - time.time())
+
+
+def claim_job(job_id: int) -> bool:
+    """
+    Mark a pending job as running, unless its retry delay is not over.
+
+    Returns:
+        False if another worker claimed it first (or it is not due yet)
+    """
+    now = time.time()
+    with closing(_connect()) as conn:
+        cursor = conn.execute(
+            """
+            UPDATE report_jobs
+            SET status = 'running', attempts = attempts + 1, updated_at = ?
+            WHERE id = ? AND status = 'pending' AND not_before <= ?
+            """,
+            (now, job_id, now)
+        )
+        return cursor.rowcount == 1
+
+
+def complete_job(job_id: int):
+    """Mark a running job as done"""
+    with closing(_connect()) as conn:
+        conn.execute(
+            "UPDATE report_jobs SET status = 'done', last_error = NULL, updated_at = ? WHERE id = ?",
+            (time.time(), job_id)
+        )
+
+
+def fail_job(job_id: int, error: str) -> bool:
+    """
+    Record a failed attempt: the job goes back to pending until MAX_ATTEMPTS is reached,
+    due again after RETRY_BACKOFF * 2 ** (attempts - 1) seconds (exponential backoff).
+
+    Returns:
+        True if the job will be retried
+    """
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.execute(
+            """
+            UPDATE report_jobs
+            SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END,
+                not_before = ? + ? * (1 << (attempts - 1)),
+                last_error = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (MAX_ATTEMPTS, now, RETRY_BACKOFF, error, now, job_id)
+        )
+        status = conn.execute("SELECT status FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+    return bool(status) and status[0] == 'pending'
+
+
+def release_jobs(job_ids: List[int]):
+    """
+    Put running jobs back to pending without counting the interrupted attempt
+    (shutdown of the server while they were being generated).
+    """
+    if not job_ids:
+        return
+    with closing(_connect()) as conn:
+        conn.execute(
+            f"""
+            UPDATE report_jobs
+            SET status = 'pending', attempts = MAX(attempts - 1, 0), updated_at = ?
+            WHERE status = 'running' AND id IN ({', '.join('?' * len(job_ids))})
+            """,
+            (time.time(), *job_ids)
+        )
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Put back to pending the jobs left 'running' for more than STALE_AFTER seconds.
+
+    A job that already used its MAX_ATTEMPTS is marked as failed instead: a
+    report that crashes the worker itself would otherwise be requeued forever.
+
+    Returns:
+        Number of jobs requeued
+    """
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.execute(
+            """
+            UPDATE report_jobs
+            SET status = 'failed', last_error = 'Interrupted while running', updated_at = ?
+            WHERE status = 'running' AND updated_at < ? AND attempts >= ?
+            """,
+            (now, now - STALE_AFTER, MAX_ATTEMPTS)
+        )
+        cursor = conn.execute(
+            """
+            UPDATE report_jobs
+            SET status = 'pending', updated_at = ?
+            WHERE status = 'running' AND updated_at < ? AND attempts < ?
+            """,
+            (now, now - STALE_AFTER, MAX_ATTEMPTS)
+        )
+        return cursor.rowcount
@@ -4,20 +4,55 @@ Activity report tool module.
 Contains the activity_report MCP tool and all its helper functions.
 """
 
-import json
+import hashlib
 import datetime
+import os
 import pytz
 import base64
+import re
+import threading
+import logging
+import multiprocessing
+import orjson
+from html import escape
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from string import Formatter
 from typing import List, Dict
-from config import ODOO_DB, ODOO_PASSWORD, ODOO_URL, SUBTYPE_MAPPING
-from services.odoo_client import get_odoo_connection
+from config import API_WORKERS, ODOO_URL, translate_subtype
 from services.formatters import strip_html_tags, extract_text_from_html
+from services.odoo_client import execute_kw, run_concurrently
 from services.ai import generate_claude_summary
+from services.errors import wrap_errors
+from services.cache import TTLCache
 
 
 # The mcp instance will be injected by the main module
 mcp = None
 
+# Child of the API server's "automation" logger: records go through its queue handler
+logger = logging.getLogger("automation.activity_report")
+
+# Préfixes des liens vers les fiches Odoo, calculés une fois : l'ID est concaténé en fin d'URL
+ACTIVITY_URL_PREFIX = f"{ODOO_URL}/web#model=mail.activity&view_type=form&id="
+TASK_URL_PREFIX = f"{ODOO_URL}/web#model=project.task&view_type=form&id="
+PROJECT_URL_PREFIX = f"{ODOO_URL}/web#model=project.project&view_type=kanban&id="
+
+_HTML_TAG_RE = re.compile(r'<[^>]*>')
+
+# En-tête et lignes de métriques déjà rendus, par empreinte de report_data (relance
+# d'une création de tâche, régénération du même rapport) : {empreinte: html}.
+# Le résumé IA n'y figure pas : il est redemandé à chaque rapport
+REPORT_HTML_CACHE_TTL = 3600
+REPORT_HTML_CACHE_MAXSIZE = 64
+_report_html_cache = TTLCache(REPORT_HTML_CACHE_TTL, REPORT_HTML_CACHE_MAXSIZE)
+
+# Pool de processus pour le rendu PDF (CPU-bound, bloqué par le GIL en threads).
+# Chaque process uvicorn a son propre pool : les cœurs sont partagés entre les API_WORKERS
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", max(1, (os.cpu_count() or 1) // API_WORKERS)))
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
 
 def init_mcp(mcp_instance):
     """Initialize the mcp instance for this module"""
@@ -30,33 +65,81 @@ def init_mcp(mcp_instance):
 
 # Import odoo_search and odoo_execute from data module
 def odoo_search(*args, **kwargs):
-    """Wrapper to call odoo_search from tools.data"""
-    from tools.data import odoo_search as _odoo_search
-    return _odoo_search(*args, **kwargs)
+    """
+    Wrapper to call odoo_search from tools.data, returning the result dict.
+
+    The report helpers only query known models, so the ir.model existence
+    check is skipped.
+    """
+    from tools.data import odoo_search_raw
+    try:
+        return odoo_search_raw(*args, check_model=False, **kwargs)
+    except Exception as e:
+        return {"error": f"Error searching: {str(e)}"}
 
 
 def odoo_execute(*args, **kwargs):
-    """Wrapper to call odoo_execute from tools.data"""
-    from tools.data import odoo_execute as _odoo_execute
-    return _odoo_execute(*args, **kwargs)
+    """Wrapper to call odoo_execute from tools.data, returning the result dict"""
+    from tools.data import odoo_execute_raw
+    try:
+        return odoo_execute_raw(*args, **kwargs)
+    except Exception as e:
+        return {"error": f"Error executing method: {str(e)}"}
+
+
+def odoo_search_read(model: str, domain: list, fields: List[str], limit: int = None) -> list:
+    """
+    Read the records matching domain with a single search_read call.
+
+    Unlike odoo_search, no search_count is sent alongside: for detail lists
+    that do not need pagination info.
+
+    Returns:
+        List of records (dicts)
+    """
+    kwargs = {'fields': fields}
+    if limit:
+        kwargs['limit'] = limit
+    return execute_kw(model, 'search_read', [domain], kwargs)
+
+
+def _render_pdf(html_content: str) -> bytes:
+    """Render HTML to PDF bytes (runs in a worker process of the PDF pool)"""
+    from weasyprint import HTML
+    return HTML(string=html_content).write_pdf()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Return the PDF rendering pool, created on first use"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                # spawn: ne pas dupliquer par fork les threads et connexions du process parent
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pdf_pool
 
 
 def generate_pdf_from_html(html_content: str) -> bytes:
-    try:
-        from weasyprint import HTML
-        import traceback
+    """
+    Convert HTML to PDF with WeasyPrint.
 
-        print("[DEBUG] Starting PDF generation...")
-        pdf_bytes = HTML(string=html_content).write_pdf()
-        print(f"[DEBUG] PDF generated successfully, size: {len(pdf_bytes)} bytes")
+    Le rendu est délégué au pool de processus : plusieurs rapports générés en
+    parallèle (threads) produisent leurs PDF réellement en parallèle.
+    """
+    try:
+        logger.debug("Starting PDF generation...")
+        pdf_bytes = _get_pdf_pool().submit(_render_pdf, html_content).result()
+        logger.debug("PDF generated successfully, size: %d bytes", len(pdf_bytes))
 
         return pdf_bytes
 
     except Exception as e:
-        error_trace = traceback.format_exc()
-        print(f"[ERROR] PDF generation failed:")
-        print(error_trace)
-        raise Exception(f"Error generating PDF from HTML: {str(e)}\n{error_trace}")
+        logger.exception("PDF generation failed")
+        raise Exception(f"Error generating PDF from HTML: {str(e)}") from e
 
 
 def attach_pdf_to_task_chatter(task_id: int, pdf_bytes: bytes, filename: str) -> int:
@@ -85,13 +168,12 @@ def attach_pdf_to_task_chatter(task_id: int, pdf_bytes: bytes, filename: str) ->
             'mimetype': 'application/pdf'
         }
 
-        result = odoo_execute(
+        response = odoo_execute(
             model='ir.attachment',
             method='create',
             args=[attachment_data]
         )
 
-        response = json.loads(result)
         if response.get('status') != 'success':
             raise Exception(f"Attachment creation failed: {response.get('error', 'Unknown error')}")
 
@@ -107,13 +189,12 @@ def attach_pdf_to_task_chatter(task_id: int, pdf_bytes: bytes, filename: str) ->
             'attachment_ids': [(6, 0, [attachment_id])]  # Link the attachment to the message
         }
 
-        message_result = odoo_execute(
+        message_response = odoo_execute(
             model='mail.message',
             method='create',
             args=[message_data]
         )
 
-        message_response = json.loads(message_result)
         if message_response.get('status') == 'success':
             message_id = message_response.get('result')
             print(f"[SUCCESS] Posted message #{message_id} in Chatter with PDF attachment")
@@ -153,41 +234,87 @@ def odoo_activity_report(
             datetime.datetime.fromisoformat(start_date)
             datetime.datetime.fromisoformat(end_date)
         except ValueError:
-            return json.dumps({
+            return orjson.dumps({
                 "status": "error",
                 "message": "Invalid date format. Use YYYY-MM-DD format."
-            })
+            }).decode()
 
         # Validate that start_date is before or equal to end_date
         if start_date > end_date:
-            return json.dumps({
+            return orjson.dumps({
                 "status": "error",
                 "message": "start_date must be before or equal to end_date"
-            })
-
-        # Test Odoo connection first
-        models, uid = get_odoo_connection()
+            }).decode()
 
-        # Verify user exists
-        user_check = odoo_search(
-            model='res.users',
-            domain=[['id', '=', user_id]],
-            fields=['name'],
-            limit=1
-        )
-        user_response = json.loads(user_check)
-        if not (user_response.get('status') == 'success' and user_response.get('records')):
-            return json.dumps({
+        # Verify user exists (et récupère son partner_id pour la timeline)
+        users_info = get_users_info([user_id])
+        if user_id not in users_info:
+            return orjson.dumps({
                 "status": "error",
                 "message": f"User with ID {user_id} not found"
-            })
+            }).decode()
+
+        result = generate_user_activity_report(
+            user_id=user_id,
+            user_name=users_info[user_id]['name'],
+            start_date=start_date,
+            end_date=end_date,
+            project_id=project_id,
+            task_column_id=task_column_id,
+            partner_id=users_info[user_id]['partner_id']
+        )
+        # JSON compact ; les dicts par utilisateur ont des clés entières
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode()
 
-        user_name = user_response['records'][0]['name']
+    except Exception as e:
+        return orjson.dumps({
+            "status": "error",
+            "message": f"Error generating activity report: {str(e)}"
+        }).decode()
+
+
+def generate_user_activity_report(
+    user_id: int,
+    user_name: str,
+    start_date: str,
+    end_date: str,
+    project_id: int,
+    task_column_id: int,
+    partner_id: int = None,
+    timeline_sources: dict = None
+) -> dict:
+    """
+    Génère le rapport d'activité d'un utilisateur déjà validé (dates et user vérifiés).
+
+    Utilisé par odoo_activity_report et par les batchs automatiques, qui passent
+    les données préchargées par prefetch_activity_reports_bulk pour éviter
+    de refaire les requêtes par utilisateur.
 
-        print(f"[INFO] Generating activity report for {user_name} (user_id={user_id}) from {start_date} to {end_date}")
+    Args:
+        timeline_sources: Messages/activités déjà récupérés pour ce user
+                          (voir fetch_timeline_sources_bulk), optionnel
 
-        # PARTIE 1: Collecter les données pour le tableau récapitulatif
-        print(f"[INFO] Collecting summary data (activities, tasks, projects)...")
+    Returns:
+        Dict with the report status (sérialisé en JSON seulement par odoo_activity_report)
+    """
+    try:
+        # PARTIES 1-2: Collecter les données du tableau récapitulatif (activités,
+        # tâches, projets) et la timeline enrichie : collectes indépendantes,
+        # lancées en parallèle (chacune parallélise aussi ses propres requêtes)
+        print(f"[INFO] Collecting summary data (activities, tasks, projects) and daily timeline data...")
+        # Même date de référence (retard / dans les délais) pour tous les collecteurs
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        collected = gather_concurrently({
+            "activities_data": lambda: collect_activities_data(start_date, end_date, user_id, today),
+            "tasks_data": lambda: collect_tasks_data(start_date, end_date, user_id, today),
+            "projects_data": lambda: collect_projects_data(start_date, end_date, user_id, today),
+            "timeline_data": lambda: collect_daily_timeline_data(
+                start_date, end_date, user_id,
+                partner_id=partner_id,
+                sources=timeline_sources
+            )
+        })
+        timeline_data = collected.pop("timeline_data")
         report_data = {
             "user_info": {
                 "user_id": user_id,
@@ -195,15 +322,9 @@ def odoo_activity_report(
                 "start_date": start_date,
                 "end_date": end_date
             },
-            "activities_data": collect_activities_data(start_date, end_date, user_id),
-            "tasks_data": collect_tasks_data(start_date, end_date, user_id),
-            "projects_data": collect_projects_data(start_date, end_date, user_id)
+            **collected
         }
 
-        # PARTIE 2: Collecter la timeline enrichie pour la liste exhaustive
-        print(f"[INFO] Collecting daily timeline data...")
-        timeline_data = collect_daily_timeline_data(start_date, end_date, user_id)
-
         # PARTIE 3: Générer le tableau récapitulatif HTML (sans timeline)
         print(f"[INFO] Generating summary table HTML...")
         summary_table_html = generate_activity_report_html_table(report_data)
@@ -237,9 +358,9 @@ def odoo_activity_report(
         # Count total events for summary
         total_events = sum(len(events) for events in timeline_data.values())
 
-        task_url = f"{ODOO_URL}/web#id={task_id}&model=project.task&view_type=form"
+        task_url = TASK_URL_PREFIX + str(task_id)
 
-        return json.dumps({
+        return {
             "status": "success",
             "message": f"Activity report generated successfully for {user_name}",
             "period": f"{start_date} to {end_date}",
@@ -254,13 +375,157 @@ def odoo_activity_report(
                 "size_bytes": pdf_size
             },
             "timestamp": datetime.datetime.now().isoformat()
-        }, indent=2)
+        }
 
     except Exception as e:
-        return json.dumps({
+        return {
             "status": "error",
             "message": f"Error generating activity report: {str(e)}"
-        })
+        }
+
+
+def get_users_info(user_ids: List[int]) -> Dict[int, dict]:
+    """
+    Récupère en une seule requête le nom et le partner_id de plusieurs utilisateurs.
+
+    Returns:
+        Dict {user_id: {'name': ..., 'partner_id': ...}} (les users introuvables sont absents)
+    """
+    response = odoo_search(
+        model='res.users',
+        domain=[['id', 'in', list(user_ids)]],
+        fields=['name', 'partner_id'],
+        limit=len(user_ids)
+    )
+    if response.get('status') != 'success':
+        raise Exception(f"Cannot read users {list(user_ids)}: {response.get('error', 'Unknown error')}")
+
+    return {
+        record['id']: {
+            'name': record['name'],
+            'partner_id': record['partner_id'][0] if record.get('partner_id') else None
+        }
+        for record in response.get('records', [])
+    }
+
+
+def fetch_timeline_sources_bulk(start_date: str, end_date: str, partners_by_user: Dict[int, int]) -> Dict[int, dict]:
+    """
+    Récupère en une requête par modèle les mail.message et mail.activity de plusieurs
+    utilisateurs, puis les répartit par user_id en Python.
+
+    Un message est attribué à un user s'il l'a créé (create_uid) ou si son partner
+    en est l'auteur (author_id) ; il peut donc apparaître chez deux users.
+
+    Args:
+        partners_by_user: Dict {user_id: partner_id}
+
+    Returns:
+        Dict {user_id: {'messages': [...], 'activities': [...]}}
+    """
+    user_ids = list(partners_by_user)
+    users_by_partner = {
+        partner_id: user_id
+        for user_id, partner_id in partners_by_user.items()
+        if partner_id
+    }
+    sources = {user_id: {'messages': [], 'activities': []} for user_id in user_ids}
+
+    # MAIL.MESSAGE - Utilise un filtre OR pour capturer:
+    # - create_uid: notifications système créées par le user
+    # - author_id: notes/emails écrits par le partner
+    # Nécessaire car quand un user crée une notification système,
+    # le message a create_uid = user_id mais author_id = partner_id
+    messages_response = odoo_search(
+        model='mail.message',
+        domain=[
+            '|',
+            ['create_uid', 'in', user_ids],                   # Notifs système créées par les users
+            ['author_id', 'in', list(users_by_partner)],      # Notes/emails écrits par les partners
+            ['date', '>=', start_date],
+            ['date', '<=', end_date]
+        ],
+        fields=[
+            'id', 'subject', 'body', 'preview', 'date', 'model', 'res_id',
+            'message_type', 'subtype_id', 'record_name',
+            'create_uid', 'author_id',  # Pour répartir les messages par user
+            # Champs enrichis accessibles sans droits admin
+            'attachment_ids',      # Pièces jointes
+            'partner_ids',         # Utilisateurs tagués
+            'email_from',          # Expéditeur email
+            # Champs nécessitant droits admin (désactivés)
+            # 'tracking_value_ids',  # Nécessite groupe Administration/Settings
+            # Champs secondaires (non nécessaires pour l'instant)
+            # 'is_internal', 'record_company_id', 'parent_id', 'mail_activity_type_id',
+            # 'rating_value', 'starred', 'pinned_at'
+        ],
+        limit=100000  # Limite très élevée pour historique complet (inatteignable en pratique)
+    )
+
+    # DEBUG: Log de la réponse brute
+    print(f"[DEBUG] Statut de la requête mail.message : {messages_response.get('status')}")
+    if messages_response.get('status') != 'success':
+        print(f"[DEBUG] ERREUR dans la requête mail.message: {messages_response.get('error', 'Erreur inconnue')}")
+    else:
+        for msg in messages_response.get('records', []):
+            owners = set()
+            if msg.get('create_uid') and msg['create_uid'][0] in sources:
+                owners.add(msg['create_uid'][0])
+            if msg.get('author_id') and msg['author_id'][0] in users_by_partner:
+                owners.add(users_by_partner[msg['author_id'][0]])
+            for owner in owners:
+                sources[owner]['messages'].append(msg)
+
+    # MAIL.ACTIVITY - Activités terminées (complément pour ce qui n'est pas dans mail.message)
+    activities_response = odoo_search(
+        model='mail.activity',
+        domain=[
+            ['active', '=', False],
+            ['state', '=', 'done'],
+            ['date_done', '>=', start_date],
+            ['date_done', '<=', end_date],
+            ['user_id', 'in', user_ids]
+        ],
+        fields=['id', 'summary', 'date_done', 'res_model', 'res_id', 'res_name', 'user_id'],
+        limit=100000  # Limite très élevée pour historique complet (inatteignable en pratique)
+    )
+    if activities_response.get('status') == 'success':
+        for activity in activities_response.get('records', []):
+            if activity.get('user_id') and activity['user_id'][0] in sources:
+                sources[activity['user_id'][0]]['activities'].append(activity)
+
+    return sources
+
+
+def prefetch_activity_reports_bulk(user_ids: List[int], start_date: str, end_date: str) -> Dict[int, dict]:
+    """
+    Précharge en bloc les données communes aux rapports d'activité de plusieurs users :
+    une requête res.users, une requête mail.message et une requête mail.activity
+    au lieu de 3 requêtes par utilisateur.
+
+    Returns:
+        Dict {user_id: {'user_name', 'partner_id', 'timeline_sources'}}
+        (les users introuvables sont absents)
+    """
+    try:
+        users_info = get_users_info(user_ids)
+        sources = fetch_timeline_sources_bulk(
+            start_date,
+            end_date,
+            {user_id: info['partner_id'] for user_id, info in users_info.items()}
+        )
+
+        return {
+            user_id: {
+                'user_name': info['name'],
+                'partner_id': info['partner_id'],
+                'timeline_sources': sources[user_id]
+            }
+            for user_id, info in users_info.items()
+        }
+
+    except Exception as e:
+        raise Exception(f"Error prefetching activity reports data: {str(e)}")
 
 
 def enrich_messages_with_display_names(messages: list) -> dict:
@@ -291,14 +556,13 @@ def enrich_messages_with_display_names(messages: list) -> dict:
     for model, ids in records_by_model.items():
         try:
             ids_list = list(ids)
-            result = odoo_search(
+            result_data = odoo_search(
                 model=model,
                 domain=[['id', 'in', ids_list]],
                 fields=['id', 'display_name'],
                 limit=len(ids_list)
             )
 
-            result_data = json.loads(result)
             if result_data.get('status') == 'success':
                 for record in result_data.get('records', []):
                     key = (model, record['id'])
@@ -313,7 +577,8 @@ def enrich_messages_with_display_names(messages: list) -> dict:
 
 def determine_action_type(msg: dict) -> str:
     """
-    Determine the action type based on mail.message attributes using SUBTYPE_MAPPING.
+    Determine the action type based on mail.message attributes using SUBTYPE_MAPPING
+    (via translate_subtype).
 
     Args:
         msg: mail.message record with message_type, subtype_id fields
@@ -351,8 +616,9 @@ def determine_action_type(msg: dict) -> str:
             subtype_name = subtype_id[1] if isinstance(subtype_id, list) else str(subtype_id)
 
             # Chercher dans le mapping
-            if subtype_numeric_id in SUBTYPE_MAPPING:
-                return SUBTYPE_MAPPING[subtype_numeric_id]
+            mapped_label = translate_subtype(subtype_numeric_id)
+            if mapped_label is not None:
+                return mapped_label
 
             # Fallback sur l'analyse du nom si pas dans le mapping
             subtype_lower = subtype_name.lower()
@@ -487,8 +753,6 @@ def extract_text_from_html(html_content: str, max_length: int = None) -> str:
     if not html_content:
         return ""
 
-    import re
-
     # ÉTAPE 1 : Convertir les balises HTML de saut de ligne en \n AVANT de supprimer les balises
     html_with_newlines = html_content
     # Remplacer les balises de bloc par des sauts de ligne
@@ -585,7 +849,14 @@ def convert_utc_to_paris(utc_datetime_str: str) -> str:
         return utc_datetime_str
 
 
-def collect_daily_timeline_data(start_date: str, end_date: str, user_id: int):
+@wrap_errors("collecting daily timeline data")
+def collect_daily_timeline_data(
+    start_date: str,
+    end_date: str,
+    user_id: int,
+    partner_id: int = None,
+    sources: dict = None
+):
     """
     Collect ALL user actions via mail.message (comprehensive tracking) + mail.activity (completed activities).
     Organizes events chronologically day by day with timestamps.
@@ -596,834 +867,497 @@ def collect_daily_timeline_data(start_date: str, end_date: str, user_id: int):
     - Internal notes and comments
     - Completed activities (from mail.activity)
 
+    Args:
+        partner_id: partner du user, récupéré si non fourni
+        sources: messages/activités déjà récupérés (fetch_timeline_sources_bulk),
+                 récupérés pour ce seul user si non fournis
+
     Returns:
         Dict with dates as keys and list of events sorted by time
     """
-    try:
-        all_events = []
-
-        # 1. Récupérer le partner_id associé au user_id
-        # Nécessaire car mail.message utilise author_id (res.partner) ET create_uid (res.users)
-        # Quand un user crée une notification système, le message a create_uid = user_id mais author_id = partner_id
-        user_result = odoo_search(
-            model='res.users',
-            domain=[['id', '=', user_id]],
-            fields=['partner_id'],
-            limit=1
-        )
-        user_data = json.loads(user_result)
-        if user_data.get('status') != 'success' or not user_data.get('records'):
-            raise Exception(f"Cannot find user {user_id}")
-
-        partner_id = user_data['records'][0]['partner_id'][0]
+    all_events = []
+
+    # 1. Récupérer messages et activités si non préchargés
+    if sources is None:
+        if partner_id is None:
+            partner_id = get_users_info([user_id]).get(user_id, {}).get('partner_id')
+            if not partner_id:
+                raise Exception(f"Cannot find user {user_id}")
+        sources = fetch_timeline_sources_bulk(start_date, end_date, {user_id: partner_id})[user_id]
+
+    messages_list = sources['messages']
+
+    # 2. MAIL.MESSAGE - Enrichir les messages avec les vrais display_name en batch
+    display_names_map = enrich_messages_with_display_names(messages_list)
+
+    # DEBUG: Log du nombre de messages récupérés
+    print(f"[DEBUG] Messages récupérés de mail.message : {len(messages_list)}")
+
+    filtered_count = 0
+    for msg in messages_list:
+        if msg.get('date') and msg.get('model') and msg.get('res_id'):
+            filtered_count += 1
+            # Récupérer le vrai display_name depuis le map
+            enriched_name = display_names_map.get((msg['model'], msg['res_id']), None)
+
+            # Déterminer le type d'action basé sur message_type et subtype
+            action_type = determine_action_type(msg)
+
+            # Construire un nom descriptif pour l'action avec le vrai nom
+            action_name = build_action_name(msg, action_type, enriched_name)
+
+            # Convertir le timestamp UTC en heure locale Paris
+            datetime_paris = convert_utc_to_paris(msg['date'])
+
+            all_events.append({
+                'datetime': datetime_paris,  # Timestamp converti en heure locale
+                'type': action_type,
+                'name': action_name,
+                'id': msg['res_id'],  # ID du record concerné (pas du message)
+                'model': msg['model'],
+                'url': f"{ODOO_URL}/web#id={msg['res_id']}&model={msg['model']}&view_type=form",
+                'message_id': msg['id'],  # Gardé pour référence
+                # Champs enrichis accessibles
+                'subject': msg.get('subject'),
+                'body': msg.get('body'),
+                'preview': msg.get('preview'),
+                'record_name': enriched_name or msg.get('record_name'),
+                'message_type': msg.get('message_type'),
+                'subtype_id': msg.get('subtype_id'),
+                'attachment_ids': msg.get('attachment_ids', []),
+                'partner_ids': msg.get('partner_ids', []),
+                'email_from': msg.get('email_from'),
+                # Champs non récupérés (nécessitent droits admin ou non nécessaires)
+                # 'tracking_value_ids', 'is_internal', 'record_company_id', 'parent_id',
+                # 'mail_activity_type_id', 'rating_value', 'starred', 'pinned_at'
+            })
+        else:
+            # DEBUG: Log des messages filtrés
+            print(f"[DEBUG] Message filtré (id={msg.get('id')}): date={msg.get('date')}, model={msg.get('model')}, res_id={msg.get('res_id')}")
+
+    # DEBUG: Log du nombre de messages après filtrage
+    print(f"[DEBUG] Messages après filtrage (date/model/res_id présents) : {filtered_count}")
+
+    # 3. MAIL.ACTIVITY - Activités terminées (complément pour ce qui n'est pas dans mail.message)
+    for activity in sources['activities']:
+        if activity.get('date_done'):
+            # Format ultra-explicite : Activité "{Résumé}" sur {Type} : {Nom objet}
+            summary = activity.get('summary', 'Activité sans nom')
+            res_model = activity.get('res_model', '')
+            res_name = activity.get('res_name', f"#{activity.get('res_id', '?')}")
+            model_type = get_model_display_name(res_model)
+
+            # Format final explicite
+            activity_name = f'Activité "{summary}" sur {model_type} : {res_name}'
+
+            # Convertir le timestamp UTC en heure locale Paris
+            # Note: date_done est de type date (pas datetime), mais on le convertit quand même
+            datetime_paris = convert_utc_to_paris(activity['date_done'])
+
+            all_events.append({
+                'datetime': datetime_paris,  # Timestamp converti en heure locale
+                'type': 'Activité',
+                'name': activity_name,
+                'id': activity.get('res_id', activity['id']),
+                'model': activity.get('res_model', 'mail.activity'),
+                'url': f"{ODOO_URL}/web#id={activity.get('res_id', activity['id'])}&model={activity.get('res_model', 'mail.activity')}&view_type=form"
+            })
 
-        # 2. MAIL.MESSAGE - Capture TOUT ce qui est tracké dans Odoo
-        # Utilise un filtre OR pour capturer:
-        # - create_uid: notifications système créées par le user
-        # - author_id: notes/emails écrits par le partner
-        messages_result = odoo_search(
-            model='mail.message',
-            domain=[
-                '|',
-                ['create_uid', '=', user_id],      # Notifs système créées par le user
-                ['author_id', '=', partner_id],    # Notes/emails écrits par le partner
-                ['date', '>=', start_date],
-                ['date', '<=', end_date]
-            ],
-            fields=[
-                'id', 'subject', 'body', 'preview', 'date', 'model', 'res_id',
-                'message_type', 'subtype_id', 'record_name',
-                # Champs enrichis accessibles sans droits admin
-                'attachment_ids',      # Pièces jointes
-                'partner_ids',         # Utilisateurs tagués
-                'email_from',          # Expéditeur email
-                # Champs nécessitant droits admin (désactivés)
-                # 'tracking_value_ids',  # Nécessite groupe Administration/Settings
-                # Champs secondaires (non nécessaires pour l'instant)
-                # 'is_internal', 'record_company_id', 'parent_id', 'mail_activity_type_id',
-                # 'rating_value', 'starred', 'pinned_at'
-            ],
-            limit=100000  # Limite très élevée pour historique complet (inatteignable en pratique)
-        )
-        messages_response = json.loads(messages_result)
-
-        # DEBUG: Log de la réponse brute
-        print(f"[DEBUG] Statut de la requête mail.message : {messages_response.get('status')}")
-        if messages_response.get('status') != 'success':
-            print(f"[DEBUG] ERREUR dans la requête mail.message: {messages_response.get('error', 'Erreur inconnue')}")
-
-        # Enrichir les messages avec les vrais display_name en batch
-        messages_list = messages_response.get('records', []) if messages_response.get('status') == 'success' else []
-        display_names_map = enrich_messages_with_display_names(messages_list)
-
-        # DEBUG: Log du nombre de messages récupérés
-        print(f"[DEBUG] Messages récupérés de mail.message : {len(messages_list)}")
-
-        if messages_response.get('status') == 'success':
-            filtered_count = 0
-            for msg in messages_list:
-                if msg.get('date') and msg.get('model') and msg.get('res_id'):
-                    filtered_count += 1
-                    # Récupérer le vrai display_name depuis le map
-                    enriched_name = display_names_map.get((msg['model'], msg['res_id']), None)
-
-                    # Déterminer le type d'action basé sur message_type et subtype
-                    action_type = determine_action_type(msg)
-
-                    # Construire un nom descriptif pour l'action avec le vrai nom
-                    action_name = build_action_name(msg, action_type, enriched_name)
-
-                    # Convertir le timestamp UTC en heure locale Paris
-                    datetime_paris = convert_utc_to_paris(msg['date'])
-
-                    all_events.append({
-                        'datetime': datetime_paris,  # Timestamp converti en heure locale
-                        'type': action_type,
-                        'name': action_name,
-                        'id': msg['res_id'],  # ID du record concerné (pas du message)
-                        'model': msg['model'],
-                        'url': f"{ODOO_URL}/web#id={msg['res_id']}&model={msg['model']}&view_type=form",
-                        'message_id': msg['id'],  # Gardé pour référence
-                        # Champs enrichis accessibles
-                        'subject': msg.get('subject'),
-                        'body': msg.get('body'),
-                        'preview': msg.get('preview'),
-                        'record_name': enriched_name or msg.get('record_name'),
-                        'message_type': msg.get('message_type'),
-                        'subtype_id': msg.get('subtype_id'),
-                        'attachment_ids': msg.get('attachment_ids', []),
-                        'partner_ids': msg.get('partner_ids', []),
-                        'email_from': msg.get('email_from'),
-                        # Champs non récupérés (nécessitent droits admin ou non nécessaires)
-                        # 'tracking_value_ids', 'is_internal', 'record_company_id', 'parent_id',
-                        # 'mail_activity_type_id', 'rating_value', 'starred', 'pinned_at'
-                    })
-                else:
-                    # DEBUG: Log des messages filtrés
-                    print(f"[DEBUG] Message filtré (id={msg.get('id')}): date={msg.get('date')}, model={msg.get('model')}, res_id={msg.get('res_id')}")
-
-            # DEBUG: Log du nombre de messages après filtrage
-            print(f"[DEBUG] Messages après filtrage (date/model/res_id présents) : {filtered_count}")
-
-        # 2. MAIL.ACTIVITY - Activités terminées (complément pour ce qui n'est pas dans mail.message)
-        activities_result = odoo_search(
-            model='mail.activity',
-            domain=[
-                ['active', '=', False],
-                ['state', '=', 'done'],
-                ['date_done', '>=', start_date],
-                ['date_done', '<=', end_date],
-                ['user_id', '=', user_id]
-            ],
-            fields=['id', 'summary', 'date_done', 'res_model', 'res_id', 'res_name'],
-            limit=100000  # Limite très élevée pour historique complet (inatteignable en pratique)
-        )
-        activities_response = json.loads(activities_result)
-        if activities_response.get('status') == 'success':
-            for activity in activities_response.get('records', []):
-                if activity.get('date_done'):
-                    # Format ultra-explicite : Activité "{Résumé}" sur {Type} : {Nom objet}
-                    summary = activity.get('summary', 'Activité sans nom')
-                    res_model = activity.get('res_model', '')
-                    res_name = activity.get('res_name', f"#{activity.get('res_id', '?')}")
-                    model_type = get_model_display_name(res_model)
-
-                    # Format final explicite
-                    activity_name = f'Activité "{summary}" sur {model_type} : {res_name}'
-
-                    # Convertir le timestamp UTC en heure locale Paris
-                    # Note: date_done est de type date (pas datetime), mais on le convertit quand même
-                    datetime_paris = convert_utc_to_paris(activity['date_done'])
-
-                    all_events.append({
-                        'datetime': datetime_paris,  # Timestamp converti en heure locale
-                        'type': 'Activité',
-                        'name': activity_name,
-                        'id': activity.get('res_id', activity['id']),
-                        'model': activity.get('res_model', 'mail.activity'),
-                        'url': f"{ODOO_URL}/web#id={activity.get('res_id', activity['id'])}&model={activity.get('res_model', 'mail.activity')}&view_type=form"
-                    })
-
-        # DEBUG: Log du nombre total d'événements avant tri
-        print(f"[DEBUG] Total événements ajoutés à all_events (messages + activités) : {len(all_events)}")
-
-        # DEBUG: Log d'un échantillon de timestamps convertis
-        if all_events:
-            sample_event = all_events[0]
-            print(f"[DEBUG] Exemple de timestamp converti: {sample_event.get('datetime')} pour événement '{sample_event.get('name', 'N/A')[:50]}'")
-
-        # Trier tous les événements par datetime
-        all_events.sort(key=lambda x: x['datetime'])
-
-        # Grouper par jour avec DEUX listes séparées
-        # Raison: Les activités n'ont pas d'heure (champ date_done est de type date, pas datetime)
-        # donc on les sépare visuellement des autres événements qui ont des timestamps précis
-        daily_timeline = {}
-        current_date = datetime.datetime.fromisoformat(start_date)
-        end_date_obj = datetime.datetime.fromisoformat(end_date)
-
-        # Générer tous les jours de la période avec structure à deux listes
-        while current_date <= end_date_obj:
-            date_str = current_date.strftime('%Y-%m-%d')
-            daily_timeline[date_str] = {
-                'activites': [],  # Activités sans timestamp (date_done = date only)
-                'autres_evenements': []  # Autres événements avec timestamp précis
-            }
-            current_date += datetime.timedelta(days=1)
-
-        # DEBUG: Log des jours générés dans daily_timeline
-        print(f"[DEBUG] Jours générés dans daily_timeline : {list(daily_timeline.keys())}")
-
-        # Répartir les événements dans les bonnes listes
-        events_distributed = 0
-        events_outside_range = 0
-        for event in all_events:
-            event_date = event['datetime'][:10]  # Extract YYYY-MM-DD
-            if event_date in daily_timeline:
-                events_distributed += 1
-                if event['type'] == 'Activité':
-                    # Les activités vont dans leur propre section (pas d'heure affichée)
-                    daily_timeline[event_date]['activites'].append(event)
-                else:
-                    # Tout le reste a un timestamp précis
-                    daily_timeline[event_date]['autres_evenements'].append(event)
+    # DEBUG: Log du nombre total d'événements avant tri
+    print(f"[DEBUG] Total événements ajoutés à all_events (messages + activités) : {len(all_events)}")
+
+    # DEBUG: Log d'un échantillon de timestamps convertis
+    if all_events:
+        sample_event = all_events[0]
+        print(f"[DEBUG] Exemple de timestamp converti: {sample_event.get('datetime')} pour événement '{sample_event.get('name', 'N/A')[:50]}'")
+
+    # Trier tous les événements par datetime
+    all_events.sort(key=lambda x: x['datetime'])
+
+    # Grouper par jour avec DEUX listes séparées
+    # Raison: Les activités n'ont pas d'heure (champ date_done est de type date, pas datetime)
+    # donc on les sépare visuellement des autres événements qui ont des timestamps précis
+    daily_timeline = {}
+    current_date = datetime.datetime.fromisoformat(start_date)
+    end_date_obj = datetime.datetime.fromisoformat(end_date)
+
+    # Générer tous les jours de la période avec structure à deux listes
+    while current_date <= end_date_obj:
+        date_str = current_date.strftime('%Y-%m-%d')
+        daily_timeline[date_str] = {
+            'activites': [],  # Activités sans timestamp (date_done = date only)
+            'autres_evenements': []  # Autres événements avec timestamp précis
+        }
+        current_date += datetime.timedelta(days=1)
+
+    # DEBUG: Log des jours générés dans daily_timeline
+    print(f"[DEBUG] Jours générés dans daily_timeline : {list(daily_timeline.keys())}")
+
+    # Répartir les événements dans les bonnes listes
+    events_distributed = 0
+    events_outside_range = 0
+    for event in all_events:
+        event_date = event['datetime'][:10]  # Extract YYYY-MM-DD
+        if event_date in daily_timeline:
+            events_distributed += 1
+            if event['type'] == 'Activité':
+                # Les activités vont dans leur propre section (pas d'heure affichée)
+                daily_timeline[event_date]['activites'].append(event)
             else:
-                events_outside_range += 1
-                # DEBUG: Log des événements hors plage
-                print(f"[DEBUG] Événement hors plage ({event_date} not in timeline): {event.get('name', 'N/A')}")
+                # Tout le reste a un timestamp précis
+                daily_timeline[event_date]['autres_evenements'].append(event)
+        else:
+            events_outside_range += 1
+            # DEBUG: Log des événements hors plage
+            print(f"[DEBUG] Événement hors plage ({event_date} not in timeline): {event.get('name', 'N/A')}")
 
-        # DEBUG: Log du nombre d'événements distribués
-        print(f"[DEBUG] Événements distribués dans daily_timeline : {events_distributed}")
-        print(f"[DEBUG] Événements hors plage de dates : {events_outside_range}")
+    # DEBUG: Log du nombre d'événements distribués
+    print(f"[DEBUG] Événements distribués dans daily_timeline : {events_distributed}")
+    print(f"[DEBUG] Événements hors plage de dates : {events_outside_range}")
 
-        # DEBUG: Log du contenu de chaque jour
-        for date_key, date_events in daily_timeline.items():
-            total_day_events = len(date_events['activites']) + len(date_events['autres_evenements'])
-            if total_day_events > 0:
-                print(f"[DEBUG] {date_key}: {len(date_events['activites'])} activités + {len(date_events['autres_evenements'])} autres événements = {total_day_events} total")
+    # DEBUG: Log du contenu de chaque jour
+    for date_key, date_events in daily_timeline.items():
+        total_day_events = len(date_events['activites']) + len(date_events['autres_evenements'])
+        if total_day_events > 0:
+            print(f"[DEBUG] {date_key}: {len(date_events['activites'])} activités + {len(date_events['autres_evenements'])} autres événements = {total_day_events} total")
 
-        return daily_timeline
+    return daily_timeline
 
-    except Exception as e:
-        raise Exception(f"Error collecting daily timeline data: {str(e)}")
 
+def html_excerpt(html_content, max_length: int = 200) -> str:
+    """Strip the tags of an Odoo HTML field and cut it to max_length characters (followed by '...')"""
+    text = _HTML_TAG_RE.sub('', html_content).strip() if html_content else ''
+    return text[:max_length] + '...' if len(text) > max_length else text
 
-def collect_activities_data(
-        start_date: str,
-        end_date: str,
-        user_id: int
-        ):
-    """Collect all activities data for the report"""
-    try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
 
-        # Nombres (comme avant)
-        activites_realisees_count = get_activity_count([
+@wrap_errors("getting completed activities details")
+def get_completed_activities_details(start_date: str, end_date: str, user_id: int):
+    """Get detailed list of completed activities with links"""
+    records = odoo_search_read(
+        model='mail.activity',
+        domain=[
             ['active', '=', False],
             ['state', '=', 'done'],
             ['date_done', '>=', start_date],
-            ['date_done', '<=', end_date],
-            ['user_id', '=', user_id]
-        ])
-
-        activites_retard = get_activity_count([
-            ['active', '=', True],
-            ['state', '!=', 'done'],
-            ['date_deadline', '<', today],
-            ['user_id', '=', user_id]
-        ])
-
-        activites_delais = get_activity_count([
-            ['active', '=', True],
-            ['state', '!=', 'done'],
-            ['date_deadline', '>=', today],
-            ['user_id', '=', user_id]
-        ])
-
-        activites_cours_total = get_activity_count([
-            ['active', '=', True],
-            ['state', '!=', 'done'],
+            ['date_done', '<=', end_date], 
             ['user_id', '=', user_id]
-        ])
-
-        # Listes détaillées (nouveau)
-        activites_realisees_details = get_completed_activities_details(
-            start_date,
-            end_date,
-            user_id
-            )
-
-        # Timeline chronologique jour par jour (nouveau)
-        daily_timeline = collect_daily_timeline_data(start_date, end_date, user_id)
-
-        return {
-            "activites_realisees": activites_realisees_count,
-            "activites_retard": activites_retard,
-            "activites_delais": activites_delais,
-            "activites_cours_total": activites_cours_total,
-            "activites_realisees_details": activites_realisees_details,
-            "daily_timeline": daily_timeline
+        ],
+        fields=['id', 'summary', 'date_done', 'res_model', 'res_id', 'note', 'activity_type_id'],
+        limit=50
+    )
+    
+    return [
+        {
+            'name': activity.get('summary') or 'Activité sans nom',
+            'url': ACTIVITY_URL_PREFIX + str(activity['id']),
+            'date': activity.get('date_done', ''),
+            'note': html_excerpt(activity.get('note')),
+            'type': (activity.get('activity_type_id') or (0, 'N/A'))[1],
+            'related_model': activity.get('res_model', 'N/A')
         }
+        for activity in records
+    ]
 
-    except Exception as e:
-        raise Exception(f"Error collecting activities data: {str(e)}")
-
-
-def collect_tasks_data(
-        start_date: str,
-        end_date: str,
-        user_id: int
-        ):
-    """Collect all tasks data for the report"""
-    try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        
-        # Nombres (comme avant)
-        taches_realisees_count = get_task_count([
+@wrap_errors("getting completed tasks details")
+def get_completed_tasks_details(start_date: str, end_date: str, user_id: int):
+    """Get detailed list of completed tasks with links"""
+    records = odoo_search_read(
+        model='project.task',
+        domain=[
             ['user_ids', 'in', [user_id]],
             ['state', '=', '1_done'],
             ['date_last_stage_update', '>=', start_date],
             ['date_last_stage_update', '<=', end_date]
-        ])
-        
-        taches_retard = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress'],
-            ['date_deadline', '!=', False],
-            ['date_deadline', '<', today]
-        ])
-        
-        taches_delais = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress'],
-            ['date_deadline', '!=', False],
-            ['date_deadline', '>=', today]
-        ])
-        
-        taches_sans_delais = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress'],
-            ['date_deadline', '=', False]
-        ])
-        
-        taches_cours_total = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress']
-        ])
-        
-        # Listes détaillées (nouveau)
-        taches_realisees_details = get_completed_tasks_details(start_date, end_date, user_id)
-        
-        return {
-            "taches_realisees": taches_realisees_count,
-            "taches_retard": taches_retard,
-            "taches_delais": taches_delais,
-            "taches_sans_delais": taches_sans_delais,
-            "taches_cours_total": taches_cours_total,
-            "taches_realisees_details": taches_realisees_details
+        ],
+        fields=['id', 'name', 'date_last_stage_update', 'project_id', 'description', 'tag_ids', 'partner_id'],
+        limit=50
+    )
+    
+    return [
+        {
+            'name': task.get('name') or 'Tâche sans nom',
+            'url': TASK_URL_PREFIX + str(task['id']),
+            'date': task.get('date_last_stage_update', ''),
+            'project': (task.get('project_id') or (0, 'N/A'))[1],
+            'client': (task.get('partner_id') or (0, 'N/A'))[1],
+            'description': html_excerpt(task.get('description')),
+            'tag_ids': task.get('tag_ids', [])
         }
-        
-    except Exception as e:
-        raise Exception(f"Error collecting tasks data: {str(e)}")
+        for task in records
+    ]
 
-def collect_projects_data(start_date: str, end_date: str, user_id: int):
-    """Collect all projects data for the report"""
-    try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        
-        # Nombres (comme avant)
-        projets_realises_count = get_completed_projects_count(start_date, end_date, user_id)
-        
-        projets_retard = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done'],
-            ['date', '!=', False],
-            ['date', '<', today]
-        ])
-        
-        projets_delais = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done'],
-            ['date', '!=', False],
-            ['date', '>=', today]
-        ])
-        
-        projets_sans_dates = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done'],
-            ['date', '=', False]
-        ])
-        
-        projets_cours_total = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done']
-        ])
-        
-        # Listes détaillées (nouveau)
-        projets_realises_details = get_completed_projects_details(start_date, end_date, user_id)
-        
-        return {
-            "projets_realises": projets_realises_count,
-            "projets_retard": projets_retard,
-            "projets_delais": projets_delais,
-            "projets_sans_dates": projets_sans_dates,
-            "projets_cours_total": projets_cours_total,
-            "projets_realises_details": projets_realises_details
-        }
-        
-    except Exception as e:
-        raise Exception(f"Error collecting projects data: {str(e)}")
+@wrap_errors("getting completed projects")
+def fetch_completed_projects(start_date: str, end_date: str, user_id: int):
+    """
+    Get the projects completed in the period where the user participates.
 
-def get_completed_activities_details(start_date: str, end_date: str, user_id: int):
-    """Get detailed list of completed activities with links"""
-    try:
-        result = odoo_search(
-            model='mail.activity',
-            domain=[
-                ['active', '=', False],
-                ['state', '=', 'done'],
-                ['date_done', '>=', start_date],
-                ['date_done', '<=', end_date], 
-                ['user_id', '=', user_id]
-            ],
-            fields=['id', 'summary', 'date_done', 'res_model', 'res_id', 'note', 'activity_type_id'],
-            limit=50
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            activities = []
-            for activity in response.get('records', []):
-                activity_url = f"{ODOO_URL}/web#id={activity['id']}&model=mail.activity&view_type=form"
-                # Extract additional fields
-                note = activity.get('note', '') or ''
-                # Clean HTML from note
-                import re
-                note_clean = re.sub(r'<[^>]*>', '', note).strip() if note else ''
-                activity_type = activity.get('activity_type_id', [False, 'N/A'])[1] if activity.get('activity_type_id') else 'N/A'
-                related_model = activity.get('res_model', 'N/A')
-
-                activities.append({
-                    'name': activity.get('summary', 'Activité sans nom'),
-                    'url': activity_url,
-                    'date': activity.get('date_done', ''),
-                    'note': note_clean[:200] + '...' if len(note_clean) > 200 else note_clean,
-                    'type': activity_type,
-                    'related_model': related_model
-                })
-            return activities
-        return []
-        
-    except Exception as e:
-        raise Exception(f"Error getting completed activities details: {str(e)}")
+    The two-stage search (project.update -> project.project) is done once for
+    both the count and the detailed list.
 
-def get_completed_tasks_details(start_date: str, end_date: str, user_id: int):
-    """Get detailed list of completed tasks with links"""
-    try:
-        result = odoo_search(
-            model='project.task',
-            domain=[
-                ['user_ids', 'in', [user_id]],
-                ['state', '=', '1_done'],
-                ['date_last_stage_update', '>=', start_date],
-                ['date_last_stage_update', '<=', end_date]
+    Returns:
+        Tuple (count, details) with details the list of completed projects with links
+    """
+    # Étape 1: Projets ayant une project.update avec status="done" dans la période
+    # (read_group : un groupe par projet, la date de completion la plus récente)
+    updates_response = odoo_execute(
+        model='project.update',
+        method='read_group',
+        args=[
+            [
+                ['status', '=', 'done'],
+                ['date', '>=', start_date],
+                ['date', '<=', end_date]
             ],
-            fields=['id', 'name', 'date_last_stage_update', 'project_id', 'description', 'tag_ids', 'partner_id'],
-            limit=50
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            tasks = []
-            for task in response.get('records', []):
-                task_url = f"{ODOO_URL}/web#id={task['id']}&model=project.task&view_type=form"
-                # Extract additional fields
-                project_name = task.get('project_id', [False, 'N/A'])[1] if task.get('project_id') else 'N/A'
-                client_name = task.get('partner_id', [False, 'N/A'])[1] if task.get('partner_id') else 'N/A'
-                description = task.get('description', '') or ''
-                # Clean HTML from description
-                import re
-                description_clean = re.sub(r'<[^>]*>', '', description).strip() if description else ''
-
-                tasks.append({
-                    'name': task.get('name', 'Tâche sans nom'),
-                    'url': task_url,
-                    'date': task.get('date_last_stage_update', ''),
-                    'project': project_name,
-                    'client': client_name,
-                    'description': description_clean[:200] + '...' if len(description_clean) > 200 else description_clean,
-                    'tag_ids': task.get('tag_ids', [])
-                })
-            return tasks
-        return []
-        
-    except Exception as e:
-        raise Exception(f"Error getting completed tasks details: {str(e)}")
+            ['date:max'],
+            ['project_id']
+        ],
+        kwargs={'lazy': False}
+    )
+    if updates_response.get('status') != 'success':
+        raise Exception(f"Updates search failed: {updates_response.get('error', 'Unknown error')}")
+
+    # Récupérer les IDs des projets avec leur date de completion
+    project_updates = {}
+    for group in updates_response.get('result', []):
+        if group.get('project_id'):
+            project_updates[group['project_id'][0]] = group.get('date') or ''
+
+    if not project_updates:
+        return 0, []
+
+    # Étape 2: Récupérer les projets où l'utilisateur participe (50 au plus pour la
+    # liste détaillée ; le total n'est compté à part que si cette limite est atteinte)
+    projects_domain = [
+        ['id', 'in', list(project_updates.keys())],
+        '|',
+        ['user_id', '=', user_id],
+        ['favorite_user_ids', 'in', [user_id]]
+    ]
+    records = odoo_search_read(
+        model='project.project',
+        domain=projects_domain,
+        fields=['id', 'name', 'description', 'partner_id', 'tag_ids'],
+        limit=50
+    )
+    count = len(records)
+    if count == 50:
+        count = odoo_search_count('project.project', projects_domain)
+
+    projects = [
+        {
+            'name': project.get('name') or 'Projet sans nom',
+            'url': PROJECT_URL_PREFIX + str(project['id']),
+            'date': project_updates.get(project['id'], ''),
+            'description': html_excerpt(project.get('description')),
+            'client': (project.get('partner_id') or (0, 'N/A'))[1],
+            'tag_ids': project.get('tag_ids', [])
+        }
+        for project in records
+    ]
+
+    return count, projects
+
 
 def get_completed_projects_details(start_date: str, end_date: str, user_id: int):
     """Get detailed list of completed projects with links"""
-    try:
-        # Étape 1: Chercher les project.update avec status="done" dans la période
-        updates_result = odoo_search(
-            model='project.update',
-            domain=[
-                ['status', '=', 'done'],
-                ['date', '>=', start_date], 
-                ['date', '<=', end_date]
-            ],
-            fields=['project_id', 'date'],
-            limit=50
-        )
-        
-        updates_response = json.loads(updates_result)
-        if updates_response.get('status') != 'success':
-            return []
-        
-        # Récupérer les IDs des projets avec leur date de completion
-        project_updates = {}
-        for update in updates_response.get('records', []):
-            if update.get('project_id'):
-                project_id = update['project_id'][0]
-                project_updates[project_id] = update.get('date', '')
-        
-        if not project_updates:
-            return []
-        
-        # Étape 2: Récupérer les détails des projets où l'utilisateur participe
-        projects_result = odoo_search(
-            model='project.project',
-            domain=[
-                ['id', 'in', list(project_updates.keys())],
-                '|',
-                ['user_id', '=', user_id],
-                ['favorite_user_ids', 'in', [user_id]]
-            ],
-            fields=['id', 'name', 'description', 'partner_id', 'tag_ids'],
-            limit=50
-        )
-        
-        projects_response = json.loads(projects_result)
-        if projects_response.get('status') == 'success':
-            projects = []
-            for project in projects_response.get('records', []):
-                project_url = f"{ODOO_URL}/web#id={project['id']}&model=project.project&view_type=kanban"
-                # Extract additional fields
-                description = project.get('description', '') or ''
-                # Clean HTML from description
-                import re
-                description_clean = re.sub(r'<[^>]*>', '', description).strip() if description else ''
-                client_name = project.get('partner_id', [False, 'N/A'])[1] if project.get('partner_id') else 'N/A'
-
-                projects.append({
-                    'name': project.get('name', 'Projet sans nom'),
-                    'url': project_url,
-                    'date': project_updates.get(project['id'], ''),
-                    'description': description_clean[:200] + '...' if len(description_clean) > 200 else description_clean,
-                    'client': client_name,
-                    'tag_ids': project.get('tag_ids', [])
-                })
-            return projects
-        return []
-        
-    except Exception as e:
-        raise Exception(f"Error getting completed projects details: {str(e)}")
+    return fetch_completed_projects(start_date, end_date, user_id)[1]
 
 
-def get_activity_count(domain):
-    """Get count of mail.activity with given domain"""
-    try:
-        result = odoo_execute(
-            model='mail.activity',
-            method='search_count',
-            args=[domain]
-        )
+def odoo_search_count(model: str, domain):
+    """
+    Count the records of model matching domain with a server-side search_count
+    (a single integer on the wire, no ids transferred).
+    """
+    response = odoo_execute(
+        model=model,
+        method='search_count',
+        args=[domain]
+    )
+    if response.get('status') == 'success':
+        return response.get('result', 0)
+    raise Exception(f"Search failed: {response.get('error', response.get('message', 'Unknown error'))}")
 
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('result', 0)
-        else:
-            raise Exception(
-                f"Search failed: {
-                    response.get(
-                        'error', 'Unknown error'
-                        )
-                        }"
-                        )
 
-    except Exception as e:
-        raise Exception(f"Error getting activity count: {str(e)}")
+@wrap_errors("getting activity count")
+def get_activity_count(domain):
+    """Get count of mail.activity with given domain"""
+    return odoo_search_count('mail.activity', domain)
 
 
+@wrap_errors("getting task count")
 def get_task_count(domain):
     """Get count of project.task with given domain"""
-    try:
-        result = odoo_execute(
-            model='project.task',
-            method='search_count',
-            args=[domain]
-        )
-
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('result', 0)
-        else:
-            raise Exception(
-                f"Search failed: {
-                    response.get(
-                        'error', 'Unknown error'
-                        )
-                        }"
-                        )
-
-    except Exception as e:
-        raise Exception(f"Error getting task count: {str(e)}")
+    return odoo_search_count('project.task', domain)
 
 
+@wrap_errors("getting project count")
 def get_project_count(domain):
     """Get count of project.project with given domain"""
-    try:
-        result = odoo_search(
-            model='project.project',
-            domain=domain,
-            fields=['id']
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('returned_count', 0)
+    return odoo_search_count('project.project', domain)
+
+@wrap_errors("counting by deadline")
+def count_by_deadline(model: str, domain: list, today: str, date_field: str = 'date_deadline') -> dict:
+    """
+    Count the records of model matching domain, split by deadline, in a single
+    read_group grouped by day of date_field (instead of one search_count per bucket).
+
+    Returns:
+        Dict {'retard': deadline before today, 'delais': deadline today or later,
+              'sans_delais': no deadline, 'total': all records}
+    """
+    groupby = f'{date_field}:day'
+    groups = execute_kw(model, 'read_group', [domain, [date_field], [groupby]], {'lazy': False})
+
+    counts = {'retard': 0, 'delais': 0, 'sans_delais': 0, 'total': 0}
+    for group in groups:
+        count = group.get('__count', 0)
+        counts['total'] += count
+        if not group.get(groupby):
+            counts['sans_delais'] += count
+        elif group['__range'][groupby]['from'][:10] < today:
+            counts['retard'] += count
         else:
-            raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
-            
-    except Exception as e:
-        raise Exception(f"Error getting project count: {str(e)}")
+            counts['delais'] += count
+    return counts
+
 
 def get_completed_projects_count(start_date: str, end_date: str, user_id: int):
     """Get count of projects completed in period (complex logic with project.update)"""
-    try:
-        # Étape 1: Chercher les project.update avec status="done" dans la période
-        updates_result = odoo_search(
-            model='project.update',
-            domain=[
-                ['status', '=', 'done'],
-                ['date', '>=', start_date],
-                ['date', '<=', end_date]
-            ],
-            fields=['project_id']
-        )
+    return fetch_completed_projects(start_date, end_date, user_id)[0]
 
-        updates_response = json.loads(updates_result)
-        if updates_response.get('status') != 'success':
-            raise Exception(f"Updates search failed: {updates_response.get('error', 'Unknown error')}")
-
-        # Récupérer les IDs des projets
-        project_ids = []
-        for update in updates_response.get('records', []):
-            if update.get('project_id'):
-                project_ids.append(update['project_id'][0])
-
-        if not project_ids:
-            return 0
-
-        # Étape 2: Compter les projets où l'utilisateur participe
-        completed_projects_result = odoo_execute(
-            model='project.project',
-            method='search_count',
-            args=[[
-                ['id', 'in', project_ids],
-                '|',
-                ['user_id', '=', user_id],
-                ['favorite_user_ids', 'in', [user_id]]
-            ]]
-        )
 
-        completed_response = json.loads(completed_projects_result)
-        if completed_response.get('status') == 'success':
-            return completed_response.get('result', 0)
-        else:
-            raise Exception(f"Projects search failed: {completed_response.get('error', 'Unknown error')}")
+def gather_concurrently(tasks: dict) -> dict:
+    """
+    Run independent Odoo queries in parallel (run_concurrently) and return
+    their results, re-raising the first failure.
 
-    except Exception as e:
-        raise Exception(f"Error getting completed projects count: {str(e)}")
+    Args:
+        tasks: Dict {key: callable without arguments}
+
+    Returns:
+        Dict {key: result}, in the order of tasks
+    """
+    results = run_concurrently(tasks)
+    for value in results.values():
+        if isinstance(value, Exception):
+            raise value
+    return results
 
 
+@wrap_errors("collecting activities data")
 def collect_activities_data(
         start_date: str,
         end_date: str,
-        user_id: int
+        user_id: int,
+        today: str = None
         ):
-    """Collect all activities data for the report"""
-    try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
+    """
+    Collect all activities data for the report
+
+    today (YYYY-MM-DD) is the late/on-time cutoff, passed by the report so that
+    all collectors share the same one (current date if omitted)
+    """
+    today = today or datetime.datetime.now().strftime('%Y-%m-%d')
 
-        # Nombres (comme avant)
-        activites_realisees_count = get_activity_count([
+    # Comptages et liste détaillée indépendants : requêtes lancées en parallèle
+    results = gather_concurrently({
+        "activites_realisees": lambda: get_activity_count([
             ['active', '=', False],
             ['state', '=', 'done'],
             ['date_done', '>=', start_date],
             ['date_done', '<=', end_date],
             ['user_id', '=', user_id]
-        ])
-
-        activites_retard = get_activity_count([
-            ['active', '=', True],
-            ['state', '!=', 'done'],
-            ['date_deadline', '<', today],
-            ['user_id', '=', user_id]
-        ])
-
-        activites_delais = get_activity_count([
-            ['active', '=', True],
-            ['state', '!=', 'done'],
-            ['date_deadline', '>=', today],
-            ['user_id', '=', user_id]
-        ])
-
-        activites_cours_total = get_activity_count([
+        ]),
+        # Retard / dans les délais / total en cours : un seul read_group
+        "en_cours": lambda: count_by_deadline('mail.activity', [
             ['active', '=', True],
             ['state', '!=', 'done'],
             ['user_id', '=', user_id]
-        ])
-
+        ], today),
         # Listes détaillées (nouveau)
-        activites_realisees_details = get_completed_activities_details(
+        "activites_realisees_details": lambda: get_completed_activities_details(
             start_date,
             end_date,
             user_id
-            )
-
-        return {
-            "activites_realisees": activites_realisees_count,
-            "activites_retard": activites_retard,
-            "activites_delais": activites_delais,
-            "activites_cours_total": activites_cours_total,
-            "activites_realisees_details": activites_realisees_details
-        }
-
-    except Exception as e:
-        raise Exception(f"Error collecting activities data: {str(e)}")
+        )
+    })
+
+    en_cours = results.pop("en_cours")
+    return {
+        "activites_realisees": results["activites_realisees"],
+        "activites_retard": en_cours['retard'],
+        "activites_delais": en_cours['delais'],
+        "activites_cours_total": en_cours['total'],
+        "activites_realisees_details": results["activites_realisees_details"]
+    }
 
 
+@wrap_errors("collecting tasks data")
 def collect_tasks_data(
         start_date: str,
         end_date: str,
-        user_id: int
+        user_id: int,
+        today: str = None
         ):
-    """Collect all tasks data for the report"""
-    try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
+    """Collect all tasks data for the report (today: see collect_activities_data)"""
+    today = today or datetime.datetime.now().strftime('%Y-%m-%d')
 
-        # Nombres (comme avant)
-        taches_realisees_count = get_task_count([
+    # Comptages et liste détaillée indépendants : requêtes lancées en parallèle
+    results = gather_concurrently({
+        "taches_realisees": lambda: get_task_count([
             ['user_ids', 'in', [user_id]],
             ['state', '=', '1_done'],
             ['date_last_stage_update', '>=', start_date],
             ['date_last_stage_update', '<=', end_date]
-        ])
-
-        taches_retard = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress'],
-            ['date_deadline', '!=', False],
-            ['date_deadline', '<', today]
-        ])
-
-        taches_delais = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress'],
-            ['date_deadline', '!=', False],
-            ['date_deadline', '>=', today]
-        ])
-
-        taches_sans_delais = get_task_count([
-            ['user_ids', 'in', [user_id]],
-            ['state', '=', '01_in_progress'],
-            ['date_deadline', '=', False]
-        ])
-
-        taches_cours_total = get_task_count([
+        ]),
+        # Retard / dans les délais / sans délais / total en cours : un seul read_group
+        "en_cours": lambda: count_by_deadline('project.task', [
             ['user_ids', 'in', [user_id]],
             ['state', '=', '01_in_progress']
-        ])
-
+        ], today),
         # Listes détaillées (nouveau)
-        taches_realisees_details = get_completed_tasks_details(start_date, end_date, user_id)
-
-        return {
-            "taches_realisees": taches_realisees_count,
-            "taches_retard": taches_retard,
-            "taches_delais": taches_delais,
-            "taches_sans_delais": taches_sans_delais,
-            "taches_cours_total": taches_cours_total,
-            "taches_realisees_details": taches_realisees_details
-        }
-
-    except Exception as e:
-        raise Exception(f"Error collecting tasks data: {str(e)}")
-
-
-def collect_projects_data(start_date: str, end_date: str, user_id: int):
-    """Collect all projects data for the report"""
-    try:
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-
-        # Nombres (comme avant)
-        projets_realises_count = get_completed_projects_count(start_date, end_date, user_id)
-
-        projets_retard = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done'],
-            ['date', '!=', False],
-            ['date', '<', today]
-        ])
+        "taches_realisees_details": lambda: get_completed_tasks_details(start_date, end_date, user_id)
+    })
+
+    en_cours = results.pop("en_cours")
+    return {
+        "taches_realisees": results["taches_realisees"],
+        "taches_retard": en_cours['retard'],
+        "taches_delais": en_cours['delais'],
+        "taches_sans_delais": en_cours['sans_delais'],
+        "taches_cours_total": en_cours['total'],
+        "taches_realisees_details": results["taches_realisees_details"]
+    }
 
-        projets_delais = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done'],
-            ['date', '!=', False],
-            ['date', '>=', today]
-        ])
 
-        projets_sans_dates = get_project_count([
-            '|',
-            ['user_id', '=', user_id],
-            ['favorite_user_ids', 'in', [user_id]],
-            ['last_update_status', '!=', 'done'],
-            ['date', '=', False]
-        ])
+@wrap_errors("collecting projects data")
+def collect_projects_data(start_date: str, end_date: str, user_id: int, today: str = None):
+    """Collect all projects data for the report (today: see collect_activities_data)"""
+    today = today or datetime.datetime.now().strftime('%Y-%m-%d')
 
-        projets_cours_total = get_project_count([
+    # Comptages indépendants : requêtes lancées en parallèle
+    results = gather_concurrently({
+        # Nombre et liste détaillée des projets réalisés (une seule recherche)
+        "projets_realises": lambda: fetch_completed_projects(start_date, end_date, user_id),
+        # Retard / dans les délais / sans dates / total en cours : un seul read_group
+        "en_cours": lambda: count_by_deadline('project.project', [
             '|',
             ['user_id', '=', user_id],
             ['favorite_user_ids', 'in', [user_id]],
             ['last_update_status', '!=', 'done']
-        ])
-
-        # Listes détaillées (nouveau)
-        projets_realises_details = get_completed_projects_details(start_date, end_date, user_id)
-
-        return {
-            "projets_realises": projets_realises_count,
-            "projets_retard": projets_retard,
-            "projets_delais": projets_delais,
-            "projets_sans_dates": projets_sans_dates,
-            "projets_cours_total": projets_cours_total,
-            "projets_realises_details": projets_realises_details
-        }
-
-    except Exception as e:
-        raise Exception(f"Error collecting projects data: {str(e)}")
+        ], today, date_field='date')
+    })
+
+    projets_realises, projets_realises_details = results["projets_realises"]
+    en_cours = results["en_cours"]
+    return {
+        "projets_realises": projets_realises,
+        "projets_retard": en_cours['retard'],
+        "projets_delais": en_cours['delais'],
+        "projets_sans_dates": en_cours['sans_delais'],
+        "projets_cours_total": en_cours['total'],
+        "projets_realises_details": projets_realises_details
+    }
 
 
 def format_activity_html(activity):
@@ -1629,190 +1563,187 @@ def generate_daily_timeline_html(daily_timeline):
         raise Exception(f"Error generating daily timeline HTML: {str(e)}")
 
 
-def generate_activity_report_html_table(report_data):
-    """Generate HTML table for activity report with detailed lists"""
-    try:
-        user_info = report_data.get('user_info', {})
-        activities_data = report_data.get('activities_data', {})
-        tasks_data = report_data.get('tasks_data', {})
-        projects_data = report_data.get('projects_data', {})
-        
-        html = f"""
-        <div class="container">
-            <h2>Rapport d'activité - {user_info.get('user_name', 'N/A')}</h2>
-            <p><strong>Période:</strong> {user_info.get('start_date', 'N/A')} au {user_info.get('end_date', 'N/A')}</p>
-            
-            <table class="table table-bordered table-striped" style="width: 100%; border-collapse: collapse; margin-top: 20px;">
-                <thead style="background-color: #f8f9fa;">
-                    <tr>
-                        <th style="border: 1px solid #dee2e6; padding: 12px; text-align: left; font-weight: bold;">Métrique</th>
-                        <th style="border: 1px solid #dee2e6; padding: 12px; text-align: right; font-weight: bold;">Valeur</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-        
-        # Section Activités
-        html += '<tr style="background-color: #e9ecef; font-weight: bold;"><td colspan="2" style="border: 1px solid #dee2e6; padding: 10px;">ACTIVITÉS</td></tr>'
-        
-        # Nombre d'activités réalisées
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Nombre d'activités réalisées dans la période donnée</td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{activities_data.get('activites_realisees', 0)}</td>
-                </tr>
-        """
-        
-        # Liste des activités réalisées
-        activites_details = activities_data.get('activites_realisees_details', [])
-        activites_list = ""
-        if activites_details:
-            activites_list = "<br>".join([f"• <a href='{act['url']}'>{act['name']}</a> ({act['date']})" for act in activites_details])
-        else:
-            activites_list = "Aucune activité réalisée"
-            
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Activités réalisées dans la période donnée</td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;">{activites_list}</td>
-                </tr>
-        """
-        
-        # Autres métriques d'activités
-        activities_labels = {
+# Gabarits HTML du rapport d'activité : définis une fois au chargement du module,
+# remplis avec str.format (pas de moteur de template en dépendance). Balisage sans
+# indentation ni retours à la ligne : la description de la tâche ne stocke que l'utile
+# Mise en forme par classes Bootstrap (chargées par l'interface Odoo) plutôt qu'en
+# style inline répété sur chaque cellule ; un bloc <style> serait retiré par le
+# nettoyage HTML du champ description
+ACTIVITY_REPORT_HEADER_TMPL = (
+    '<div class="container">'
+    "<h2>Rapport d'activité - {user_name}</h2>"
+    '<p><strong>Période:</strong> {start_date} au {end_date}</p>'
+    '<table class="table table-bordered table-striped mt-3">'
+    '<thead class="table-light"><tr><th class="text-start">Métrique</th><th class="text-end">Valeur</th></tr></thead>'
+    '<tbody>'
+)
+
+ACTIVITY_SECTION_TMPL = '<tr class="table-secondary fw-bold"><td colspan="2">{title}</td></tr>'
+
+ACTIVITY_COUNT_ROW_TMPL = '<tr><td>{label}</td><td class="text-end">{value}</td></tr>'
+
+ACTIVITY_LIST_ROW_TMPL = '<tr><td>{label}</td><td class="small">{items}</td></tr>'
+
+ACTIVITY_METRIC_ROW_TMPL = ACTIVITY_COUNT_ROW_TMPL
+
+ACTIVITY_SUMMARY_SECTION_ROW = ACTIVITY_SECTION_TMPL.format(title="RÉSUMÉ IA")
+
+ACTIVITY_SUMMARY_ROW_TMPL = '<tr><td><strong>Résumé des activités</strong></td><td>{summary}</td></tr>'
+
+ACTIVITY_REPORT_FOOTER = '</tbody></table></div>'
+
+# Sections du tableau, dans l'ordre : clés de report_data, libellés et format des puces
+ACTIVITY_REPORT_SECTIONS = [
+    {
+        "title": "ACTIVITÉS",
+        "data_key": "activities_data",
+        "count_key": "activites_realisees",
+        "count_label": "Nombre d'activités réalisées dans la période donnée",
+        "details_key": "activites_realisees_details",
+        "details_label": "Activités réalisées dans la période donnée",
+        "item_tmpl": "• <a href='{url}'>{name}</a> ({date})",
+        "labels": {
             "activites_retard": "Nombre d'activités en retard",
-            "activites_delais": "Nombre d'activités dans les délais", 
+            "activites_delais": "Nombre d'activités dans les délais",
             "activites_cours_total": "Nombre total d'activités en cours"
         }
-        
-        for key, label in activities_labels.items():
-            value = activities_data.get(key, 0)
-            html += f"""
-                    <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{value}</td>
-                    </tr>
-            """
-        
-        # Section Tâches
-        html += '<tr style="background-color: #e9ecef; font-weight: bold;"><td colspan="2" style="border: 1px solid #dee2e6; padding: 10px;">TÂCHES</td></tr>'
-        
-        # Nombre de tâches réalisées
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Nombre de tâches réalisées dans la période donnée</td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{tasks_data.get('taches_realisees', 0)}</td>
-                </tr>
-        """
-        
-        # Liste des tâches réalisées
-        taches_details = tasks_data.get('taches_realisees_details', [])
-        taches_list = ""
-        if taches_details:
-            taches_list = "<br>".join([f"• <a href='{task['url']}'>{task['name']}</a> - {task['project']} ({task['date']})" for task in taches_details])
-        else:
-            taches_list = "Aucune tâche réalisée"
-            
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Tâches réalisées dans la période donnée</td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;">{taches_list}</td>
-                </tr>
-        """
-        
-        # Autres métriques de tâches
-        tasks_labels = {
+    },
+    {
+        "title": "TÂCHES",
+        "data_key": "tasks_data",
+        "count_key": "taches_realisees",
+        "count_label": "Nombre de tâches réalisées dans la période donnée",
+        "details_key": "taches_realisees_details",
+        "details_label": "Tâches réalisées dans la période donnée",
+        "item_tmpl": "• <a href='{url}'>{name}</a> - {project} ({date})",
+        "labels": {
             "taches_retard": "Nombre de tâches en retard",
             "taches_delais": "Nombre de tâches dans les délais",
             "taches_sans_delais": "Nombre de tâches sans délais",
             "taches_cours_total": "Nombre total de tâches en cours"
         }
-        
-        for key, label in tasks_labels.items():
-            value = tasks_data.get(key, 0)
-            html += f"""
-                    <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{value}</td>
-                    </tr>
-            """
-        
-        # Section Projets
-        html += '<tr style="background-color: #e9ecef; font-weight: bold;"><td colspan="2" style="border: 1px solid #dee2e6; padding: 10px;">PROJETS</td></tr>'
-        
-        # Nombre de projets réalisés
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Nombre de projets réalisés dans la période donnée</td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{projects_data.get('projets_realises', 0)}</td>
-                </tr>
-        """
-        
-        # Liste des projets réalisés
-        projets_details = projects_data.get('projets_realises_details', [])
-        projets_list = ""
-        if projets_details:
-            projets_list = "<br>".join([f"• <a href='{proj['url']}'>{proj['name']}</a> ({proj['date']})" for proj in projets_details])
-        else:
-            projets_list = "Aucun projet réalisé"
-            
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Projets réalisés dans la période donnée</td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;">{projets_list}</td>
-                </tr>
-        """
-        
-        # Autres métriques de projets
-        projects_labels = {
+    },
+    {
+        "title": "PROJETS",
+        "data_key": "projects_data",
+        "count_key": "projets_realises",
+        "count_label": "Nombre de projets réalisés dans la période donnée",
+        "details_key": "projets_realises_details",
+        "details_label": "Projets réalisés dans la période donnée",
+        "item_tmpl": "• <a href='{url}'>{name}</a> ({date})",
+        "labels": {
             "projets_retard": "Nombre de projets en retard",
             "projets_delais": "Nombre de projets dans les délais",
             "projets_sans_dates": "Nombre de projets sans dates",
             "projets_cours_total": "Nombre total de projets en cours"
         }
-        
-        for key, label in projects_labels.items():
-            value = projects_data.get(key, 0)
-            html += f"""
-                    <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{value}</td>
-                    </tr>
-            """
-        
-        # Add Claude AI summary row
-        html += '<tr style="background-color: #e9ecef; font-weight: bold;"><td colspan="2" style="border: 1px solid #dee2e6; padding: 10px;">RÉSUMÉ IA</td></tr>'
-
-        # Generate Claude summary
-        user_name = user_info.get('user_name', 'cet utilisateur')
-        start_date = user_info.get('start_date', '')
-        end_date = user_info.get('end_date', '')
-
-        claude_summary = generate_claude_summary(
-            activities_data, tasks_data, projects_data,
-            user_name, start_date, end_date
-        )
+    }
+]
 
-        html += f"""
-                <tr>
-                    <td style="border: 1px solid #dee2e6; padding: 10px;"><strong>Résumé des activités</strong></td>
-                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left;">{claude_summary}</td>
-                </tr>
-        """
 
-        html += """
-                </tbody>
-            </table>
-        </div>
-        """
+def generate_activity_report_html_table(report_data):
+    """
+    Generate HTML table for activity report with detailed lists
 
-        # NOTE: La timeline exhaustive n'est plus incluse ici
-        # Elle sera générée en PDF séparé et attachée à la tâche
+    L'en-tête et les sections sont mis en cache par empreinte du contenu de
+    report_data ; le résumé IA est toujours régénéré, pour qu'un échec transitoire
+    de l'API (texte de repli) ne soit pas resservi aux relances.
+    """
+    user_info = report_data.get('user_info', {})
+
+    # Generate Claude summary
+    claude_summary = generate_claude_summary(
+        report_data.get('activities_data', {}),
+        report_data.get('tasks_data', {}),
+        report_data.get('projects_data', {}),
+        user_info.get('user_name', 'cet utilisateur'),
+        user_info.get('start_date', ''),
+        user_info.get('end_date', '')
+    )
+
+    # NOTE: La timeline exhaustive n'est plus incluse ici
+    # Elle sera générée en PDF séparé et attachée à la tâche
+    return "".join((
+        get_activity_report_rows(report_data),
+        ACTIVITY_SUMMARY_SECTION_ROW,
+        ACTIVITY_SUMMARY_ROW_TMPL.format(summary=claude_summary),
+        ACTIVITY_REPORT_FOOTER
+    ))
+
+
+def get_activity_report_rows(report_data) -> str:
+    """Header and section rows of the report table, cached by report_data fingerprint"""
+    try:
+        key = hashlib.sha256(orjson.dumps(
+            report_data,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )).digest()
+    except orjson.JSONEncodeError:
+        # Données non sérialisables : rendu sans cache
+        return render_activity_report_rows(report_data)
+
+    html = _report_html_cache.get(key)
+    if html is None:
+        html = render_activity_report_rows(report_data)
+        _report_html_cache.set(key, html)
+    return html
 
-        return html
 
-    except Exception as e:
-        raise Exception(f"Error generating HTML table: {str(e)}")
+@lru_cache(maxsize=None)
+def template_fields(template: str) -> tuple:
+    """Names of the replacement fields of a str.format template, parsed once per template"""
+    return tuple(name for _, name, _, _ in Formatter().parse(template) if name)
+
+
+def append_section_rows(parts: list, section: dict, data: dict):
+    """
+    Append the rows of one report section (see ACTIVITY_REPORT_SECTIONS) to parts:
+    header, realised count, detail list and metrics. Nothing is added for an empty section.
+    """
+    details = data.get(section["details_key"], [])
+
+    # Section sans aucune donnée (utilisateur inactif) : rien à afficher
+    if not details and not data.get(section["count_key"]) and not any(
+        data.get(key) for key in section["labels"]
+    ):
+        return
+
+    parts.append(ACTIVITY_SECTION_TMPL.format(title=section["title"]))
+    parts.append(ACTIVITY_COUNT_ROW_TMPL.format(
+        label=section["count_label"],
+        value=data.get(section["count_key"], 0)
+    ))
+    # Liste détaillée seulement si non vide
+    if details:
+        # Champs issus d'Odoo (noms saisis par les utilisateurs) échappés une fois ici
+        item_tmpl = section["item_tmpl"]
+        fields = template_fields(item_tmpl)
+        parts.append(ACTIVITY_LIST_ROW_TMPL.format(label=section["details_label"], items="<br>".join(
+            item_tmpl.format(**{field: escape(str(item.get(field, ''))) for field in fields})
+            for item in details
+        )))
+    parts.extend(
+        ACTIVITY_METRIC_ROW_TMPL.format(label=label, value=data.get(key, 0))
+        for key, label in section["labels"].items()
+    )
+
+
+def render_activity_report_rows(report_data) -> str:
+    """Render the header and section rows of the activity report table (uncached, without the AI summary)"""
+    user_info = report_data.get('user_info', {})
+
+    parts = [ACTIVITY_REPORT_HEADER_TMPL.format(
+        user_name=escape(str(user_info.get('user_name', 'N/A'))),
+        start_date=escape(str(user_info.get('start_date', 'N/A'))),
+        end_date=escape(str(user_info.get('end_date', 'N/A')))
+    )]
+
+    # Sections Activités / Tâches / Projets, même structure de lignes
+    for section in ACTIVITY_REPORT_SECTIONS:
+        append_section_rows(parts, section, report_data.get(section["data_key"], {}))
+
+    return "".join(parts)
+
 
 def create_activity_report_task(task_name, html_content, project_id, task_column_id, user_id):
     """
@@ -1830,7 +1761,7 @@ def create_activity_report_task(task_name, html_content, project_id, task_column
     """
     try:
         # Create task using odoo_execute
-        result = odoo_execute(
+        response = odoo_execute(
             model='project.task',
             method='create',
             args=[{
@@ -1838,11 +1769,12 @@ def create_activity_report_task(task_name, html_content, project_id, task_column
                 'project_id': project_id,
                 'stage_id': task_column_id,
                 'description': html_content,
-                'user_ids': [(4, user_id)]  # Assign to the user
+                # (6, 0, ids) : remplace la liste en une écriture, sans relire les assignés
+                # existants comme (4, id) ; équivalent sur une tâche qui vient d'être créée
+                'user_ids': [(6, 0, [user_id])]  # Assign to the user
             }]
         )
 
-        response = json.loads(result)
         if response.get('status') == 'success':
             task_id = response.get('result')
             print(f"[SUCCESS] Created task #{task_id}: {task_name}")
@@ -1854,8 +1786,6 @@ def create_activity_report_task(task_name, html_content, project_id, task_column
         raise Exception(f"Error creating activity report task: {str(e)}")
 
 
-
-
 if __name__ == "__main__":
     # Run the server with SSE transport
     mcp.run(transport="sse")
@@ -4,13 +4,17 @@ Business report tool module.
 Contains the business_report MCP tool and all its helper functions.
 """
 
-import json
 import datetime
+import unicodedata
+import orjson
+from functools import lru_cache
 from typing import List, Dict
 from config import ODOO_DB, ODOO_PASSWORD, ODOO_URL, STAGE_IDS, CATEGORY_IDS
-from services.odoo_client import get_odoo_connection
+from services.odoo_client import get_odoo_connection, run_concurrently
 from services.formatters import format_currency, strip_html_tags
 from services.ai import generate_top5_ai_summary
+from services.errors import wrap_errors
+from services.cache import TTLCache
 
 
 # The mcp instance will be injected by the main module
@@ -26,18 +30,48 @@ def init_mcp(mcp_instance):
     mcp.tool()(odoo_business_report)
 
 
+# Company keys (slugified names) by company ID: {company_id: key}
+COMPANY_NAMES_TTL = 3600
+_company_keys = TTLCache(COMPANY_NAMES_TTL)
+
+# Styles des cellules du tableau HTML du rapport
+CELL_STYLE = "border: 1px solid #dee2e6; padding: 10px;"
+VALUE_CELL_STYLE = "border: 1px solid #dee2e6; padding: 10px; text-align: right;"
+DETAILS_CELL_STYLE = "border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;"
+TOTAL_ROW_STYLE = "background-color: #e9ecef; font-weight: bold;"
+
+# Clés des clients Top 5, dans l'ordre du rapport
+TOP5_KEYS = ('top_1', 'top_2', 'top_3', 'top_4', 'top_5')
+
+# Clés du CA : ca_facture_<société>_commercial_<user_id> et ca_facture_<société>_total
+REVENUE_KEY_PREFIX = "ca_facture_"
+REVENUE_USER_INFIX = "_commercial_"
+REVENUE_TOTAL_SUFFIX = "_total"
+
+
 # Import odoo_search and odoo_execute from data module (to avoid circular import)
 # This will be available after main module initializes everything
 def odoo_search(*args, **kwargs):
-    """Wrapper to call odoo_search from tools.data"""
-    from tools.data import odoo_search as _odoo_search
-    return _odoo_search(*args, **kwargs)
+    """
+    Wrapper to call odoo_search from tools.data, returning the result dict.
+
+    The report helpers only query known models, so the ir.model existence
+    check is skipped.
+    """
+    from tools.data import odoo_search_raw
+    try:
+        return odoo_search_raw(*args, check_model=False, **kwargs)
+    except Exception as e:
+        return {"error": f"Error searching: {str(e)}"}
 
 
 def odoo_execute(*args, **kwargs):
-    """Wrapper to call odoo_execute from tools.data"""
-    from tools.data import odoo_execute as _odoo_execute
-    return _odoo_execute(*args, **kwargs)
+    """Wrapper to call odoo_execute from tools.data, returning the result dict"""
+    from tools.data import odoo_execute_raw
+    try:
+        return odoo_execute_raw(*args, **kwargs)
+    except Exception as e:
+        return {"error": f"Error executing method: {str(e)}"}
 
 
 def odoo_business_report(
@@ -66,10 +100,10 @@ def odoo_business_report(
 
         # Validate input
         if not user_ids or not isinstance(user_ids, list):
-            return json.dumps({
+            return orjson.dumps({
                 "status": "error",
                 "message": "user_ids must be a non-empty list"
-            })
+            }).decode()
 
         print(f"[DEBUG] Step 1: Validating dates...")
         # Validate date format
@@ -77,68 +111,82 @@ def odoo_business_report(
             datetime.datetime.fromisoformat(start_date)
             datetime.datetime.fromisoformat(end_date)
         except ValueError:
-            return json.dumps({
+            return orjson.dumps({
                 "status": "error",
                 "message": "Invalid date format. Use YYYY-MM-DD format."
-            })
+            }).decode()
 
         # Validate that start_date is before end_date
         if start_date >= end_date:
-            return json.dumps({
+            return orjson.dumps({
                 "status": "error",
                 "message": "start_date must be before end_date"
-            })
+            }).decode()
 
         print(f"[DEBUG] Step 2: Testing Odoo connection...")
         # Test Odoo connection first
         models, uid = get_odoo_connection()
 
         print(f"[DEBUG] Step 3: Verifying users...")
-        # Verify ALL users exist and get their names
+        # Verify ALL users exist and get their names (one search for all users)
+        user_response = odoo_search(
+            model='res.users',
+            domain=[['id', 'in', user_ids]],
+            fields=['name'],
+            limit=len(user_ids)
+        )
+        names_by_id = {
+            user['id']: user['name']
+            for user in user_response.get('records', [])
+        } if user_response.get('status') == 'success' else {}
         user_names = []
         for user_id in user_ids:
-            user_check = odoo_search(
-                model='res.users',
-                domain=[['id', '=', user_id]],
-                fields=['name'],
-                limit=1
-            )
-            user_response = json.loads(user_check)
-            if not (user_response.get('status') == 'success' and user_response.get('records')):
-                return json.dumps({
+            if user_id not in names_by_id:
+                return orjson.dumps({
                     "status": "error",
                     "message": f"User with ID {user_id} not found"
-                })
-            user_names.append(user_response['records'][0]['name'])
+                }).decode()
+            user_names.append(names_by_id[user_id])
 
         # Create combined user info
         combined_user_name = ", ".join(user_names)
         print(f"[DEBUG] Users verified: {combined_user_name}")
 
-        print(f"[DEBUG] Step 4: Collecting top clients data...")
-        # Collect all report data (AGRÉGÉ pour tous les utilisateurs)
-        top_clients_data = collect_top_clients_data(user_ids)
-
-        print(f"[DEBUG] Step 5: Collecting top5 client activities...")
-        # Collecter les activités des Top 5 clients
-        top5_activities = collect_top5_client_activities(start_date, end_date, top_clients_data)
-
-        print(f"[DEBUG] Step 6: Generating AI summaries for Top 5...")
-        # Générer les résumés AI pour chaque Top 5
-        top5_summaries = {}
-        for top_key in ['top_1', 'top_2', 'top_3', 'top_4', 'top_5']:
-            client_activities = top5_activities.get(top_key)
-            if client_activities:
-                summary = generate_top5_ai_summary(client_activities, start_date, end_date)
-                top5_summaries[top_key] = summary
-            else:
-                top5_summaries[top_key] = "Aucun client"
-
-        print(f"[DEBUG] Step 7: Collecting revenue data...")
-        revenue_data = collect_revenue_data(start_date, end_date, user_ids)
+        # Les trois collectes sont indépendantes : lancées en parallèle (threads, attente réseau)
+        def collect_top5_data():
+            print(f"[DEBUG] Step 4: Collecting top clients data...")
+            # Collect all report data (AGRÉGÉ pour tous les utilisateurs)
+            top_clients_data = collect_top_clients_data(user_ids)
+
+            print(f"[DEBUG] Step 5: Collecting top5 client activities...")
+            # Collecter les activités des Top 5 clients
+            top5_activities = collect_top5_client_activities(start_date, end_date, top_clients_data)
+
+            print(f"[DEBUG] Step 6: Generating AI summaries for Top 5...")
+            # Générer les résumés AI pour chaque Top 5 : appels API indépendants, en parallèle
+            # (generate_top5_ai_summary renvoie un message d'erreur au lieu de lever)
+            top5_summaries = {top_key: "Aucun client" for top_key in TOP5_KEYS}
+            top5_summaries.update(run_concurrently({
+                top_key: (lambda client_activities=client_activities:
+                          generate_top5_ai_summary(client_activities, start_date, end_date))
+                for top_key, client_activities in top5_activities.items()
+                if client_activities
+            }))
+            return top_clients_data, top5_summaries
+
+        print(f"[DEBUG] Steps 4-8: Collecting top clients, revenue and metrics data in parallel...")
+        collected = run_concurrently({
+            "top5": collect_top5_data,
+            "revenue": lambda: collect_revenue_data(start_date, end_date, user_ids),
+            "metrics": lambda: collect_metrics_data(start_date, end_date, user_ids)
+        })
+        for value in collected.values():
+            if isinstance(value, Exception):
+                raise value
 
-        print(f"[DEBUG] Step 8: Collecting metrics data...")
-        metrics_data = collect_metrics_data(start_date, end_date, user_ids)
+        top_clients_data, top5_summaries = collected["top5"]
+        revenue_data = collected["revenue"]
+        metrics_data = collected["metrics"]
 
         print(f"[DEBUG] Step 9: Assembling report data...")
         report_data = {
@@ -163,30 +211,80 @@ def odoo_business_report(
         print(f"[DEBUG] Step 11: Report completed successfully!")
         print("[DEBUG] ===== END BUSINESS REPORT GENERATION =====\n")
 
-        return json.dumps({
+        # JSON compact ; les métriques individuelles sont indexées par user_id (clés entières)
+        return orjson.dumps({
             "status": "success",
             "message": f"Business report generated successfully for {combined_user_name}",
             "period": f"{start_date} to {end_date}",
             "task_id": task_id,
             "task_name": f"Rapport Business - {combined_user_name} ({start_date} au {end_date})",
             "report_data": report_data,
-            "timestamp": datetime.datetime.now().isoformat()
-        }, indent=2)
+            "timestamp": datetime.datetime.now()
+        }, option=orjson.OPT_NON_STR_KEYS).decode()
 
     except Exception as e:
         import traceback
         error_traceback = traceback.format_exc()
         print(f"[ERROR] Exception in odoo_business_report:")
         print(f"[ERROR] {error_traceback}")
-        return json.dumps({
+        return orjson.dumps({
             "status": "error",
             "message": f"Error generating business report: {str(e)}",
             "traceback": error_traceback
-        })
+        }).decode()
 
 
 # Business report helper functions
 
+@lru_cache(maxsize=None)
+def category_condition(category_id: int) -> tuple:
+    """
+    Domain condition "partner has this category", built once per category ID.
+
+    A tuple so that the shared condition cannot be modified by a caller.
+    """
+    return ('category_id', 'in', (category_id,))
+
+
+def slugify_company_name(name: str) -> str:
+    """Clean a company name for use as key (lowercase, accents removed, spaces -> _)"""
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return ascii_name.lower().replace(' ', '_')
+
+
+def get_company_names(company_ids: List[int]) -> Dict[int, str]:
+    """
+    Get the company keys (slugified names) for several companies at once.
+
+    Names are cached for COMPANY_NAMES_TTL seconds; only the missing ones are
+    fetched, in a single search.
+
+    Returns:
+        Dict {company_id: company key}, with "company_<id>" as fallback
+    """
+    keys = {company_id: _company_keys.get(company_id) for company_id in company_ids}
+    missing = [company_id for company_id, key in keys.items() if key is None]
+    if missing:
+        try:
+            response = odoo_search(
+                model='res.company',
+                domain=[['id', 'in', missing]],
+                fields=['name'],
+                limit=len(missing)
+            )
+            if response.get('status') == 'success':
+                for record in response.get('records', []):
+                    keys[record['id']] = slugify_company_name(record['name'])
+                    _company_keys.set(record['id'], keys[record['id']])
+        except Exception as e:
+            print(f"[WARNING] Could not get company names: {str(e)}")
+
+    return {
+        company_id: keys.get(company_id) or f"company_{company_id}"
+        for company_id in company_ids
+    }
+
+
 def get_company_name(company_id: int):
     """
     Get company name by ID for dynamic labeling
@@ -197,24 +295,32 @@ def get_company_name(company_id: int):
     Returns:
         Company name or fallback string
     """
-    try:
-        result = odoo_search(
-            model='res.company',
-            domain=[['id', '=', company_id]],
-            fields=['name'],
-            limit=1
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success' and response.get('records'):
-            # Clean name for use as key (remove accents, spaces, etc.)
-            name = response['records'][0]['name']
-            return name.lower().replace('é', 'e').replace(' ', '_')
-        return f"company_{company_id}"
-        
-    except Exception as e:
-        return f"company_{company_id}"
+    return get_company_names([company_id])[company_id]
+
+
+def sum_invoices_amount(domain: List, amount_field: str):
+    """
+    Sum an amount field of the account.move records matching domain.
+
+    Aggregated by Odoo with read_group: only the totals are transferred, and
+    no invoice is left out by a search limit.
 
+    Returns:
+        Total amount
+    """
+    response = odoo_execute(
+        model='account.move',
+        method='read_group',
+        args=[domain, [f'{amount_field}:sum'], ['company_id']],
+        kwargs={'lazy': False}
+    )
+    if response.get('status') != 'success':
+        raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+
+    return sum(group.get(amount_field) or 0 for group in response.get('result', []))
+
+
+@wrap_errors("calculating revenue")
 def get_company_revenue(company_id: int, start_date: str, end_date: str, user_id: int, with_opportunities=None):
     """
     Generic function to get company revenue based on opportunities filter
@@ -229,46 +335,30 @@ def get_company_revenue(company_id: int, start_date: str, end_date: str, user_id
     Returns:
         Total revenue amount
     """
-    try:
-        # Build domain for account.move (invoices)
-        domain = [
-            ['company_id', '=', company_id],
-            ['invoice_date', '>=', start_date],
-            ['invoice_date', '<=', end_date],
-            ['invoice_user_id', '=', user_id],
-            ['move_type', '=', 'out_invoice'],  # Only customer invoices
-            ['state', '=', 'posted']  # Only validated invoices
-        ]
-        
-        # Add opportunities filter
-        if with_opportunities is True:
-            # For invoices with opportunities - check if related sale order has opportunity
-            domain.append(['invoice_line_ids.sale_line_ids.order_id.opportunity_id', '!=', False])
-        elif with_opportunities is False:
-            # For invoices without opportunities - check if related sale order has NO opportunity
-            domain.append(['invoice_line_ids.sale_line_ids.order_id.opportunity_id', '=', False])
-        # If None, no opportunity filter (total)
-        
-        # Search invoices
-        result = odoo_search(
-            model='account.move',
-            domain=domain,
-            fields=['amount_total'],
-            limit=100  # Should be enough for weekly reports
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            records = response.get('records', [])
-            total_revenue = sum(record.get('amount_total', 0) for record in records)
-            return total_revenue
-        else:
-            raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
-            
-    except Exception as e:
-        raise Exception(f"Error calculating revenue: {str(e)}")
+    # Build domain for account.move (invoices)
+    domain = [
+        ['company_id', '=', company_id],
+        ['invoice_date', '>=', start_date],
+        ['invoice_date', '<=', end_date],
+        ['invoice_user_id', '=', user_id],
+        ['move_type', '=', 'out_invoice'],  # Only customer invoices
+        ['state', '=', 'posted']  # Only validated invoices
+    ]
+    
+    # Add opportunities filter
+    if with_opportunities is True:
+        # For invoices with opportunities - check if related sale order has opportunity
+        domain.append(['invoice_line_ids.sale_line_ids.order_id.opportunity_id', '!=', False])
+    elif with_opportunities is False:
+        # For invoices without opportunities - check if related sale order has NO opportunity
+        domain.append(['invoice_line_ids.sale_line_ids.order_id.opportunity_id', '=', False])
+    # If None, no opportunity filter (total)
+    
+    # Sum invoices server-side
+    return sum_invoices_amount(domain, 'amount_total')
 
 
+@wrap_errors("calculating invoiced revenue")
 def get_company_invoices_revenue(
     company_id: int,
     start_date: str,
@@ -280,55 +370,81 @@ def get_company_invoices_revenue(
     Fonction pour calculer le CA facturé HT (account.move) basé sur les opportunités
     MODIFIÉ pour supporter plusieurs utilisateurs et CA HT
     """
-    try:
-        # Build domain for account.move (invoices)
-        domain = [
-            ['company_id', '=', company_id],
-            ['invoice_date', '>=', start_date],
-            ['invoice_date', '<=', end_date],
-            ['invoice_user_id', 'in', user_ids],
-            ['move_type', '=', 'out_invoice'],
-            ['state', '=', 'posted']
-        ]
-
-        # Add opportunities filter
-        if with_opportunities is True:
-            domain.append([
-                'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
-                '!=',
-                False
-            ])
-        elif with_opportunities is False:
-            domain.append([
-                'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
-                '=',
-                False
-            ])
-
-        # Search invoices
-        result = odoo_search(
-            model='account.move',
-            domain=domain,
-            fields=['amount_untaxed'],
-            limit=100
-        )
-
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            records = response.get('records', [])
-            total_revenue = sum(
-                record.get('amount_untaxed', 0) for record in records
-            )
-            return total_revenue
-        else:
-            raise Exception(
-                f"Search failed: {response.get('error', 'Unknown error')}"
-            )
-
-    except Exception as e:
-        raise Exception(f"Error calculating invoiced revenue: {str(e)}")
+    # Build domain for account.move (invoices)
+    domain = [
+        ['company_id', '=', company_id],
+        ['invoice_date', '>=', start_date],
+        ['invoice_date', '<=', end_date],
+        ['invoice_user_id', 'in', user_ids],
+        ['move_type', '=', 'out_invoice'],
+        ['state', '=', 'posted']
+    ]
+
+    # Add opportunities filter
+    if with_opportunities is True:
+        domain.append([
+            'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
+            '!=',
+            False
+        ])
+    elif with_opportunities is False:
+        domain.append([
+            'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
+            '=',
+            False
+        ])
+
+    # Sum invoices server-side
+    return sum_invoices_amount(domain, 'amount_untaxed')
+
+
+@wrap_errors("calculating invoiced revenue")
+def get_invoices_revenue_by_company_user(
+    company_ids: List[int],
+    start_date: str,
+    end_date: str,
+    user_ids: List[int]
+):
+    """
+    CA facturé HT (account.move) de chaque commercial dans chaque société.
 
+    Un seul read_group groupé par (company_id, invoice_user_id) couvre toutes
+    les sociétés et tous les commerciaux, au lieu d'un appel par couple.
 
+    Returns:
+        Dict {(company_id, user_id): montant}, 0 pour les couples sans facture
+    """
+    domain = [
+        ['company_id', 'in', company_ids],
+        ['invoice_date', '>=', start_date],
+        ['invoice_date', '<=', end_date],
+        ['invoice_user_id', 'in', user_ids],
+        ['move_type', '=', 'out_invoice'],
+        ['state', '=', 'posted']
+    ]
+    response = odoo_execute(
+        model='account.move',
+        method='read_group',
+        args=[domain, ['amount_untaxed:sum'], ['company_id', 'invoice_user_id']],
+        kwargs={'lazy': False}
+    )
+    if response.get('status') != 'success':
+        raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+
+    revenues = {
+        (company_id, user_id): 0
+        for company_id in company_ids
+        for user_id in user_ids
+    }
+    for group in response.get('result', []):
+        company = group.get('company_id')
+        user = group.get('invoice_user_id')
+        if company and user:
+            revenues[(company[0], user[0])] = group.get('amount_untaxed') or 0
+    return revenues
+
+
+@wrap_errors("calculating revenue by trademark")
 def get_company_invoices_revenue_by_trademark(
     company_id: int,
     start_date: str,
@@ -349,172 +465,168 @@ def get_company_invoices_revenue_by_trademark(
     Returns:
         Dict avec les montants par marque: {"La Balle": 3000, "Sans marque": 500, ...}
     """
-    try:
-        # Build domain for account.move (invoices)
-        domain = [
-            ['company_id', '=', company_id],
-            ['invoice_date', '>=', start_date],
-            ['invoice_date', '<=', end_date],
-            ['invoice_user_id', 'in', user_ids],
-            ['move_type', '=', 'out_invoice'],
-            ['state', '=', 'posted']
-        ]
-
-        # Add opportunities filter
-        if with_opportunities is True:
-            domain.append([
-                'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
-                '!=',
-                False
-            ])
-        elif with_opportunities is False:
-            domain.append([
-                'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
-                '=',
-                False
-            ])
-
-        # Search invoices with invoice_line_ids
-        result = odoo_search(
-            model='account.move',
-            domain=domain,
-            fields=['id', 'invoice_line_ids'],
-            limit=100
+    # Build domain for account.move (invoices)
+    domain = [
+        ['company_id', '=', company_id],
+        ['invoice_date', '>=', start_date],
+        ['invoice_date', '<=', end_date],
+        ['invoice_user_id', 'in', user_ids],
+        ['move_type', '=', 'out_invoice'],
+        ['state', '=', 'posted']
+    ]
+
+    # Add opportunities filter
+    if with_opportunities is True:
+        domain.append([
+            'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
+            '!=',
+            False
+        ])
+    elif with_opportunities is False:
+        domain.append([
+            'invoice_line_ids.sale_line_ids.order_id.opportunity_id',
+            '=',
+            False
+        ])
+
+    # Search invoices with invoice_line_ids
+    response = odoo_search(
+        model='account.move',
+        domain=domain,
+        fields=['id', 'invoice_line_ids'],
+        limit=100
+    )
+    if response.get('status') != 'success':
+        raise Exception(
+            f"Search failed: {response.get('error', 'Unknown error')}"
         )
 
-        response = json.loads(result)
-        if response.get('status') != 'success':
-            raise Exception(
-                f"Search failed: {response.get('error', 'Unknown error')}"
-            )
-
-        invoices = response.get('records', [])
-        trademark_totals = {}
+    invoices = response.get('records', [])
+    trademark_totals = {}
 
-        # Pour chaque facture, récupérer les lignes
-        for invoice in invoices:
-            line_ids = invoice.get('invoice_line_ids', [])
+    # Pour chaque facture, récupérer les lignes
+    for invoice in invoices:
+        line_ids = invoice.get('invoice_line_ids', [])
 
-            if not line_ids:
-                continue
-
-            # Récupérer les lignes de facture avec product_id et price_subtotal
-            lines_result = odoo_search(
-                model='account.move.line',
-                domain=[['id', 'in', line_ids]],
-                fields=['product_id', 'price_subtotal'],
-                limit=1000
-            )
+        if not line_ids:
+            continue
 
-            lines_response = json.loads(lines_result)
-            if lines_response.get('status') != 'success':
-                continue
+        # Récupérer les lignes de facture avec product_id et price_subtotal
+        lines_response = odoo_search(
+            model='account.move.line',
+            domain=[['id', 'in', line_ids]],
+            fields=['product_id', 'price_subtotal'],
+            limit=1000
+        )
+        if lines_response.get('status') != 'success':
+            continue
 
-            lines = lines_response.get('records', [])
+        lines = lines_response.get('records', [])
 
-            for line in lines:
-                product_id = line.get('product_id')
-                price_subtotal = line.get('price_subtotal', 0)
+        for line in lines:
+            product_id = line.get('product_id')
+            price_subtotal = line.get('price_subtotal', 0)
 
-                if not product_id or not isinstance(product_id, list):
-                    # Pas de produit, catégoriser comme "Sans marque"
-                    trademark = "Sans marque"
-                else:
-                    # Récupérer le champ products_trademark du produit
-                    product_result = odoo_search(
-                        model='product.product',
-                        domain=[['id', '=', product_id[0]]],
-                        fields=['products_trademark'],
-                        limit=1
-                    )
-
-                    product_response = json.loads(product_result)
-                    if (product_response.get('status') == 'success' and
-                        product_response.get('records')):
-                        trademark = product_response['records'][0].get('products_trademark')
-                        if not trademark or trademark.strip() == '':
-                            trademark = "Sans marque"
-                    else:
+            if not product_id or not isinstance(product_id, list):
+                # Pas de produit, catégoriser comme "Sans marque"
+                trademark = "Sans marque"
+            else:
+                # Récupérer le champ products_trademark du produit
+                product_response = odoo_search(
+                    model='product.product',
+                    domain=[['id', '=', product_id[0]]],
+                    fields=['products_trademark'],
+                    limit=1
+                )
+                if (product_response.get('status') == 'success' and
+                    product_response.get('records')):
+                    trademark = product_response['records'][0].get('products_trademark')
+                    if not trademark or trademark.strip() == '':
                         trademark = "Sans marque"
+                else:
+                    trademark = "Sans marque"
 
-                # Ajouter au total de la marque
-                if trademark not in trademark_totals:
-                    trademark_totals[trademark] = 0
-                trademark_totals[trademark] += price_subtotal
-
-        return trademark_totals
+            # Ajouter au total de la marque
+            if trademark not in trademark_totals:
+                trademark_totals[trademark] = 0
+            trademark_totals[trademark] += price_subtotal
 
-    except Exception as e:
-        raise Exception(f"Error calculating revenue by trademark: {str(e)}")
+    return trademark_totals
 
 
+@wrap_errors("collecting revenue data")
 def collect_revenue_data(start_date: str, end_date: str, user_ids: List[int]):
     """
     Collect all revenue data for the business report using dynamic company detection
     REFACTORISÉ pour générer CA individuel par commercial + totaux par société + détails par marque
     """
-    try:
-        # Get ALL company IDs for ALL users
-        all_company_ids = set()
-
-        for user_id in user_ids:
-            result = odoo_search(
-                model='res.users',
-                domain=[['id', '=', user_id]],
-                fields=['company_ids'],
-                limit=1
-            )
-
-            response = json.loads(result)
-            if (response.get('status') == 'success'
-                    and response.get('records')):
-                company_ids = response['records'][0].get('company_ids', [])
-                all_company_ids.update(company_ids)
-
-        if not all_company_ids:
-            raise Exception(
-                f"Users {user_ids} have no associated companies"
-            )
+    # Get ALL company IDs for ALL users (one search for all users)
+    all_company_ids = set()
+
+    response = odoo_search(
+        model='res.users',
+        domain=[['id', 'in', user_ids]],
+        fields=['company_ids'],
+        limit=len(user_ids)
+    )
+    if response.get('status') == 'success':
+        for user in response.get('records', []):
+            all_company_ids.update(user.get('company_ids', []))
+
+    if not all_company_ids:
+        raise Exception(
+            f"Users {user_ids} have no associated companies"
+        )
 
-        # Calculate revenue for each company
-        revenue_data = {}
-        # NOUVEAU: Stocker les détails par marque
-        trademark_details = {}
+    company_ids = sorted(all_company_ids)
+    company_keys = get_company_names(company_ids)
 
-        for company_id in all_company_ids:
-            company_key = get_company_name(company_id)
-            company_total = 0
+    # CA individuel de tous les couples (société, commercial) en un seul read_group
+    revenues = get_invoices_revenue_by_company_user(company_ids, start_date, end_date, user_ids)
 
-            # CA individuel pour chaque commercial
-            for user_id in user_ids:
-                individual_ca = get_company_invoices_revenue(
-                    company_id, start_date, end_date, [user_id],
-                    with_opportunities=None
-                )
-                key = f"ca_facture_{company_key}_commercial_{user_id}"
-                revenue_data[key] = individual_ca
-                company_total += individual_ca
-
-                # NOUVEAU: Récupérer le détail par marque pour ce commercial et cette société
-                trademark_breakdown = get_company_invoices_revenue_by_trademark(
-                    company_id, start_date, end_date, [user_id],
-                    with_opportunities=None
-                )
-                trademark_key = f"ca_facture_{company_key}_commercial_{user_id}_trademarks"
-                trademark_details[trademark_key] = trademark_breakdown
+    # NOUVEAU: Détail par marque, requêtes indépendantes lancées en parallèle
+    trademark_breakdowns = run_concurrently({
+        (company_id, user_id): lambda company_id=company_id, user_id=user_id: get_company_invoices_revenue_by_trademark(
+            company_id, start_date, end_date, [user_id],
+            with_opportunities=None
+        )
+        for company_id in company_ids
+        for user_id in user_ids
+    })
+    for value in trademark_breakdowns.values():
+        if isinstance(value, Exception):
+            raise value
+
+    # Calculate revenue for each company
+    revenue_data = {}
+    # NOUVEAU: Stocker les détails par marque
+    trademark_details = {}
+
+    for company_id in company_ids:
+        company_key = company_keys[company_id]
+        company_total = 0
+
+        # CA individuel pour chaque commercial
+        for user_id in user_ids:
+            individual_ca = revenues[(company_id, user_id)]
+            trademark_breakdown = trademark_breakdowns[(company_id, user_id)]
+            key = f"ca_facture_{company_key}_commercial_{user_id}"
+            revenue_data[key] = individual_ca
+            company_total += individual_ca
 
-            # CA total pour la société
-            revenue_data[f"ca_facture_{company_key}_total"] = company_total
+            trademark_key = f"ca_facture_{company_key}_commercial_{user_id}_trademarks"
+            trademark_details[trademark_key] = trademark_breakdown
 
-        # Ajouter les détails de marque dans le retour
-        revenue_data['trademark_details'] = trademark_details
+        # CA total pour la société
+        revenue_data[f"ca_facture_{company_key}_total"] = company_total
 
-        return revenue_data
+    # Ajouter les détails de marque dans le retour
+    revenue_data['trademark_details'] = trademark_details
 
-    except Exception as e:
-        raise Exception(f"Error collecting revenue data: {str(e)}")
+    return revenue_data
 
 
+@wrap_errors("getting appointments placed")
 def get_appointments_placed(start_date: str, end_date: str, user_ids: List[int]):
     """
     MODIFIÉ pour supporter plusieurs utilisateurs ET inclure les RDV Dégustation via mail.activity
@@ -522,33 +634,27 @@ def get_appointments_placed(start_date: str, end_date: str, user_ids: List[int])
     - Les crm.lead avec stage "rdv_degustation" (méthode classique)
     - Les mail.activity avec activity_type_id = 38 (nouvelle méthode de placement de RDV)
     """
-    try:
-        # Compter les crm.lead "rdv_degustation" (méthode classique)
-        result = odoo_search(
-            model='crm.lead',
-            domain=[
-                ['create_date', '>=', start_date],
-                ['create_date', '<=', end_date],
-                ['user_id', 'in', user_ids],
-                ['stage_id', '=', STAGE_IDS["rdv_degustation"]]
-            ],
-            fields=['id']
-        )
-
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            crm_lead_count = response.get('returned_count', 0)
-        else:
-            raise Exception(f"CRM Lead search failed: {response.get('error', 'Unknown error')}")
-
-        # Compter les mail.activity "RDV Dégustation" (nouvelle méthode)
-        activity_count = get_rdv_degustation_activities_count(start_date, end_date, user_ids)
-
-        # Retourner le total
-        return crm_lead_count + activity_count
-
-    except Exception as e:
-        raise Exception(f"Error getting appointments placed: {str(e)}")
+    # Compter les crm.lead "rdv_degustation" (méthode classique)
+    response = odoo_execute(
+        model='crm.lead',
+        method='search_count',
+        args=[[
+            ['create_date', '>=', start_date],
+            ['create_date', '<=', end_date],
+            ['user_id', 'in', user_ids],
+            ['stage_id', '=', STAGE_IDS["rdv_degustation"]]
+        ]]
+    )
+    if response.get('status') == 'success':
+        crm_lead_count = response.get('result', 0)
+    else:
+        raise Exception(f"CRM Lead search failed: {response.get('error', 'Unknown error')}")
+
+    # Compter les mail.activity "RDV Dégustation" (nouvelle méthode)
+    activity_count = get_rdv_degustation_activities_count(start_date, end_date, user_ids)
+
+    # Retourner le total
+    return crm_lead_count + activity_count
 
 
 def get_rdv_degustation_activities_count(start_date: str, end_date: str, user_ids: List[int]):
@@ -565,8 +671,7 @@ def get_rdv_degustation_activities_count(start_date: str, end_date: str, user_id
     """
     try:
         # Ajouter l'heure pour le format datetime requis par create_date
-        start_datetime = start_date if ' ' in start_date else f"{start_date} 00:00:00"
-        end_datetime = end_date if ' ' in end_date else f"{end_date} 23:59:59"
+        start_datetime, end_datetime = period_datetimes(start_date, end_date)
 
         # CORRIGÉ: Utiliser le format exact qui fonctionne manuellement avec opérateurs AND explicites
         # Format: ["&", "&", "&", condition1, condition2, condition3, condition4]
@@ -585,13 +690,11 @@ def get_rdv_degustation_activities_count(start_date: str, end_date: str, user_id
         print(f"  - end_datetime: {end_datetime}")
         print(f"  - domain: {domain}")
 
-        result = odoo_execute(
+        response = odoo_execute(
             model='mail.activity',
             method='search_count',
             args=[domain]
         )
-
-        response = json.loads(result)
         print(f"[DEBUG] Response: {response}")
 
         if response.get('status') == 'success':
@@ -617,10 +720,9 @@ def debug_mail_activities(start_date: str, end_date: str, user_ids: List[int]):
         print(f"[DEBUG] Période: {start_date} -> {end_date}")
 
         # 1. Chercher TOUTES les activités créées par l'utilisateur dans la période
-        start_datetime = start_date if ' ' in start_date else f"{start_date} 00:00:00"
-        end_datetime = end_date if ' ' in end_date else f"{end_date} 23:59:59"
+        start_datetime, end_datetime = period_datetimes(start_date, end_date)
 
-        result = odoo_search(
+        response = odoo_search(
             model='mail.activity',
             domain=[
                 ['create_uid', 'in', user_ids],
@@ -630,8 +732,6 @@ def debug_mail_activities(start_date: str, end_date: str, user_ids: List[int]):
             fields=['id', 'activity_type_id', 'create_uid', 'create_date', 'user_id', 'summary'],
             limit=50
         )
-
-        response = json.loads(result)
         if response.get('status') == 'success':
             activities = response.get('records', [])
             print(f"[DEBUG] Trouvé {len(activities)} activités créées par l'utilisateur dans la période")
@@ -673,7 +773,7 @@ def check_field_exists(model: str, field_name: str) -> bool:
         True si le champ existe, False sinon
     """
     try:
-        result = odoo_execute(
+        response = odoo_execute(
             model='ir.model.fields',
             method='search_count',
             args=[[
@@ -681,8 +781,6 @@ def check_field_exists(model: str, field_name: str) -> bool:
                 ['name', '=', field_name]
             ]]
         )
-
-        response = json.loads(result)
         if response.get('status') == 'success':
             return response.get('result', 0) > 0
         else:
@@ -693,6 +791,7 @@ def check_field_exists(model: str, field_name: str) -> bool:
         return False
 
 
+@wrap_errors("getting Passer Voir count")
 def get_passer_voir_count(start_date: str, end_date: str, user_ids: List[int]):
     """
     MODIFIÉ pour supporter plusieurs utilisateurs ET inclure les visites GD
@@ -702,34 +801,28 @@ def get_passer_voir_count(start_date: str, end_date: str, user_ids: List[int]):
 
     Avec protection: si le champ Studio n'existe plus, seuls les CHR sont comptés
     """
-    try:
-        # Compter les crm.lead "passer_voir" (CHR)
-        result_chr = odoo_execute(
-            model='crm.lead',
-            method='search_count',
-            args=[[
-                ['create_date', '>=', start_date],
-                ['create_date', '<=', end_date],
-                ['user_id', 'in', user_ids],
-                ['stage_id', '=', STAGE_IDS["passer_voir"]]
-            ]]
-        )
-
-        response_chr = json.loads(result_chr)
-        if response_chr.get('status') == 'success':
-            chr_count = response_chr.get('result', 0)
-        else:
-            raise Exception(f"CHR search failed: {response_chr.get('error', 'Unknown error')}")
-
-        # Compter les wine.price.survey sans rendez-vous (GD visites)
-        # Cette fonction retourne 0 si le champ n'existe plus
-        gd_count = get_gd_visits_count(start_date, end_date, user_ids)
-
-        # Retourner le total
-        return chr_count + gd_count
-
-    except Exception as e:
-        raise Exception(f"Error getting Passer Voir count: {str(e)}")
+    # Compter les crm.lead "passer_voir" (CHR)
+    response_chr = odoo_execute(
+        model='crm.lead',
+        method='search_count',
+        args=[[
+            ['create_date', '>=', start_date],
+            ['create_date', '<=', end_date],
+            ['user_id', 'in', user_ids],
+            ['stage_id', '=', STAGE_IDS["passer_voir"]]
+        ]]
+    )
+    if response_chr.get('status') == 'success':
+        chr_count = response_chr.get('result', 0)
+    else:
+        raise Exception(f"CHR search failed: {response_chr.get('error', 'Unknown error')}")
+
+    # Compter les wine.price.survey sans rendez-vous (GD visites)
+    # Cette fonction retourne 0 si le champ n'existe plus
+    gd_count = get_gd_visits_count(start_date, end_date, user_ids)
+
+    # Retourner le total
+    return chr_count + gd_count
 
 
 def get_gd_visits_count(start_date: str, end_date: str, user_ids: List[int]):
@@ -762,7 +855,7 @@ def get_gd_visits_count(start_date: str, end_date: str, user_ids: List[int]):
         # Le champ existe, procéder normalement
         # Compter tous les wine.price.survey SANS x_studio_is_meeting = True
         # Note: On utilise != True au lieu de = False | = None car XML-RPC ne peut pas marshaller None
-        result = odoo_execute(
+        response = odoo_execute(
             model='wine.price.survey',
             method='search_count',
             args=[[
@@ -772,8 +865,6 @@ def get_gd_visits_count(start_date: str, end_date: str, user_ids: List[int]):
                 ['x_studio_is_meeting', '!=', True]
             ]]
         )
-
-        response = json.loads(result)
         if response.get('status') == 'success':
             return response.get('result', 0)
         else:
@@ -813,7 +904,7 @@ def get_gd_meetings_count(start_date: str, end_date: str, user_ids: List[int]):
         end_date_only = end_date.split('T')[0].split(' ')[0]
 
         # Le champ existe, procéder normalement
-        result = odoo_execute(
+        response = odoo_execute(
             model='wine.price.survey',
             method='search_count',
             args=[[
@@ -823,8 +914,6 @@ def get_gd_meetings_count(start_date: str, end_date: str, user_ids: List[int]):
                 ['x_studio_is_meeting', '=', True]
             ]]
         )
-
-        response = json.loads(result)
         if response.get('status') == 'success':
             return response.get('result', 0)
         else:
@@ -836,6 +925,7 @@ def get_gd_meetings_count(start_date: str, end_date: str, user_ids: List[int]):
         return 0
 
 
+@wrap_errors("getting appointments realized")
 def get_appointments_realized(start_date: str, end_date: str, user_ids: List[int]):
     """
     MODIFIÉ pour supporter plusieurs utilisateurs ET inclure les rendez-vous GD
@@ -845,105 +935,85 @@ def get_appointments_realized(start_date: str, end_date: str, user_ids: List[int
 
     Avec protection: si le champ Studio n'existe plus, seuls les CHR sont comptés
     """
-    try:
-        # Compter les wine.tasting (CHR)
-        result_chr = odoo_execute(
-            model='wine.tasting',
-            method='search_count',
-            args=[[
-                ['create_date', '>=', start_date],
-                ['create_date', '<=', end_date],
-                ['opportunity_id.user_id', 'in', user_ids]
-            ]]
-        )
-
-        response_chr = json.loads(result_chr)
-        if response_chr.get('status') == 'success':
-            chr_count = response_chr.get('result', 0)
-        else:
-            raise Exception(f"CHR search failed: {response_chr.get('error', 'Unknown error')}")
-
-        # Compter les wine.price.survey avec rendez-vous (GD)
-        # Cette fonction retourne 0 si le champ n'existe plus
-        gd_count = get_gd_meetings_count(start_date, end_date, user_ids)
-
-        # Retourner le total
-        return chr_count + gd_count
-
-    except Exception as e:
-        raise Exception(f"Error getting appointments realized: {str(e)}")
-
-
+    # Compter les wine.tasting (CHR)
+    response_chr = odoo_execute(
+        model='wine.tasting',
+        method='search_count',
+        args=[[
+            ['create_date', '>=', start_date],
+            ['create_date', '<=', end_date],
+            ['opportunity_id.user_id', 'in', user_ids]
+        ]]
+    )
+    if response_chr.get('status') == 'success':
+        chr_count = response_chr.get('result', 0)
+    else:
+        raise Exception(f"CHR search failed: {response_chr.get('error', 'Unknown error')}")
+
+    # Compter les wine.price.survey avec rendez-vous (GD)
+    # Cette fonction retourne 0 si le champ n'existe plus
+    gd_count = get_gd_meetings_count(start_date, end_date, user_ids)
+
+    # Retourner le total
+    return chr_count + gd_count
+
+
+@wrap_errors("getting orders count")
 def get_orders_count(start_date: str, end_date: str, user_ids: List[int]):
     """MODIFIÉ pour supporter plusieurs utilisateurs"""
-    try:
-        result = odoo_search(
-            model='sale.order',
-            domain=[
-                ['date_order', '>=', start_date],
-                ['date_order', '<=', end_date],
-                ['user_id', 'in', user_ids]  # CHANGÉ
-            ],
-            fields=['id']
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('returned_count', 0)
-        else:
-            raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
-            
-    except Exception as e:
-        raise Exception(f"Error getting orders count: {str(e)}")
-
+    response = odoo_execute(
+        model='sale.order',
+        method='search_count',
+        args=[[
+            ['date_order', '>=', start_date],
+            ['date_order', '<=', end_date],
+            ['user_id', 'in', user_ids]  # CHANGÉ
+        ]]
+    )
+    if response.get('status') == 'success':
+        return response.get('result', 0)
+    else:
+        raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+
+@wrap_errors("getting recommendations count")
 def get_recommendations_count(start_date: str, end_date: str, user_ids: List[int]):
     """MODIFIÉ pour supporter plusieurs utilisateurs"""
-    try:
-        result = odoo_search(
-            model='res.partner',
-            domain=[
-                ['user_id', 'in', user_ids],  # CHANGÉ
-                ['create_date', '>=', start_date],
-                ['create_date', '<=', end_date],
-                ['category_id', 'in', [CATEGORY_IDS["recommandation"]]]
-            ],
-            fields=['id']
-        )
-        
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('returned_count', 0)
-        else:
-            raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
-            
-    except Exception as e:
-        raise Exception(f"Error getting recommendations count: {str(e)}")
-
-
+    response = odoo_execute(
+        model='res.partner',
+        method='search_count',
+        args=[[
+            ['user_id', 'in', user_ids],  # CHANGÉ
+            ['create_date', '>=', start_date],
+            ['create_date', '<=', end_date],
+            category_condition(CATEGORY_IDS["recommandation"])
+        ]]
+    )
+    if response.get('status') == 'success':
+        return response.get('result', 0)
+    else:
+        raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+
+
+@wrap_errors("getting deliveries count")
 def get_deliveries_count(start_date: str, end_date: str, user_ids: List[int]):
     """MODIFIÉ pour supporter plusieurs utilisateurs et filtrer uniquement les livraisons sortantes"""
-    try:
-        result = odoo_execute(
-            model='stock.picking',
-            method='search_count',
-            args=[[
-                ['date_done', '>=', start_date],
-                ['date_done', '<=', end_date],
-                ['user_id', 'in', user_ids],
-                ['picking_type_code', '=', 'outgoing']  # Uniquement les livraisons clients
-            ]]
-        )
-
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('result', 0)
-        else:
-            raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
-
-    except Exception as e:
-        raise Exception(f"Error getting deliveries count: {str(e)}")
-
-
+    response = odoo_execute(
+        model='stock.picking',
+        method='search_count',
+        args=[[
+            ['date_done', '>=', start_date],
+            ['date_done', '<=', end_date],
+            ['user_id', 'in', user_ids],
+            ['picking_type_code', '=', 'outgoing']  # Uniquement les livraisons clients
+        ]]
+    )
+    if response.get('status') == 'success':
+        return response.get('result', 0)
+    else:
+        raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+
+
+@wrap_errors("getting payment reminders count")
 def get_payment_reminders_count(start_date: str, end_date: str, user_ids: List[int]):
     """
     Compte les activités de recouvrement (relances impayées) terminées pour plusieurs utilisateurs
@@ -956,29 +1026,62 @@ def get_payment_reminders_count(start_date: str, end_date: str, user_ids: List[i
     Returns:
         Nombre total d'activités de recouvrement terminées
     """
-    try:
-        result = odoo_execute(
-            model='mail.activity',
-            method='search_count',
-            args=[[
-                ['activity_type_id', '=', 123],  # Type "Recouvrement"
-                ['user_id', 'in', user_ids],
-                ['date_done', '>=', start_date],
-                ['date_done', '<=', end_date],
-                ['state', '=', 'done']
-            ]]
-        )
+    response = odoo_execute(
+        model='mail.activity',
+        method='search_count',
+        args=[[
+            ['activity_type_id', '=', 123],  # Type "Recouvrement"
+            ['user_id', 'in', user_ids],
+            ['date_done', '>=', start_date],
+            ['date_done', '<=', end_date],
+            ['state', '=', 'done']
+        ]]
+    )
+    if response.get('status') == 'success':
+        return response.get('result', 0)
+    else:
+        raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+
+
+def period_datetimes(start_date: str, end_date: str):
+    """
+    Bornes datetime d'une période donnée en dates : YYYY-MM-DD 00:00:00 et
+    YYYY-MM-DD 23:59:59 (les valeurs contenant déjà une heure sont gardées).
 
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return response.get('result', 0)
-        else:
-            raise Exception(f"Search failed: {response.get('error', 'Unknown error')}")
+    Returns:
+        Tuple (start_datetime, end_datetime)
+    """
+    start_datetime = start_date if ' ' in start_date else f"{start_date} 00:00:00"
+    end_datetime = end_date if ' ' in end_date else f"{end_date} 23:59:59"
+    return start_datetime, end_datetime
 
-    except Exception as e:
-        raise Exception(f"Error getting payment reminders count: {str(e)}")
 
+def count_by_user(model: str, domain: List, user_ids: List[int], user_field: str = 'user_id') -> Dict[int, int]:
+    """
+    Count the records matching domain for each user with a single read_group
+    grouped by user_field, instead of one search_count per user.
 
+    Returns:
+        Dict {user_id: count}, 0 for users without records
+    """
+    counts = dict.fromkeys(user_ids, 0)
+    response = odoo_execute(
+        model=model,
+        method='read_group',
+        args=[domain + [[user_field, 'in', user_ids]], [user_field], [user_field]],
+        kwargs={'lazy': False}
+    )
+    if response.get('status') != 'success':
+        raise Exception(response.get('error') or response.get('message', 'read_group failed'))
+
+    for group in response.get('result', []):
+        user = group.get(user_field)
+        if user and user[0] in counts:
+            counts[user[0]] = group.get('__count', 0)
+    return counts
+
+
+@wrap_errors("getting individual payment reminders count")
 def get_payment_reminders_count_individual(start_date: str, end_date: str, user_ids: List[int]):
     """
     Compte les activités de recouvrement individuellement pour chaque utilisateur
@@ -991,34 +1094,15 @@ def get_payment_reminders_count_individual(start_date: str, end_date: str, user_
     Returns:
         Dict avec user_id comme clé et le nombre de relances comme valeur
     """
-    try:
-        individual_counts = {}
-
-        for user_id in user_ids:
-            result = odoo_execute(
-                model='mail.activity',
-                method='search_count',
-                args=[[
-                    ['activity_type_id', '=', 123],  # Type "Recouvrement"
-                    ['user_id', '=', user_id],
-                    ['date_done', '>=', start_date],
-                    ['date_done', '<=', end_date],
-                    ['state', '=', 'done']
-                ]]
-            )
-
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                individual_counts[user_id] = response.get('result', 0)
-            else:
-                individual_counts[user_id] = 0
-
-        return individual_counts
-
-    except Exception as e:
-        raise Exception(f"Error getting individual payment reminders count: {str(e)}")
+    return count_by_user('mail.activity', [
+        ['activity_type_id', '=', 123],  # Type "Recouvrement"
+        ['date_done', '>=', start_date],
+        ['date_done', '<=', end_date],
+        ['state', '=', 'done']
+    ], user_ids)
 
 
+@wrap_errors("getting individual appointments placed")
 def get_appointments_placed_individual(start_date: str, end_date: str, user_ids: List[int]):
     """
     Get appointments placed count for each user individually
@@ -1026,366 +1110,247 @@ def get_appointments_placed_individual(start_date: str, end_date: str, user_ids:
     - Les crm.lead avec stage "rdv_degustation" (méthode classique)
     - Les mail.activity avec activity_type_id = 38 (nouvelle méthode de placement de RDV)
     """
-    try:
-        individual_counts = {}
+    individual_counts = {}
 
-        # DEBUG: Appeler la fonction de diagnostic pour le premier utilisateur
-        if user_ids:
-            debug_mail_activities(start_date, end_date, [user_ids[0]])
+    # DEBUG: Appeler la fonction de diagnostic pour le premier utilisateur
+    if user_ids:
+        debug_mail_activities(start_date, end_date, [user_ids[0]])
 
-        for user_id in user_ids:
-            print(f"\n[DEBUG] Processing user_id: {user_id}")
-
-            # Compter les crm.lead "rdv_degustation" (méthode classique)
-            result = odoo_execute(
-                model='crm.lead',
-                method='search_count',
-                args=[[
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['user_id', '=', user_id],
-                    ['stage_id', '=', STAGE_IDS["rdv_degustation"]]
-                ]]
-            )
+    # Compter les crm.lead "rdv_degustation" (méthode classique), tous les utilisateurs en un read_group
+    crm_lead_counts = count_by_user('crm.lead', [
+        ['create_date', '>=', start_date],
+        ['create_date', '<=', end_date],
+        ['stage_id', '=', STAGE_IDS["rdv_degustation"]]
+    ], user_ids)
 
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                crm_lead_count = response.get('result', 0)
-            else:
-                crm_lead_count = 0
+    # Compter les mail.activity "RDV Dégustation" (nouvelle méthode), par créateur
+    start_datetime, end_datetime = period_datetimes(start_date, end_date)
+    activity_counts = count_by_user('mail.activity', [
+        ['create_date', '>=', start_datetime],
+        ['create_date', '<=', end_datetime],
+        ['activity_type_id', 'in', [38]]
+    ], user_ids, user_field='create_uid')
 
-            print(f"[DEBUG] crm_lead_count for user {user_id}: {crm_lead_count}")
+    for user_id in user_ids:
+        crm_lead_count = crm_lead_counts[user_id]
+        activity_count = activity_counts[user_id]
 
-            # Compter les mail.activity "RDV Dégustation" (nouvelle méthode)
-            activity_count = get_rdv_degustation_activities_count(start_date, end_date, [user_id])
-            print(f"[DEBUG] activity_count for user {user_id}: {activity_count}")
+        # Total pour cet utilisateur
+        total = crm_lead_count + activity_count
+        print(f"[DEBUG] TOTAL for user {user_id}: {total} ({crm_lead_count} + {activity_count})")
+        individual_counts[user_id] = total
 
-            # Total pour cet utilisateur
-            total = crm_lead_count + activity_count
-            print(f"[DEBUG] TOTAL for user {user_id}: {total} ({crm_lead_count} + {activity_count})")
-            individual_counts[user_id] = total
-
-        return individual_counts
-
-    except Exception as e:
-        raise Exception(f"Error getting individual appointments placed: {str(e)}")
+    return individual_counts
 
 
+@wrap_errors("getting individual orders count")
 def get_orders_count_individual(
         start_date: str,
         end_date: str,
         user_ids: List[int]
         ):
     """Get orders count for each user individually"""
-    try:
-        individual_counts = {}
+    return count_by_user('sale.order', [
+        ['date_order', '>=', start_date],
+        ['date_order', '<=', end_date]
+    ], user_ids)
 
-        for user_id in user_ids:
-            result = odoo_execute(
-                model='sale.order',
-                method='search_count',
-                args=[[
-                    ['date_order', '>=', start_date],
-                    ['date_order', '<=', end_date],
-                    ['user_id', '=', user_id]
-                ]]
-            )
 
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                individual_counts[user_id] = response.get('result', 0)
-            else:
-                individual_counts[user_id] = 0
+@wrap_errors("getting individual recommendations count")
+def get_recommendations_count_individual(start_date: str, end_date: str, user_ids: List[int]):
+    """Get recommendations count for each user individually"""
+    return count_by_user('res.partner', [
+        ['create_date', '>=', start_date],
+        ['create_date', '<=', end_date],
+        category_condition(CATEGORY_IDS["recommandation"])
+    ], user_ids)
 
-        return individual_counts
 
-    except Exception as e:
-        raise Exception(f"Error getting individual orders count: {str(e)}")
+def get_order_partner_ids(domain: List) -> List[int]:
+    """
+    Get the distinct partners of the sale orders matching domain.
 
+    Deduplicated by Odoo with a read_group on partner_id: no order row is
+    transferred.
 
-def get_recommendations_count_individual(start_date: str, end_date: str, user_ids: List[int]):
-    """Get recommendations count for each user individually"""
-    try:
-        individual_counts = {}
-        
-        for user_id in user_ids:
-            result = odoo_search(
-                model='res.partner',
-                domain=[
-                    ['user_id', '=', user_id],  # Un seul utilisateur à la fois
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['category_id', 'in', [CATEGORY_IDS["recommandation"]]]
-                ],
-                fields=['id']
-            )
-            
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                individual_counts[user_id] = response.get('returned_count', 0)
-            else:
-                individual_counts[user_id] = 0
-        
-        return individual_counts
-        
-    except Exception as e:
-        raise Exception(f"Error getting individual recommendations count: {str(e)}")
+    Returns:
+        List of partner IDs
+    """
+    response = odoo_execute(
+        model='sale.order',
+        method='read_group',
+        args=[domain, ['partner_id'], ['partner_id']],
+        kwargs={'lazy': False}
+    )
+    if response.get('status') != 'success':
+        raise Exception(response.get('error') or response.get('message', 'read_group failed'))
+
+    return [
+        group['partner_id'][0]
+        for group in response.get('result', [])
+        if group.get('partner_id')
+    ]
+
+
+def get_order_partner_ids_by_user(domain: List, user_ids: List[int]) -> Dict[int, List[int]]:
+    """
+    Get the distinct partners of the sale orders matching domain, per salesperson.
 
+    One read_group on (user_id, partner_id) for all the users instead of one
+    get_order_partner_ids call per user.
+
+    Returns:
+        Dict {user_id: list of partner IDs}, an empty list for users without orders
+    """
+    partners_by_user = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return partners_by_user
+
+    response = odoo_execute(
+        model='sale.order',
+        method='read_group',
+        args=[domain + [['user_id', 'in', list(user_ids)]], ['partner_id'], ['user_id', 'partner_id']],
+        kwargs={'lazy': False}
+    )
+    if response.get('status') != 'success':
+        raise Exception(response.get('error') or response.get('message', 'read_group failed'))
+
+    for group in response.get('result', []):
+        if group.get('user_id') and group.get('partner_id'):
+            partners_by_user[group['user_id'][0]].append(group['partner_id'][0])
+    return partners_by_user
+
+
+def get_partners_with_previous_orders(partner_ids: List[int], before_date: str, user_id: int = None):
+    """
+    Get the partners, among partner_ids, having a sale order created before
+    before_date (optionally from a given salesperson only).
 
+    Uses a single read_group grouped by partner instead of one query per partner.
+
+    Returns:
+        Set of partner IDs
+    """
+    if not partner_ids:
+        return set()
+
+    domain = [
+        ['partner_id', 'in', list(partner_ids)],
+        ['create_date', '<', before_date]
+    ]
+    if user_id is not None:
+        domain.append(['user_id', '=', user_id])
+
+    return set(get_order_partner_ids(domain))
+
+
+@wrap_errors("getting individual new clients count")
 def get_new_clients_count_individual(
     start_date: str, 
     end_date: str, 
     user_ids: List[int]
 ):
-    """Get new clients count for each user individually"""
-    try:
-        individual_counts = {}
-
-        for user_id in user_ids:
-            result = odoo_search(
-                model='sale.order',
-                domain=[
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['user_id', '=', user_id]
-                ],
-                fields=['partner_id'],
-                limit=10000  # Récupérer toutes les commandes pour ne rater aucun client
-            )
+    """
+    Get new clients count for each user individually
 
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                partner_ids = list(set([
-                    order['partner_id'][0]
-                    for order in response.get('records', [])
-                    if order.get('partner_id')
-                ]))
-
-                new_clients_count = 0
-                for partner_id in partner_ids:
-                    previous_orders = odoo_execute(
-                        model='sale.order',
-                        method='search_count',
-                        args=[[
-                            ['partner_id', '=', partner_id],
-                            ['create_date', '<', start_date]
-                        ]]
-                    )
-
-                    prev_response = json.loads(previous_orders)
-                    if (prev_response.get('status') == 'success' and
-                        prev_response.get('result', 0) == 0):
-                        new_clients_count += 1
-
-                individual_counts[user_id] = new_clients_count
-            else:
-                individual_counts[user_id] = 0
+    Deux requêtes pour tous les commerciaux : clients de la période par commercial,
+    puis clients déjà commandés avant la période (tous commerciaux confondus).
+    """
+    # Clients distincts des commandes de la période, par commercial (dédoublonnés côté Odoo)
+    partners_by_user = get_order_partner_ids_by_user([
+        ['create_date', '>=', start_date],
+        ['create_date', '<=', end_date]
+    ], user_ids)
 
-        return individual_counts
+    all_partner_ids = {partner_id for partner_ids in partners_by_user.values() for partner_id in partner_ids}
+    returning = get_partners_with_previous_orders(all_partner_ids, start_date)
 
-    except Exception as e:
-        raise Exception(f"Error getting individual new clients count: {str(e)}")
+    return {
+        user_id: sum(1 for partner_id in partner_ids if partner_id not in returning)
+        for user_id, partner_ids in partners_by_user.items()
+    }
 
 
+@wrap_errors("getting recommendations details")
 def get_recommendations_details_individual(start_date: str, end_date: str, user_ids: List[int]):
     """Get detailed list of recommendations for each user individually"""
-    try:
-        individual_details = {}
-        
-        for user_id in user_ids:
-            result = odoo_search(
-                model='res.partner',
-                domain=[
-                    ['user_id', '=', user_id],
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['category_id', 'in', [CATEGORY_IDS["recommandation"]]]
-                ],
-                fields=['id', 'name'],
-                limit=50
-            )
-            
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                contacts = []
-                for contact in response.get('records', []):
-                    contacts.append({
-                        'id': contact['id'],
-                        'name': contact.get('name', 'Contact sans nom')
-                    })
-                individual_details[user_id] = contacts
-            else:
-                individual_details[user_id] = []
-        
-        return individual_details
-        
-    except Exception as e:
-        raise Exception(f"Error getting recommendations details: {str(e)}")
+    individual_details = {}
+    
+    for user_id in user_ids:
+        response = odoo_search(
+            model='res.partner',
+            domain=[
+                ['user_id', '=', user_id],
+                ['create_date', '>=', start_date],
+                ['create_date', '<=', end_date],
+                category_condition(CATEGORY_IDS["recommandation"])
+            ],
+            fields=['id', 'name'],
+            limit=50
+        )
+        if response.get('status') == 'success':
+            contacts = []
+            for contact in response.get('records', []):
+                contacts.append({
+                    'id': contact['id'],
+                    'name': contact.get('name', 'Contact sans nom')
+                })
+            individual_details[user_id] = contacts
+        else:
+            individual_details[user_id] = []
+    
+    return individual_details
 
+@wrap_errors("getting new clients details")
 def get_new_clients_details_individual(start_date: str, end_date: str, user_ids: List[int]):
-    """Get detailed list of new clients for each user individually"""
-    try:
-        individual_details = {}
-        
-        for user_id in user_ids:
-            # Get orders in period for this specific user
-            result = odoo_search(
-                model='sale.order',
-                domain=[
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['user_id', '=', user_id]
-                ],
-                fields=['partner_id'],
-                limit=10000  # Récupérer toutes les commandes pour ne rater aucun client
-            )
-            
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                # Get unique partner IDs from orders for this user
-                partner_ids = list(set([order['partner_id'][0] for order in response.get('records', []) if order.get('partner_id')]))
-                
-                new_clients = []
-                for partner_id in partner_ids:
-                    # Check if partner has any orders before start_date FROM THIS USER
-                    previous_orders = odoo_search(
-                        model='sale.order',
-                        domain=[
-                            ['partner_id', '=', partner_id],
-                            ['create_date', '<', start_date],
-                            ['user_id', '=', user_id]
-                        ],
-                        fields=['id'],
-                        limit=1
-                    )
-                    
-                    prev_response = json.loads(previous_orders)
-                    if prev_response.get('status') == 'success' and prev_response.get('returned_count', 0) == 0:
-                        # This is a new client, get their details
-                        client_details = odoo_search(
-                            model='res.partner',
-                            domain=[['id', '=', partner_id]],
-                            fields=['id', 'name'],
-                            limit=1
-                        )
-                        
-                        client_response = json.loads(client_details)
-                        if client_response.get('status') == 'success' and client_response.get('records'):
-                            client = client_response['records'][0]
-                            new_clients.append({
-                                'id': client['id'],
-                                'name': client.get('name', 'Client sans nom')
-                            })
-                
-                individual_details[user_id] = new_clients
-            else:
-                individual_details[user_id] = []
-        
-        return individual_details
-        
-    except Exception as e:
-        raise Exception(f"Error getting new clients details: {str(e)}")
-
-def get_recommendations_details_individual(start_date: str, end_date: str, user_ids: List[int]):
-    """Get detailed list of recommendations for each user individually"""
-    try:
-        individual_details = {}
-        
-        for user_id in user_ids:
-            result = odoo_search(
-                model='res.partner',
-                domain=[
-                    ['user_id', '=', user_id],
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['category_id', 'in', [CATEGORY_IDS["recommandation"]]]
-                ],
-                fields=['id', 'name'],
-                limit=50
-            )
-            
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                contacts = []
-                for contact in response.get('records', []):
-                    contacts.append({
-                        'id': contact['id'],
-                        'name': contact.get('name', 'Contact sans nom')
-                    })
-                individual_details[user_id] = contacts
-            else:
-                individual_details[user_id] = []
-        
-        return individual_details
-        
-    except Exception as e:
-        raise Exception(f"Error getting recommendations details: {str(e)}")
+    """
+    Get detailed list of new clients for each user individually
 
-def get_new_clients_details_individual(start_date: str, end_date: str, user_ids: List[int]):
-    """Get detailed list of new clients for each user individually"""
-    try:
-        individual_details = {}
-        
-        for user_id in user_ids:
-            # Get orders in period for this specific user
-            result = odoo_search(
-                model='sale.order',
-                domain=[
-                    ['create_date', '>=', start_date],
-                    ['create_date', '<=', end_date],
-                    ['user_id', '=', user_id]
-                ],
-                fields=['partner_id'],
-                limit=10000  # Récupérer toutes les commandes pour ne rater aucun client
-            )
-            
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                # Get unique partner IDs from orders for this user
-                partner_ids = list(set([order['partner_id'][0] for order in response.get('records', []) if order.get('partner_id')]))
-                
-                new_clients = []
-                for partner_id in partner_ids:
-                    # Check if partner has any orders before start_date FROM THIS USER
-                    previous_orders = odoo_search(
-                        model='sale.order',
-                        domain=[
-                            ['partner_id', '=', partner_id],
-                            ['create_date', '<', start_date],
-                            ['user_id', '=', user_id]
-                        ],
-                        fields=['id'],
-                        limit=1
-                    )
-                    
-                    prev_response = json.loads(previous_orders)
-                    if prev_response.get('status') == 'success' and prev_response.get('returned_count', 0) == 0:
-                        # This is a new client, get their details
-                        client_details = odoo_search(
-                            model='res.partner',
-                            domain=[['id', '=', partner_id]],
-                            fields=['id', 'name'],
-                            limit=1
-                        )
-                        
-                        client_response = json.loads(client_details)
-                        if client_response.get('status') == 'success' and client_response.get('records'):
-                            client = client_response['records'][0]
-                            new_clients.append({
-                                'id': client['id'],
-                                'name': client.get('name', 'Client sans nom')
-                            })
-                
-                individual_details[user_id] = new_clients
-            else:
-                individual_details[user_id] = []
-        
-        return individual_details
-        
-    except Exception as e:
-        raise Exception(f"Error getting new clients details: {str(e)}")
+    Trois requêtes pour tous les commerciaux au lieu de trois par commercial.
+    """
+    # Get unique partner IDs from orders in period, per user
+    partners_by_user = get_order_partner_ids_by_user([
+        ['create_date', '>=', start_date],
+        ['create_date', '<=', end_date]
+    ], user_ids)
+    all_partner_ids = {partner_id for partner_ids in partners_by_user.values() for partner_id in partner_ids}
+    if not all_partner_ids:
+        return {user_id: [] for user_id in user_ids}
+
+    # Partners with orders before start_date FROM THE SAME USER are not new clients
+    previous_by_user = get_order_partner_ids_by_user([
+        ['partner_id', 'in', list(all_partner_ids)],
+        ['create_date', '<', start_date]
+    ], user_ids)
+    new_by_user = {
+        user_id: set(partner_ids) - set(previous_by_user[user_id])
+        for user_id, partner_ids in partners_by_user.items()
+    }
+
+    # Get the details of all new clients at once
+    new_partner_ids = set().union(*new_by_user.values())
+    clients = []
+    if new_partner_ids:
+        client_response = odoo_search(
+            model='res.partner',
+            domain=[['id', 'in', list(new_partner_ids)]],
+            fields=['id', 'name'],
+            limit=len(new_partner_ids)
+        )
+        if client_response.get('status') == 'success':
+            clients = client_response.get('records', [])
+
+    return {
+        user_id: [
+            {'id': client['id'], 'name': client.get('name', 'Client sans nom')}
+            for client in clients
+            if client['id'] in new_partner_ids_of_user
+        ]
+        for user_id, new_partner_ids_of_user in new_by_user.items()
+    }
 
 
+@wrap_errors("getting invoiced details")
 def get_invoiced_clients_details_individual(start_date: str, end_date: str, user_ids: List[int], company_id: int = None):
     """
     Get detailed list of invoices with their clients for each user individually
@@ -1400,52 +1365,47 @@ def get_invoiced_clients_details_individual(start_date: str, end_date: str, user
         Dict with user_id as key and list of invoices as value
         Each invoice contains: invoice_id, invoice_name, partner_id, partner_name
     """
-    try:
-        individual_details = {}
+    individual_details = {}
 
-        for user_id in user_ids:
-            # Get invoices in period for this specific user
-            domain = [
-                ['invoice_date', '>=', start_date],
-                ['invoice_date', '<=', end_date],
-                ['invoice_user_id', '=', user_id],
-                ['move_type', '=', 'out_invoice'],
-                ['state', '=', 'posted']
-            ]
-
-            # Add company filter if provided
-            if company_id is not None:
-                domain.append(['company_id', '=', company_id])
-
-            result = odoo_search(
-                model='account.move',
-                domain=domain,
-                fields=['id', 'name', 'partner_id'],
-                limit=10000
-            )
+    for user_id in user_ids:
+        # Get invoices in period for this specific user
+        domain = [
+            ['invoice_date', '>=', start_date],
+            ['invoice_date', '<=', end_date],
+            ['invoice_user_id', '=', user_id],
+            ['move_type', '=', 'out_invoice'],
+            ['state', '=', 'posted']
+        ]
 
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                invoices = []
-                for invoice in response.get('records', []):
-                    if invoice.get('partner_id'):
-                        invoices.append({
-                            'invoice_id': invoice['id'],
-                            'invoice_name': invoice.get('name', 'Facture sans nom'),
-                            'partner_id': invoice['partner_id'][0],
-                            'partner_name': invoice['partner_id'][1] if len(invoice['partner_id']) > 1 else 'Client sans nom'
-                        })
-
-                individual_details[user_id] = invoices
-            else:
-                individual_details[user_id] = []
+        # Add company filter if provided
+        if company_id is not None:
+            domain.append(['company_id', '=', company_id])
 
-        return individual_details
+        response = odoo_search(
+            model='account.move',
+            domain=domain,
+            fields=['id', 'name', 'partner_id'],
+            limit=10000
+        )
+        if response.get('status') == 'success':
+            invoices = []
+            for invoice in response.get('records', []):
+                if invoice.get('partner_id'):
+                    invoices.append({
+                        'invoice_id': invoice['id'],
+                        'invoice_name': invoice.get('name', 'Facture sans nom'),
+                        'partner_id': invoice['partner_id'][0],
+                        'partner_name': invoice['partner_id'][1] if len(invoice['partner_id']) > 1 else 'Client sans nom'
+                    })
 
-    except Exception as e:
-        raise Exception(f"Error getting invoiced details: {str(e)}")
+            individual_details[user_id] = invoices
+        else:
+            individual_details[user_id] = []
 
+    return individual_details
 
+
+@wrap_errors("getting ordering details")
 def get_ordering_clients_details_individual(start_date: str, end_date: str, user_ids: List[int]):
     """
     Get detailed list of orders with their clients for each user individually
@@ -1459,44 +1419,39 @@ def get_ordering_clients_details_individual(start_date: str, end_date: str, user
         Dict with user_id as key and list of orders as value
         Each order contains: order_id, order_name, partner_id, partner_name
     """
-    try:
-        individual_details = {}
-
-        for user_id in user_ids:
-            # Get orders in period for this specific user
-            result = odoo_search(
-                model='sale.order',
-                domain=[
-                    ['date_order', '>=', start_date],
-                    ['date_order', '<=', end_date],
-                    ['user_id', '=', user_id]
-                ],
-                fields=['id', 'name', 'partner_id'],
-                limit=10000
-            )
+    individual_details = {}
 
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                orders = []
-                for order in response.get('records', []):
-                    if order.get('partner_id'):
-                        orders.append({
-                            'order_id': order['id'],
-                            'order_name': order.get('name', 'Commande sans nom'),
-                            'partner_id': order['partner_id'][0],
-                            'partner_name': order['partner_id'][1] if len(order['partner_id']) > 1 else 'Client sans nom'
-                        })
-
-                individual_details[user_id] = orders
-            else:
-                individual_details[user_id] = []
+    for user_id in user_ids:
+        # Get orders in period for this specific user
+        response = odoo_search(
+            model='sale.order',
+            domain=[
+                ['date_order', '>=', start_date],
+                ['date_order', '<=', end_date],
+                ['user_id', '=', user_id]
+            ],
+            fields=['id', 'name', 'partner_id'],
+            limit=10000
+        )
+        if response.get('status') == 'success':
+            orders = []
+            for order in response.get('records', []):
+                if order.get('partner_id'):
+                    orders.append({
+                        'order_id': order['id'],
+                        'order_name': order.get('name', 'Commande sans nom'),
+                        'partner_id': order['partner_id'][0],
+                        'partner_name': order['partner_id'][1] if len(order['partner_id']) > 1 else 'Client sans nom'
+                    })
 
-        return individual_details
+            individual_details[user_id] = orders
+        else:
+            individual_details[user_id] = []
 
-    except Exception as e:
-        raise Exception(f"Error getting ordering details: {str(e)}")
+    return individual_details
 
 
+@wrap_errors("getting delivery details")
 def get_delivered_clients_details_individual(start_date: str, end_date: str, user_ids: List[int]):
     """
     Get detailed list of deliveries with their clients for each user individually
@@ -1510,112 +1465,103 @@ def get_delivered_clients_details_individual(start_date: str, end_date: str, use
         Dict with user_id as key and list of deliveries as value
         Each delivery contains: picking_id, picking_name, partner_id, partner_name
     """
-    try:
-        individual_details = {}
-
-        for user_id in user_ids:
-            # Get deliveries in period for this specific user (outgoing only)
-            result = odoo_search(
-                model='stock.picking',
-                domain=[
-                    ['date_done', '>=', start_date],
-                    ['date_done', '<=', end_date],
-                    ['user_id', '=', user_id],
-                    ['picking_type_code', '=', 'outgoing']  # Uniquement les livraisons clients
-                ],
-                fields=['id', 'name', 'partner_id'],
-                limit=10000
-            )
+    individual_details = {}
 
-            response = json.loads(result)
-            if response.get('status') == 'success':
-                deliveries = []
-                for picking in response.get('records', []):
-                    if picking.get('partner_id'):
-                        deliveries.append({
-                            'picking_id': picking['id'],
-                            'picking_name': picking.get('name', 'Livraison sans nom'),
-                            'partner_id': picking['partner_id'][0],
-                            'partner_name': picking['partner_id'][1] if len(picking['partner_id']) > 1 else 'Client sans nom'
-                        })
-
-                individual_details[user_id] = deliveries
-            else:
-                individual_details[user_id] = []
+    for user_id in user_ids:
+        # Get deliveries in period for this specific user (outgoing only)
+        response = odoo_search(
+            model='stock.picking',
+            domain=[
+                ['date_done', '>=', start_date],
+                ['date_done', '<=', end_date],
+                ['user_id', '=', user_id],
+                ['picking_type_code', '=', 'outgoing']  # Uniquement les livraisons clients
+            ],
+            fields=['id', 'name', 'partner_id'],
+            limit=10000
+        )
+        if response.get('status') == 'success':
+            deliveries = []
+            for picking in response.get('records', []):
+                if picking.get('partner_id'):
+                    deliveries.append({
+                        'picking_id': picking['id'],
+                        'picking_name': picking.get('name', 'Livraison sans nom'),
+                        'partner_id': picking['partner_id'][0],
+                        'partner_name': picking['partner_id'][1] if len(picking['partner_id']) > 1 else 'Client sans nom'
+                    })
 
-        return individual_details
+            individual_details[user_id] = deliveries
+        else:
+            individual_details[user_id] = []
 
-    except Exception as e:
-        raise Exception(f"Error getting delivery details: {str(e)}")
+    return individual_details
 
 
+@wrap_errors("collecting metrics data")
 def collect_metrics_data(start_date: str, end_date: str, user_ids: List[int]):
     """
     Collect all business metrics for the report
     MODIFIÉ pour inclure les détails des clients/factures/commandes
     """
-    try:
-        # Get ALL company IDs for ALL users (needed for invoice details)
-        all_company_ids = set()
-        for user_id in user_ids:
-            result = odoo_search(
-                model='res.users',
-                domain=[['id', '=', user_id]],
-                fields=['company_ids'],
-                limit=1
-            )
-            response = json.loads(result)
-            if response.get('status') == 'success' and response.get('records'):
-                company_ids = response['records'][0].get('company_ids', [])
-                all_company_ids.update(company_ids)
-
+    # Get ALL company IDs for ALL users (needed for invoice details, one search for all users)
+    all_company_ids = set()
+    response = odoo_search(
+        model='res.users',
+        domain=[['id', 'in', user_ids]],
+        fields=['company_ids'],
+        limit=len(user_ids)
+    )
+    if response.get('status') == 'success':
+        for user in response.get('records', []):
+            all_company_ids.update(user.get('company_ids', []))
+
+    # Toutes les métriques sont indépendantes : requêtes Odoo lancées en parallèle
+    args = (start_date, end_date, user_ids)
+    tasks = {
         # Métriques AGRÉGÉES (comme avant)
-        aggregated_metrics = {
-            "rdv_places_total": get_appointments_placed(start_date, end_date, user_ids),
-            "passer_voir": get_passer_voir_count(start_date, end_date, user_ids),  # Inclut maintenant CHR + GD
-            "rdv_realises": get_appointments_realized(start_date, end_date, user_ids),  # Inclut maintenant CHR + GD
-            "nombre_commandes_total": get_orders_count(start_date, end_date, user_ids),
-            "recommandations_total": get_recommendations_count(start_date, end_date, user_ids),
-            "livraisons": get_deliveries_count(start_date, end_date, user_ids),
-            "relances_impayees_total": get_payment_reminders_count(start_date, end_date, user_ids)
-        }
-
+        "rdv_places_total": lambda: get_appointments_placed(*args),
+        "passer_voir": lambda: get_passer_voir_count(*args),  # Inclut maintenant CHR + GD
+        "rdv_realises": lambda: get_appointments_realized(*args),  # Inclut maintenant CHR + GD
+        "nombre_commandes_total": lambda: get_orders_count(*args),
+        "recommandations_total": lambda: get_recommendations_count(*args),
+        "livraisons": lambda: get_deliveries_count(*args),
+        "relances_impayees_total": lambda: get_payment_reminders_count(*args),
         # Métriques INDIVIDUELLES (compteurs)
-        individual_metrics = {
-            "rdv_places_individual": get_appointments_placed_individual(start_date, end_date, user_ids),
-            "nombre_commandes_individual": get_orders_count_individual(start_date, end_date, user_ids),
-            "recommandations_individual": get_recommendations_count_individual(start_date, end_date, user_ids),
-            "nouveaux_clients_individual": get_new_clients_count_individual(start_date, end_date, user_ids),
-            "relances_impayees_individual": get_payment_reminders_count_individual(start_date, end_date, user_ids)
-        }
-
-        # Détails INDIVIDUELS par société pour les factures
-        # Structure: {company_id: {user_id: [invoices...]}}
-        invoiced_details_by_company = {}
-        for company_id in all_company_ids:
-            invoiced_details_by_company[company_id] = get_invoiced_clients_details_individual(
-                start_date, end_date, user_ids, company_id=company_id
-            )
-
+        "rdv_places_individual": lambda: get_appointments_placed_individual(*args),
+        "nombre_commandes_individual": lambda: get_orders_count_individual(*args),
+        "recommandations_individual": lambda: get_recommendations_count_individual(*args),
+        "nouveaux_clients_individual": lambda: get_new_clients_count_individual(*args),
+        "relances_impayees_individual": lambda: get_payment_reminders_count_individual(*args),
         # Détails INDIVIDUELS (listes de clients/commandes sans filtrage société)
-        individual_details = {
-            "recommandations_details_individual": get_recommendations_details_individual(start_date, end_date, user_ids),
-            "nouveaux_clients_details_individual": get_new_clients_details_individual(start_date, end_date, user_ids),
-            "invoiced_details_by_company": invoiced_details_by_company,  # NOUVEAU: factures par société
-            "ordering_clients_details_individual": get_ordering_clients_details_individual(start_date, end_date, user_ids),
-            "delivered_clients_details_individual": get_delivered_clients_details_individual(start_date, end_date, user_ids)
-        }
+        "recommandations_details_individual": lambda: get_recommendations_details_individual(*args),
+        "nouveaux_clients_details_individual": lambda: get_new_clients_details_individual(*args),
+        "ordering_clients_details_individual": lambda: get_ordering_clients_details_individual(*args),
+        "delivered_clients_details_individual": lambda: get_delivered_clients_details_individual(*args)
+    }
+    # Détails INDIVIDUELS par société pour les factures
+    for company_id in all_company_ids:
+        tasks[("invoices", company_id)] = lambda company_id=company_id: get_invoiced_clients_details_individual(
+            start_date, end_date, user_ids, company_id=company_id
+        )
 
-        # Combiner tout
-        return {
-            **aggregated_metrics,
-            **individual_metrics,
-            **individual_details,
-            "all_company_ids": list(all_company_ids)  # Retourner aussi les company_ids pour le HTML
-        }
+    results = run_concurrently(tasks)
+    for value in results.values():
+        if isinstance(value, Exception):
+            raise value
 
-    except Exception as e:
-        raise Exception(f"Error collecting metrics data: {str(e)}")
+    # Structure: {company_id: {user_id: [invoices...]}}
+    invoiced_details_by_company = {
+        company_id: results.pop(("invoices", company_id))
+        for company_id in all_company_ids
+    }
+
+    # Combiner tout
+    return {
+        **results,
+        "invoiced_details_by_company": invoiced_details_by_company,  # NOUVEAU: factures par société
+        "all_company_ids": list(all_company_ids)  # Retourner aussi les company_ids pour le HTML
+    }
 
 
 def strip_html_tags(html_text):
@@ -1639,57 +1585,87 @@ def strip_html_tags(html_text):
     return clean.strip()
 
 
+@wrap_errors("getting top contact")
 def get_top_contact(user_ids: List[int], category_id: int):
     """
     MODIFIÉ pour supporter plusieurs utilisateurs et retourner ID + nom
     Retourne un dict avec 'id' et 'name' ou None si pas trouvé
     """
-    try:
-        result = odoo_search(
-            model='res.partner',
-            domain=[
-                ['user_id', 'in', user_ids],
-                ['category_id', 'in', [category_id]]
-            ],
-            fields=['id', 'name'],
-            limit=1
-        )
-
-        response = json.loads(result)
-        if response.get('status') == 'success' and response.get('records'):
-            record = response['records'][0]
-            return {
-                'id': record['id'],
-                'name': record['name']
-            }
-        return None
-
-    except Exception as e:
-        raise Exception(f"Error getting top contact: {str(e)}")
+    response = odoo_search(
+        model='res.partner',
+        domain=[
+            ['user_id', 'in', user_ids],
+            category_condition(category_id)
+        ],
+        fields=['id', 'name'],
+        limit=1
+    )
+    if response.get('status') == 'success' and response.get('records'):
+        record = response['records'][0]
+        return {
+            'id': record['id'],
+            'name': record['name']
+        }
+    return None
 
 
-def get_tip_top_contacts(user_ids: List[int]):
-    """MODIFIÉ pour supporter plusieurs utilisateurs"""
-    try:
-        result = odoo_search(
-            model='res.partner',
-            domain=[
-                ['user_id', 'in', user_ids],  # CHANGÉ
-                ['category_id', 'in', [CATEGORY_IDS["tip_top"]]]
-            ],
-            fields=['name'],
-            limit=50
-        )
+@wrap_errors("getting top contacts")
+def get_top_contacts_bulk(user_ids: List[int]):
+    """
+    Contacts TOP 1 à TOP 5 des commerciaux en une seule recherche.
 
-        response = json.loads(result)
-        if response.get('status') == 'success':
-            return [contact['name'] for contact in response.get('records', [])]
-        return []
+    Les partenaires de toutes les catégories top_N sont lus ensemble (même ordre
+    que get_top_contact) puis répartis par catégorie : le premier rencontré
+    dans chaque catégorie est retenu.
 
-    except Exception as e:
-        raise Exception(f"Error getting tip top contacts: {str(e)}")
+    Returns:
+        Dict {"top_1": {'id', 'name'} ou None, ..., "top_5": ...}
+    """
+    top_keys = ("top_1", "top_2", "top_3", "top_4", "top_5")
+    category_keys = {CATEGORY_IDS[key]: key for key in top_keys}
+
+    response = odoo_search(
+        model='res.partner',
+        domain=[
+            ['user_id', 'in', user_ids],
+            ['category_id', 'in', list(category_keys)]
+        ],
+        fields=['id', 'name', 'category_id'],
+        limit=1000
+    )
+    if response.get('status') != 'success':
+        raise Exception(f"Search failed: {response.get('error', response.get('message', 'Unknown error'))}")
+
+    top_contacts = dict.fromkeys(top_keys)
+    for record in response.get('records', []):
+        for category in record.get('category_id', []):
+            key = category_keys.get(category)
+            if key and top_contacts[key] is None:
+                top_contacts[key] = {
+                    'id': record['id'],
+                    'name': record['name']
+                }
+    return top_contacts
 
 
+@wrap_errors("getting tip top contacts")
+def get_tip_top_contacts(user_ids: List[int]):
+    """MODIFIÉ pour supporter plusieurs utilisateurs"""
+    response = odoo_search(
+        model='res.partner',
+        domain=[
+            ['user_id', 'in', user_ids],  # CHANGÉ
+            category_condition(CATEGORY_IDS["tip_top"])
+        ],
+        fields=['name'],
+        limit=50
+    )
+    if response.get('status') == 'success':
+        return [contact['name'] for contact in response.get('records', [])]
+    return []
+
+
+@wrap_errors("collecting top5 client activities")
 def collect_top5_client_activities(start_date: str, end_date: str, top_clients_data: Dict):
     """
     Collect chatter messages and activities for each Top 5 client.
@@ -1702,111 +1678,120 @@ def collect_top5_client_activities(start_date: str, end_date: str, top_clients_d
     Returns:
         Dict with client activities data for each top client
     """
-    try:
-        top5_activities = {}
-
-        for top_key in ['top_1', 'top_2', 'top_3', 'top_4', 'top_5']:
-            client_data = top_clients_data.get(top_key)
-
-            if client_data and client_data.get('id'):
-                partner_id = client_data['id']
-                partner_name = client_data['name']
-
-                # Récupérer les messages du chatter (notes, comments, emails)
-                messages_result = odoo_search(
-                    model='mail.message',
-                    domain=[
-                        ['res_id', '=', partner_id],
-                        ['model', '=', 'res.partner'],
-                        ['date', '>=', start_date + ' 00:00:00'],
-                        ['date', '<=', end_date + ' 23:59:59'],
-                        ['message_type', 'in', ['comment', 'email']]  # Notes sont stockées comme comments
-                    ],
-                    fields=['date', 'body', 'author_id', 'message_type', 'subject'],
-                    limit=100
-                )
-
-                messages = []
-                messages_response = json.loads(messages_result)
-                if messages_response.get('status') == 'success':
-                    messages = messages_response.get('records', [])
-
-                # Récupérer les activités terminées (avec protection contre les erreurs)
-                activities = []
-                try:
-                    activities_result = odoo_search(
-                        model='mail.activity',
-                        domain=[
-                            ['res_id', '=', partner_id],
-                            ['res_model', '=', 'res.partner'],
-                            ['date_done', '>=', start_date],
-                            ['date_done', '<=', end_date],
-                            ['state', '=', 'done']
-                        ],
-                        fields=['summary', 'date_done', 'note'],
-                        limit=50
-                    )
-
-                    activities_response = json.loads(activities_result)
-                    if activities_response.get('status') == 'success':
-                        activities = activities_response.get('records', [])
-                    else:
-                        # Log l'erreur mais continue sans activités
-                        print(f"[WARNING] Could not fetch activities for partner {partner_id}: {activities_response.get('error', 'Unknown error')}")
-                except Exception as e:
-                    # Ne pas faire planter tout le rapport si les activités échouent
-                    print(f"[WARNING] Exception while fetching activities for partner {partner_id}: {str(e)}")
-                    activities = []
-
-                top5_activities[top_key] = {
-                    'id': partner_id,
-                    'name': partner_name,
-                    'messages': messages,
-                    'activities': activities
-                }
-            else:
-                # Pas de client pour ce top
-                top5_activities[top_key] = None
-
-        return top5_activities
+    # Un client par thread : les deux recherches de chaque client restent séquentielles,
+    # les cinq clients sont interrogés en parallèle
+    clients = {
+        top_key: client_data
+        for top_key, client_data in ((key, top_clients_data.get(key)) for key in TOP5_KEYS)
+        if client_data and client_data.get('id')
+    }
+    results = run_concurrently({
+        top_key: (lambda client_data=client_data:
+                  fetch_client_activities(client_data['id'], client_data['name'], start_date, end_date))
+        for top_key, client_data in clients.items()
+    })
+
+    top5_activities = {}
+    for top_key in TOP5_KEYS:
+        result = results.get(top_key)
+        if isinstance(result, Exception):
+            raise result
+        # None : pas de client pour ce top
+        top5_activities[top_key] = result
+    return top5_activities
+
+
+def fetch_client_activities(partner_id: int, partner_name: str, start_date: str, end_date: str) -> Dict:
+    """
+    Fetch the chatter messages and done activities of one client over the period.
 
+    Returns:
+        Dict {'id', 'name', 'messages', 'activities'}
+    """
+    start_datetime, end_datetime = period_datetimes(start_date, end_date)
+
+    # Récupérer les messages du chatter (notes, comments, emails)
+    messages_response = odoo_search(
+        model='mail.message',
+        domain=[
+            ['res_id', '=', partner_id],
+            ['model', '=', 'res.partner'],
+            ['date', '>=', start_datetime],
+            ['date', '<=', end_datetime],
+            ['message_type', 'in', ['comment', 'email']]  # Notes sont stockées comme comments
+        ],
+        fields=['date', 'body', 'author_id', 'message_type', 'subject'],
+        limit=100
+    )
+
+    messages = []
+    if messages_response.get('status') == 'success':
+        messages = messages_response.get('records', [])
+
+    # Récupérer les activités terminées (avec protection contre les erreurs)
+    activities = []
+    try:
+        activities_response = odoo_search(
+            model='mail.activity',
+            domain=[
+                ['res_id', '=', partner_id],
+                ['res_model', '=', 'res.partner'],
+                ['date_done', '>=', start_date],
+                ['date_done', '<=', end_date],
+                ['state', '=', 'done']
+            ],
+            fields=['summary', 'date_done', 'note'],
+            limit=50
+        )
+        if activities_response.get('status') == 'success':
+            activities = activities_response.get('records', [])
+        else:
+            # Log l'erreur mais continue sans activités
+            print(f"[WARNING] Could not fetch activities for partner {partner_id}: {activities_response.get('error', 'Unknown error')}")
     except Exception as e:
-        raise Exception(f"Error collecting top5 client activities: {str(e)}")
+        # Ne pas faire planter tout le rapport si les activités échouent
+        print(f"[WARNING] Exception while fetching activities for partner {partner_id}: {str(e)}")
+        activities = []
 
+    return {
+        'id': partner_id,
+        'name': partner_name,
+        'messages': messages,
+        'activities': activities
+    }
 
+
+@wrap_errors("collecting top clients data")
 def collect_top_clients_data(user_ids: List[int]):
     """MODIFIÉ pour supporter plusieurs utilisateurs"""
-    try:
-        return {
-            "top_1": get_top_contact(user_ids, CATEGORY_IDS["top_1"]),
-            "top_2": get_top_contact(user_ids, CATEGORY_IDS["top_2"]),
-            "top_3": get_top_contact(user_ids, CATEGORY_IDS["top_3"]),
-            "top_4": get_top_contact(user_ids, CATEGORY_IDS["top_4"]),
-            "top_5": get_top_contact(user_ids, CATEGORY_IDS["top_5"]),
-            "tip_top": get_tip_top_contacts(user_ids)
-        }
-
-    except Exception as e:
-        raise Exception(f"Error collecting top clients data: {str(e)}")
-
-
-def generate_report_html_table(report_data):
+    # TOP 1-5 en une recherche, TIP TOP à part : lancées en parallèle
+    results = run_concurrently({
+        "top": lambda: get_top_contacts_bulk(user_ids),
+        "tip_top": lambda: get_tip_top_contacts(user_ids)
+    })
+    for value in results.values():
+        if isinstance(value, Exception):
+            raise value
+    return {**results["top"], "tip_top": results["tip_top"]}
+
+
+def iter_report_html(report_data):
     """
-    Generate HTML table for business report in Odoo WYSIWYG format
-    REFACTORISÉ pour la nouvelle structure CA individuel + totaux
+    Yield the fragments of the business report HTML table, in order.
+
+    Consumed by generate_report_html_table, which joins them only once.
     """
-    try:
-        user_info = report_data.get('user_info', {})
-        revenue_data = report_data.get('revenue_data', {})
-        metrics_data = report_data.get('metrics_data', {})
-        top_clients_data = report_data.get('top_clients_data', {})
+    user_info = report_data.get('user_info', {})
+    revenue_data = report_data.get('revenue_data', {})
+    metrics_data = report_data.get('metrics_data', {})
+    top_clients_data = report_data.get('top_clients_data', {})
 
-        # Récupérer les noms d'utilisateurs pour affichage
-        user_ids = user_info.get('user_ids', [])
-        user_names = user_info.get('user_names', [])
-        user_name_map = dict(zip(user_ids, user_names))
+    # Récupérer les noms d'utilisateurs pour affichage
+    user_ids = user_info.get('user_ids', [])
+    user_names = user_info.get('user_names', [])
+    user_name_map = dict(zip(user_ids, user_names))
 
-        html = f"""
+    yield f"""
         <div class="container">
             <h2>Rapport Business - {
                 user_info.get('combined_user_name', 'N/A')
@@ -1827,42 +1812,46 @@ def generate_report_html_table(report_data):
                 <tbody>
         """
 
-        # Section CA - Format avec factures individuelles par société
-        invoiced_details_by_company = metrics_data.get('invoiced_details_by_company', {})
-        all_company_ids = metrics_data.get('all_company_ids', [])
-        trademark_details = revenue_data.get('trademark_details', {})
-
-        for key, value in revenue_data.items():
-            if key.startswith('ca_facture_') and 'commercial_' in key and not key.endswith('_trademarks'):
-                # Extraire société et user_id
-                parts = key.split('_')
-                company_name = parts[2].title()  # ca_facture_[company]_commercial_[id]
-                user_id = int(parts[-1])
-                user_name = user_name_map.get(user_id, f"User {user_id}")
+    # Section CA - Format avec factures individuelles par société
+    invoiced_details_by_company = metrics_data.get('invoiced_details_by_company', {})
+    all_company_ids = metrics_data.get('all_company_ids', [])
+    trademark_details = revenue_data.get('trademark_details', {})
+
+    for key, value in revenue_data.items():
+        if not key.startswith(REVENUE_KEY_PREFIX):
+            continue
+        # Partie société (+ commercial) de la clé, par tranche : le nom de société peut contenir des "_"
+        company_part = key[len(REVENUE_KEY_PREFIX):]
+
+        if REVENUE_USER_INFIX in company_part:
+            # Extraire société et user_id
+            company_key_lower, _, user_part = company_part.rpartition(REVENUE_USER_INFIX)
+            company_name = company_key_lower.title()
+            user_id = int(user_part)
+            user_name = user_name_map.get(user_id, f"User {user_id}")
 
-                label = (f"Chiffre d'affaires facturé HT {company_name} "
+            label = (f"Chiffre d'affaires facturé HT {company_name} "
                         f"- {user_name}")
-                style = ""
+            style = ""
 
-                html += f"""
+            yield f"""
                     <tr style="{style}">
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{format_currency(value)}</td>
+                        <td style="{CELL_STYLE}">{label}</td>
+                        <td style="{VALUE_CELL_STYLE}">{format_currency(value)}</td>
                     </tr>
                 """
 
-                # NOUVEAU: Ajouter les sous-lignes par marque commerciale
-                company_key_lower = company_name.lower().replace('é', 'e').replace(' ', '_')
-                trademark_key = f"ca_facture_{company_key_lower}_commercial_{user_id}_trademarks"
+            # NOUVEAU: Ajouter les sous-lignes par marque commerciale
+            trademark_key = f"ca_facture_{company_key_lower}_commercial_{user_id}_trademarks"
 
-                if trademark_key in trademark_details:
-                    trademarks = trademark_details[trademark_key]
-                    if trademarks:
-                        # Trier les marques par montant décroissant pour un meilleur affichage
-                        sorted_trademarks = sorted(trademarks.items(), key=lambda x: x[1], reverse=True)
+            if trademark_key in trademark_details:
+                trademarks = trademark_details[trademark_key]
+                if trademarks:
+                    # Trier les marques par montant décroissant pour un meilleur affichage
+                    sorted_trademarks = sorted(trademarks.items(), key=lambda x: x[1], reverse=True)
 
-                        for trademark_name, trademark_amount in sorted_trademarks:
-                            html += f"""
+                    for trademark_name, trademark_amount in sorted_trademarks:
+                        yield f"""
                                 <tr style="background-color: #f8f9fa;">
                                     <td style="border: 1px solid #dee2e6; padding: 10px; padding-left: 30px; font-size: 0.95em; color: #6c757d;">
                                         └─ {trademark_name}
@@ -1873,223 +1862,223 @@ def generate_report_html_table(report_data):
                                 </tr>
                             """
 
-                # Trouver le company_id correspondant au company_name
-                matching_company_id = None
-                for company_id in all_company_ids:
-                    if get_company_name(company_id) == company_name.lower().replace('é', 'e').replace(' ', '_'):
-                        matching_company_id = company_id
-                        break
-
-                # Ajouter la ligne de détails des factures pour cette société et cet utilisateur
-                if matching_company_id and matching_company_id in invoiced_details_by_company:
-                    invoices = invoiced_details_by_company[matching_company_id].get(user_id, [])
-                    if invoices:
-                        detail_label = f"Factures émises - {user_name}"
-                        invoices_list = "<br>".join([
-                            f"• <a href='{ODOO_URL}/web#id={invoice['invoice_id']}&model=account.move&view_type=form'>{invoice['invoice_name']}</a> "
+            # Trouver le company_id correspondant au company_name
+            matching_company_id = None
+            for company_id in all_company_ids:
+                if get_company_name(company_id) == company_key_lower:
+                    matching_company_id = company_id
+                    break
+
+            # Ajouter la ligne de détails des factures pour cette société et cet utilisateur
+            if matching_company_id and matching_company_id in invoiced_details_by_company:
+                invoices = invoiced_details_by_company[matching_company_id].get(user_id, [])
+                if invoices:
+                    detail_label = f"Factures émises - {user_name}"
+                    invoices_list = "<br>".join([
+                        f"• <a href='{ODOO_URL}/web#id={invoice['invoice_id']}&model=account.move&view_type=form'>{invoice['invoice_name']}</a> "
                             f"(<a href='{ODOO_URL}/web#id={invoice['partner_id']}&model=res.partner&view_type=form'>{invoice['partner_name']}</a>)"
-                            for invoice in invoices
-                        ])
+                        for invoice in invoices
+                    ])
 
-                        html += f"""
+                    yield f"""
                                 <tr>
-                                    <td style="border: 1px solid #dee2e6; padding: 10px;">{detail_label}</td>
-                                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;">{invoices_list}</td>
+                                    <td style="{CELL_STYLE}">{detail_label}</td>
+                                    <td style="{DETAILS_CELL_STYLE}">{invoices_list}</td>
                                 </tr>
                         """
 
-            elif key.startswith('ca_facture_') and key.endswith('_total'):
-                # Total par société
-                company_name = key.replace('ca_facture_', '').replace('_total', '').title()
-                label = f"Chiffre d'affaires Total facturé HT {company_name}"
-                style = "background-color: #e9ecef; font-weight: bold;"
+        elif company_part.endswith(REVENUE_TOTAL_SUFFIX):
+            # Total par société
+            company_name = company_part[:-len(REVENUE_TOTAL_SUFFIX)].title()
+            label = f"Chiffre d'affaires Total facturé HT {company_name}"
+            style = TOTAL_ROW_STYLE
 
-                html += f"""
+            yield f"""
                     <tr style="{style}">
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{format_currency(value)}</td>
+                        <td style="{CELL_STYLE}">{label}</td>
+                        <td style="{VALUE_CELL_STYLE}">{format_currency(value)}</td>
                     </tr>
                 """
 
-        # Section métriques AGRÉGÉES (celles qui restent combinées)
-        aggregated_labels = {
-            "passer_voir": "Passer Voir",
-            "rdv_realises": "Rendez-vous réalisés",
-            "livraisons": "Livraisons"
-        }
+    # Section métriques AGRÉGÉES (celles qui restent combinées)
+    aggregated_labels = {
+        "passer_voir": "Passer Voir",
+        "rdv_realises": "Rendez-vous réalisés",
+        "livraisons": "Livraisons"
+    }
 
-        delivered_clients_details = metrics_data.get('delivered_clients_details_individual', {})
+    delivered_clients_details = metrics_data.get('delivered_clients_details_individual', {})
 
-        for key, label in aggregated_labels.items():
-            value = metrics_data.get(key, 0)
-            html += f"""
+    for key, label in aggregated_labels.items():
+        value = metrics_data.get(key, 0)
+        yield f"""
                     <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{value}</td>
+                        <td style="{CELL_STYLE}">{label}</td>
+                        <td style="{VALUE_CELL_STYLE}">{value}</td>
                     </tr>
             """
 
-            # Ajouter les détails des livraisons effectuées après la ligne Livraisons
-            if key == "livraisons" and delivered_clients_details:
-                for user_id, deliveries in delivered_clients_details.items():
-                    if deliveries:
-                        user_name = user_name_map.get(user_id, f"User {user_id}")
-                        detail_label = f"Livraisons effectuées - {user_name}"
-                        deliveries_list = "<br>".join([
-                            f"• <a href='{ODOO_URL}/web#id={delivery['picking_id']}&model=stock.picking&view_type=form'>{delivery['picking_name']}</a> "
+        # Ajouter les détails des livraisons effectuées après la ligne Livraisons
+        if key == "livraisons" and delivered_clients_details:
+            for user_id, deliveries in delivered_clients_details.items():
+                if deliveries:
+                    user_name = user_name_map.get(user_id, f"User {user_id}")
+                    detail_label = f"Livraisons effectuées - {user_name}"
+                    deliveries_list = "<br>".join([
+                        f"• <a href='{ODOO_URL}/web#id={delivery['picking_id']}&model=stock.picking&view_type=form'>{delivery['picking_name']}</a> "
                             f"(<a href='{ODOO_URL}/web#id={delivery['partner_id']}&model=res.partner&view_type=form'>{delivery['partner_name']}</a>)"
-                            for delivery in deliveries
-                        ])
+                        for delivery in deliveries
+                    ])
 
-                        html += f"""
+                    yield f"""
                                 <tr>
-                                    <td style="border: 1px solid #dee2e6; padding: 10px;">{detail_label}</td>
-                                    <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;">{deliveries_list}</td>
+                                    <td style="{CELL_STYLE}">{detail_label}</td>
+                                    <td style="{DETAILS_CELL_STYLE}">{deliveries_list}</td>
                                 </tr>
                         """
 
-        # Section métriques INDIVIDUELLES avec détails
-        individual_metrics = {
-            "rdv_places_individual": ("Nombre de rendez-vous placés", None),
-            "nombre_commandes_individual": ("Nombre de commandes", "ordering_clients_details_individual"),
-            "recommandations_individual": (
-                "Nombre de recommandations",
-                "recommandations_details_individual"
-            ),
-            "nouveaux_clients_individual": (
-                "Nombre de nouveaux clients",
-                "nouveaux_clients_details_individual"
-            )
-        }
+    # Section métriques INDIVIDUELLES avec détails
+    individual_metrics = {
+        "rdv_places_individual": ("Nombre de rendez-vous placés", None),
+        "nombre_commandes_individual": ("Nombre de commandes", "ordering_clients_details_individual"),
+        "recommandations_individual": (
+            "Nombre de recommandations",
+            "recommandations_details_individual"
+        ),
+        "nouveaux_clients_individual": (
+            "Nombre de nouveaux clients",
+            "nouveaux_clients_details_individual"
+        )
+    }
 
-        for metric_key, (base_label, details_key) in individual_metrics.items():
-            individual_data = metrics_data.get(metric_key, {})
-            details_data = metrics_data.get(details_key, {}) if details_key else {}
+    for metric_key, (base_label, details_key) in individual_metrics.items():
+        individual_data = metrics_data.get(metric_key, {})
+        details_data = metrics_data.get(details_key, {}) if details_key else {}
 
-            if individual_data:
-                for user_id, count in individual_data.items():
-                    user_name = user_name_map.get(user_id, f"User {user_id}")
-                    label = f"{base_label} - {user_name}"
+        if individual_data:
+            for user_id, count in individual_data.items():
+                user_name = user_name_map.get(user_id, f"User {user_id}")
+                label = f"{base_label} - {user_name}"
 
-                    # Ligne avec le nombre
-                    html += f"""
+                # Ligne avec le nombre
+                yield f"""
                             <tr>
-                                <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                                <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{count}</td>
+                                <td style="{CELL_STYLE}">{label}</td>
+                                <td style="{VALUE_CELL_STYLE}">{count}</td>
                             </tr>
                     """
 
-                    # Ligne avec les détails (si applicable)
-                    if details_key and user_id in details_data:
-                        items = details_data[user_id]
-                        if items:
-                            # Déterminer le type de détails et formatter en conséquence
-                            if details_key == "recommandations_details_individual":
-                                detail_label = f"Contacts recommandés - {user_name}"
-                                items_list = "<br>".join([
-                                    f"• <a href='{ODOO_URL}/web#id={item['id']}&model=res.partner&view_type=form'>{item['name']}</a>"
-                                    for item in items
-                                ])
-                            elif details_key == "nouveaux_clients_details_individual":
-                                detail_label = f"Nouveaux clients - {user_name}"
-                                items_list = "<br>".join([
-                                    f"• <a href='{ODOO_URL}/web#id={item['id']}&model=res.partner&view_type=form'>{item['name']}</a>"
-                                    for item in items
-                                ])
-                            elif details_key == "ordering_clients_details_individual":
-                                detail_label = f"Commandes reçues - {user_name}"
-                                items_list = "<br>".join([
-                                    f"• <a href='{ODOO_URL}/web#id={item['order_id']}&model=sale.order&view_type=form'>{item['order_name']}</a> "
+                # Ligne avec les détails (si applicable)
+                if details_key and user_id in details_data:
+                    items = details_data[user_id]
+                    if items:
+                        # Déterminer le type de détails et formatter en conséquence
+                        if details_key == "recommandations_details_individual":
+                            detail_label = f"Contacts recommandés - {user_name}"
+                            items_list = "<br>".join([
+                                f"• <a href='{ODOO_URL}/web#id={item['id']}&model=res.partner&view_type=form'>{item['name']}</a>"
+                                for item in items
+                            ])
+                        elif details_key == "nouveaux_clients_details_individual":
+                            detail_label = f"Nouveaux clients - {user_name}"
+                            items_list = "<br>".join([
+                                f"• <a href='{ODOO_URL}/web#id={item['id']}&model=res.partner&view_type=form'>{item['name']}</a>"
+                                for item in items
+                            ])
+                        elif details_key == "ordering_clients_details_individual":
+                            detail_label = f"Commandes reçues - {user_name}"
+                            items_list = "<br>".join([
+                                f"• <a href='{ODOO_URL}/web#id={item['order_id']}&model=sale.order&view_type=form'>{item['order_name']}</a> "
                                     f"(<a href='{ODOO_URL}/web#id={item['partner_id']}&model=res.partner&view_type=form'>{item['partner_name']}</a>)"
-                                    for item in items
-                                ])
-                            else:
-                                # Fallback pour d'autres types
-                                detail_label = f"Détails - {user_name}"
-                                items_list = "<br>".join([f"• {item}" for item in items])
-
-                            html += f"""
+                                for item in items
+                            ])
+                        else:
+                            # Fallback pour d'autres types
+                            detail_label = f"Détails - {user_name}"
+                            items_list = "<br>".join([f"• {item}" for item in items])
+
+                        yield f"""
                                     <tr>
-                                        <td style="border: 1px solid #dee2e6; padding: 10px;">{detail_label}</td>
-                                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: left; font-size: 0.9em;">{items_list}</td>
+                                        <td style="{CELL_STYLE}">{detail_label}</td>
+                                        <td style="{DETAILS_CELL_STYLE}">{items_list}</td>
                                     </tr>
                             """
 
-        # Section relances impayées - Afficher d'abord le total agrégé si plusieurs utilisateurs
-        relances_impayees_total = metrics_data.get('relances_impayees_total', 0)
-        relances_impayees_individual = metrics_data.get('relances_impayees_individual', {})
+    # Section relances impayées - Afficher d'abord le total agrégé si plusieurs utilisateurs
+    relances_impayees_total = metrics_data.get('relances_impayees_total', 0)
+    relances_impayees_individual = metrics_data.get('relances_impayees_individual', {})
 
-        # Si plusieurs utilisateurs, afficher d'abord le total
-        if len(user_ids) > 1:
-            html += f"""
+    # Si plusieurs utilisateurs, afficher d'abord le total
+    if len(user_ids) > 1:
+        yield f"""
                     <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">Nombre de relances impayés faites (Total)</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{relances_impayees_total}</td>
+                        <td style="{CELL_STYLE}">Nombre de relances impayés faites (Total)</td>
+                        <td style="{VALUE_CELL_STYLE}">{relances_impayees_total}</td>
                     </tr>
             """
 
-        # Afficher les détails par utilisateur
-        for user_id, count in relances_impayees_individual.items():
-            user_name = user_name_map.get(user_id, f"User {user_id}")
-            label = f"Nombre de relances impayés faites - {user_name}"
+    # Afficher les détails par utilisateur
+    for user_id, count in relances_impayees_individual.items():
+        user_name = user_name_map.get(user_id, f"User {user_id}")
+        label = f"Nombre de relances impayés faites - {user_name}"
 
-            html += f"""
+        yield f"""
                     <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{count}</td>
+                        <td style="{CELL_STYLE}">{label}</td>
+                        <td style="{VALUE_CELL_STYLE}">{count}</td>
                     </tr>
             """
 
-        # Section ligne vide pour saisie manuelle (paiements récupérés)
-        html += f"""
+    # Section ligne vide pour saisie manuelle (paiements récupérés)
+    yield f"""
                 <tr style="background-color: #fff3cd;">
-                    <td style="border: 1px solid #dee2e6; padding: 10px;">Nombre de paiements récupérés</td>
+                    <td style="{CELL_STYLE}">Nombre de paiements récupérés</td>
                     <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right; font-style: italic; color: #6c757d;">À remplir</td>
                 </tr>
         """
 
-        # Section Top clients avec résumés AI
-        top5_summaries = report_data.get('top5_summaries', {})
-
-        top_labels = {
-            "top_1": "Top 1",
-            "top_2": "Top 2",
-            "top_3": "Top 3",
-            "top_4": "Top 4",
-            "top_5": "Top 5",
-            "tip_top": "Tip Top"
-        }
-
-        for key, label in top_labels.items():
-            value = top_clients_data.get(key)
-
-            # Affichage du nom du client avec lien hypertexte
-            if key == "tip_top" and isinstance(value, list):
-                display_value = ", ".join(value) if value else "Aucun"
-            elif isinstance(value, dict):
-                # Nouveau format: dict avec 'id' et 'name' - créer un lien
-                if value and value.get('id'):
-                    partner_id = value['id']
-                    partner_name = value.get('name', 'Sans nom')
-                    display_value = f"<a href='{ODOO_URL}/web#id={partner_id}&model=res.partner&view_type=form' style='color: #28a745; text-decoration: none;'>{partner_name}</a>"
-                else:
-                    display_value = "Aucun"
+    # Section Top clients avec résumés AI
+    top5_summaries = report_data.get('top5_summaries', {})
+
+    top_labels = {
+        "top_1": "Top 1",
+        "top_2": "Top 2",
+        "top_3": "Top 3",
+        "top_4": "Top 4",
+        "top_5": "Top 5",
+        "tip_top": "Tip Top"
+    }
+
+    for key, label in top_labels.items():
+        value = top_clients_data.get(key)
+
+        # Affichage du nom du client avec lien hypertexte
+        if key == "tip_top" and isinstance(value, list):
+            display_value = ", ".join(value) if value else "Aucun"
+        elif isinstance(value, dict):
+            # Nouveau format: dict avec 'id' et 'name' - créer un lien
+            if value and value.get('id'):
+                partner_id = value['id']
+                partner_name = value.get('name', 'Sans nom')
+                display_value = f"<a href='{ODOO_URL}/web#id={partner_id}&model=res.partner&view_type=form' style='color: #28a745; text-decoration: none;'>{partner_name}</a>"
             else:
-                # Ancien format (string) ou None
-                display_value = value if value else "Aucun"
+                display_value = "Aucun"
+        else:
+            # Ancien format (string) ou None
+            display_value = value if value else "Aucun"
 
-            html += f"""
+        yield f"""
                     <tr>
-                        <td style="border: 1px solid #dee2e6; padding: 10px;">{label}</td>
-                        <td style="border: 1px solid #dee2e6; padding: 10px; text-align: right;">{display_value}</td>
+                        <td style="{CELL_STYLE}">{label}</td>
+                        <td style="{VALUE_CELL_STYLE}">{display_value}</td>
                     </tr>
             """
 
-            # Afficher le résumé AI juste après pour les Top 1-5 (pas Tip Top)
-            if key in ['top_1', 'top_2', 'top_3', 'top_4', 'top_5']:
-                summary = top5_summaries.get(key, '')
-                if summary:
-                    html += f"""
+        # Afficher le résumé AI juste après pour les Top 1-5 (pas Tip Top)
+        if key in ['top_1', 'top_2', 'top_3', 'top_4', 'top_5']:
+            summary = top5_summaries.get(key, '')
+            if summary:
+                yield f"""
                     <tr>
                         <td colspan="2" style="border: 1px solid #dee2e6; padding: 10px; background-color: #f8f9fa; font-style: italic;">
                             <strong>Actions menées:</strong><br>
@@ -2098,13 +2087,20 @@ def generate_report_html_table(report_data):
                     </tr>
                     """
 
-        html += """
+    yield """
                 </tbody>
             </table>
         </div>
         """
 
-        return html
+
+def generate_report_html_table(report_data):
+    """
+    Generate HTML table for business report in Odoo WYSIWYG format
+    REFACTORISÉ pour la nouvelle structure CA individuel + totaux
+    """
+    try:
+        return "".join(iter_report_html(report_data))
 
     except Exception as e:
         raise Exception(f"Error generating HTML table: {str(e)}")
@@ -2139,17 +2135,16 @@ def create_report_task(report_data, project_id, task_column_id):
 
         # Ajouter les assignés seulement s'il y en a
         if user_ids:
-            # Assigner à tous les utilisateurs du rapport
-            task_data['user_ids'] = [(4, uid) for uid in user_ids if uid is not None]
+            # Assigner à tous les utilisateurs du rapport, en une seule commande (6, 0, ids)
+            # plutôt qu'un lien (4, id) par utilisateur
+            task_data['user_ids'] = [(6, 0, [uid for uid in user_ids if uid is not None])]
 
         # Create task using odoo_execute
-        result = odoo_execute(
+        response = odoo_execute(
             model='project.task',
             method='create',
             args=[task_data]
         )
-
-        response = json.loads(result)
         if response.get('status') == 'success':
             task_id = response.get('result')
             return task_id
@@ -4,11 +4,17 @@ Data tools module.
 Contains MCP tools for searching and executing operations on Odoo data.
 """
 
-import json
 import datetime
+import orjson
 from typing import List, Any, Dict, Optional
-from config import ODOO_DB, ODOO_PASSWORD, SECURITY_BLACKLIST
-from services.odoo_client import get_odoo_connection
+from config import SECURITY_BLACKLIST
+from services.odoo_client import (
+    execute_kw,
+    execute_kw_multi,
+    invalidate_model_cache,
+    is_unknown_model_fault,
+    model_exists
+)
 
 
 # The mcp instance will be injected by the main module
@@ -49,77 +55,97 @@ def odoo_search(
     """
     try:
         print(f"[🔥 RESTORED d2c0a1d] odoo_search called with model={model}, domain={domain}")
+        # JSON compact (orjson) : plus rapide et plus léger que json.dumps(indent=2)
+        return orjson.dumps(odoo_search_raw(model, domain, fields, limit, offset, order)).decode()
+    except Exception as e:
+        return orjson.dumps({"error": f"Error searching: {str(e)}"}).decode()
 
-        models, uid = get_odoo_connection()
-
-        # Validate and set defaults
-        if domain is None:
-            domain = []
-        if limit > 100000:
-            limit = 100000  # Cap at 100,000 for performance
-
-        # First, check if the model exists
-        model_exists = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'ir.model', 'search_count',
-            [[('model', '=', model)]]
-        )
-        
-        if not model_exists:
-            return json.dumps({
-                "status": "error",
-                "message": f"Model '{model}' not found"
-            })
-        
-        # Prepare search parameters
-        search_params = {
-            'limit': limit,
-            'offset': offset
-        }
-        
-        if fields:
-            search_params['fields'] = fields
-        
-        if order:
-            search_params['order'] = order
-        
-        # Execute search
-        records = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            model, 'search_read',
-            [domain],
-            search_params
-        )
-        
-        # Get total count for pagination info
-        total_count = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            model, 'search_count',
-            [domain]
-        )
-        
-        result = {
-            "status": "success",
-            "model": model,
-            "total_count": total_count,
-            "returned_count": len(records),
-            "offset": offset,
-            "limit": limit,
-            "domain": domain,
-            "records": records
+
+def odoo_search_raw(
+    model: str,
+    domain: Optional[List[Any]] = None,
+    fields: Optional[List[str]] = None,
+    limit: int = 10,
+    offset: int = 0,
+    order: Optional[str] = None,
+    check_model: bool = True
+) -> Dict[str, Any]:
+    """
+    Search records and return the odoo_search result as a dict (not serialized).
+
+    The search_read and the pagination count are sent as one system.multicall
+    batch (sequential calls if the server does not support it).
+
+    Args:
+        Same as odoo_search, plus:
+        check_model: Check that the model exists first (against the cached
+            ir.model names). Internal callers that use known model names pass
+            False to skip it.
+
+    Returns:
+        Dict with the search results, or a status "error" dict if the model
+        does not exist
+
+    Raises:
+        Exception on RPC errors
+    """
+    # Validate and set defaults
+    if domain is None:
+        domain = []
+    if limit > 100000:
+        limit = 100000  # Cap at 100,000 for performance
+
+    # Prepare search parameters
+    search_params = {
+        'limit': limit,
+        'offset': offset
+    }
+
+    if fields:
+        search_params['fields'] = fields
+
+    if order:
+        search_params['order'] = order
+
+    if check_model and not model_exists(model):
+        return {
+            "status": "error",
+            "message": f"Model '{model}' not found"
         }
-        
-        # Add pagination info if needed
-        if total_count > limit + offset:
-            result["has_more"] = True
-            result["next_offset"] = offset + limit
-        else:
-            result["has_more"] = False
-        
-        return json.dumps(result, indent=2)
-        
-    except Exception as e:
-        return json.dumps({"error": f"Error searching: {str(e)}"})
+
+    results = execute_kw_multi([
+        (model, 'search_read', [domain], search_params),
+        # Total count for pagination info
+        (model, 'search_count', [domain], {})
+    ])
+
+    records, total_count = results
+    for reply in results:
+        if isinstance(reply, Exception):
+            if is_unknown_model_fault(reply):
+                # Model uninstalled since the names were cached
+                invalidate_model_cache()
+            raise reply
+
+    result = {
+        "status": "success",
+        "model": model,
+        "total_count": total_count,
+        "returned_count": len(records),
+        "offset": offset,
+        "limit": limit,
+        "domain": domain,
+        "records": records
+    }
+
+    # Add pagination info if needed
+    if total_count > limit + offset:
+        result["has_more"] = True
+        result["next_offset"] = offset + limit
+    else:
+        result["has_more"] = False
+
+    return result
 
 
 def odoo_execute(
@@ -140,43 +166,68 @@ def odoo_execute(
     Returns:
         JSON string with execution results
     """
+    # Security check, before touching args/kwargs or the connection
+    if (model, method) in SECURITY_BLACKLIST:
+        return orjson.dumps({
+            "status": "error",
+            "message": f"Operation '{method}' on model '{model}' is not allowed for security reasons"
+        }).decode()
+
     try:
-        # Security check
-        if (model, method) in SECURITY_BLACKLIST:
-            return json.dumps({
-                "status": "error",
-                "message": f"Operation '{method}' on model '{model}' is not allowed for security reasons"
-            })
-        
-        # Validate dangerous operations
-        if method in ['unlink', 'button_immediate_uninstall'] and model not in ['sale.order', 'purchase.order', 'stock.picking']:
-            return json.dumps({
-                "status": "warning",
-                "message": f"Method '{method}' is restricted. Please use with caution."
-            })
-        
-        models, uid = get_odoo_connection()
-        
-        # Default args and kwargs if not provided
-        if args is None:
-            args = []
-        if kwargs is None:
-            kwargs = {}
-        
-        result = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            model, method,
-            args,
-            kwargs
-        )
-        
-        return json.dumps({
-            "status": "success",
-            "model": model,
-            "method": method,
-            "result": result,
-            "timestamp": datetime.datetime.now().isoformat()
-        }, indent=2)
-        
+        return orjson.dumps(odoo_execute_raw(model, method, args, kwargs)).decode()
     except Exception as e:
-        return json.dumps({"error": f"Error executing method: {str(e)}"})
+        return orjson.dumps({"error": f"Error executing method: {str(e)}"}).decode()
+
+
+def odoo_execute_raw(
+    model: str,
+    method: str,
+    args: Optional[List[Any]] = None,
+    kwargs: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Execute a method and return the odoo_execute result as a dict (not serialized).
+
+    Args:
+        Same as odoo_execute
+
+    Returns:
+        Dict with the execution result, or a status "error"/"warning" dict for
+        blacklisted/restricted methods
+
+    Raises:
+        Exception on RPC errors
+    """
+    # Security check (also done by odoo_execute, kept here for internal callers)
+    if (model, method) in SECURITY_BLACKLIST:
+        return {
+            "status": "error",
+            "message": f"Operation '{method}' on model '{model}' is not allowed for security reasons"
+        }
+
+    # Validate dangerous operations
+    if method in ['unlink', 'button_immediate_uninstall'] and model not in ['sale.order', 'purchase.order', 'stock.picking']:
+        return {
+            "status": "warning",
+            "message": f"Method '{method}' is restricted. Please use with caution."
+        }
+
+    # Default args and kwargs if not provided
+    if args is None:
+        args = []
+    if kwargs is None:
+        kwargs = {}
+
+    result = execute_kw(
+        model, method,
+        args,
+        kwargs
+    )
+
+    return {
+        "status": "success",
+        "model": model,
+        "method": method,
+        "result": result,
+        "timestamp": datetime.datetime.now()
+    }
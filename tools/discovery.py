@@ -4,19 +4,41 @@ Discovery tools module.
 Contains MCP tools for server health checks and Odoo model discovery.
 """
 
-import json
 import datetime
 import time
 import socket
-import xmlrpc.client
-from typing import List, Any
-from config import ODOO_URL, ODOO_DB, ODOO_USER, ODOO_PASSWORD
-from services.odoo_client import get_odoo_connection, create_server_proxy
+import orjson
+from config import ODOO_URL, TIMEOUT
+from services.cache import TTLCache
+from services.odoo_client import (
+    execute_kw,
+    execute_kw_multi,
+    get_common_proxy,
+    get_uid,
+    invalidate_model_cache,
+    invalidate_odoo_connection,
+    model_exists,
+    run_concurrently
+)
 
 
 # The mcp instance will be injected by the main module
 mcp = None
 
+# Réponse de ping pré-sérialisée (même JSON compact que orjson.dumps) : seul le timestamp change
+_PING_PREFIX = '{"status":"ok","message":"Oui le serveur marche","timestamp":"'
+_PING_SUFFIX = '","server":"Odoo MCP Server"}'
+
+# Comptages du health check peu volatils, réutilisés pendant COUNT_CACHE_TTL secondes
+COUNT_CACHE_TTL = 60
+CACHED_COUNT_MODELS = ('res.users', 'ir.model')
+_count_cache = TTLCache(COUNT_CACHE_TTL)  # {model: count}
+
+# Définitions de champs (ir.model.fields) par modèle : changent rarement
+FIELDS_CACHE_TTL = 3600
+FIELDS_CACHE_MAXSIZE = 256
+_fields_cache = TTLCache(FIELDS_CACHE_TTL, FIELDS_CACHE_MAXSIZE)  # {model_name: fields}
+
 
 def init_mcp(mcp_instance):
     """Initialize the mcp instance for this module"""
@@ -26,6 +48,8 @@ def init_mcp(mcp_instance):
     # Register all tools
     mcp.tool()(ping)
     mcp.tool()(odoo_health_check)
+    mcp.tool()(invalidate_auth_cache)
+    mcp.tool()(invalidate_fields_cache)
     mcp.tool()(odoo_discover_models)
     mcp.tool()(odoo_get_model_fields)
 
@@ -38,15 +62,9 @@ def ping() -> str:
         JSON string confirming the server is working
     """
     try:
-        response = {
-            "status": "ok",
-            "message": "Oui le serveur marche",
-            "timestamp": datetime.datetime.now().isoformat(),
-            "server": "Odoo MCP Server"
-        }
-        return json.dumps(response, indent=2)
+        return f'{_PING_PREFIX}{datetime.datetime.now().isoformat()}{_PING_SUFFIX}'
     except Exception as e:
-        return json.dumps({"error": f"An error occurred: {str(e)}"})
+        return orjson.dumps({"error": f"An error occurred: {str(e)}"}).decode()
 
 
 def odoo_health_check() -> str:
@@ -62,104 +80,168 @@ def odoo_health_check() -> str:
     Returns:
         JSON string with detailed health check report
     """
+    # Un seul horodatage pour toutes les branches de retour
+    ts = datetime.datetime.now()
     try:
-        result = "Odoo Health Check Report\n" + "="*30 + "\n\n"
+        # Rapport construit par morceaux, joint une seule fois à la fin
+        parts = ["Odoo Health Check Report\n" + "="*30 + "\n\n"]
+        statuses = set()
         
+        # Tests 1 et 2 lancés en parallèle (version et authentification sont indépendants)
+        # Proxies partagés : les appels réutilisent les connexions keep-alive du pool
+        common = get_common_proxy()
+        probes = run_concurrently({
+            "version": common.version,
+            "uid": get_uid
+        })
+
         # Test 1: Basic connection
         try:
-            result += "1. Connection Test: "
-            common = create_server_proxy(f'{ODOO_URL}/xmlrpc/2/common')
-            version = common.version()
-            result += f"✓ OK (Odoo {version.get('server_version', 'Unknown')})\n"
+            parts.append("1. Connection Test: ")
+            version = probes["version"]
+            if isinstance(version, Exception):
+                raise version
+            parts.append(f"✓ OK (Odoo {version.get('server_version', 'Unknown')})\n")
         except socket.timeout:
-            result += f"✗ FAILED - Timeout after {TIMEOUT}s\n"
-            result += f"   → Check if Odoo is running at {ODOO_URL}\n"
-            return json.dumps({"status": "error", "report": result})
+            parts.append(f"✗ FAILED - Timeout after {TIMEOUT}s\n")
+            parts.append(f"   → Check if Odoo is running at {ODOO_URL}\n")
+            return orjson.dumps({"status": "error", "report": "".join(parts), "timestamp": ts}).decode()
         except Exception as e:
-            result += f"✗ FAILED - {str(e)}\n"
-            return json.dumps({"status": "error", "report": result})
+            parts.append(f"✗ FAILED - {str(e)}\n")
+            return orjson.dumps({"status": "error", "report": "".join(parts), "timestamp": ts}).decode()
         
-        # Test 2: Authentication
+        # Test 2: Authentication (uid mis en cache : authentifie seulement si le cache est froid)
         try:
-            result += "2. Authentication Test: "
-            uid = common.authenticate(ODOO_DB, ODOO_USER, ODOO_PASSWORD, {})
-            if uid:
-                result += f"✓ OK (UID: {uid})\n"
-            else:
-                result += "✗ FAILED - Invalid credentials\n"
-                return json.dumps({"status": "error", "report": result})
+            parts.append("2. Authentication Test: ")
+            uid = probes["uid"]
+            if isinstance(uid, Exception):
+                raise uid
+            parts.append(f"✓ OK (UID: {uid})\n")
         except Exception as e:
-            result += f"✗ FAILED - {str(e)}\n"
-            return json.dumps({"status": "error", "report": result})
+            parts.append(f"✗ FAILED - {str(e)}\n")
+            return orjson.dumps({"status": "error", "report": "".join(parts), "timestamp": ts}).decode()
         
         # Test 3: Database access
+        core_models = ['res.partner', 'res.users', 'ir.model']
         try:
-            result += "3. Database Access Test: "
-            models = create_server_proxy(f'{ODOO_URL}/xmlrpc/2/object')
+            parts.append("3. Database Access Test: ")
+            # ir.model / res.users bougent rarement : comptages repris du cache s'ils sont récents
+            counts = {}
+            for model in CACHED_COUNT_MODELS:
+                count = _count_cache.get(model)
+                if count is not None:
+                    counts[model] = count
+            live_models = [model for model in core_models if model not in counts]
+            
+            # Test core models (un seul aller-retour via system.multicall si disponible)
+            live_counts = execute_kw_multi([
+                (model, 'search_count', [[]], {}) for model in live_models
+            ])
             
-            # Test core models
-            core_models = ['res.partner', 'res.users', 'ir.model']
-            failed_models = []
+            for model, count in zip(live_models, live_counts):
+                counts[model] = count
+                if model in CACHED_COUNT_MODELS and not isinstance(count, Exception):
+                    _count_cache.set(model, count)
             
-            for model in core_models:
-                try:
-                    count = models.execute_kw(
-                        ODOO_DB, uid, ODOO_PASSWORD,
-                        model, 'search_count',
-                        [[]],
-                        {}
-                    )
-                except:
-                    failed_models.append(model)
+            # Toute erreur renvoyée à la place d'un comptage est un échec (type retenu, pas de message)
+            failed_models = [
+                (model, type(counts[model]).__name__)
+                for model in core_models
+                if isinstance(counts[model], Exception)
+            ]
             
             if not failed_models:
-                result += "✓ OK (Core models accessible)\n"
+                parts.append("✓ OK (Core models accessible)\n")
             else:
-                result += f"✗ PARTIAL - Failed models: {', '.join(failed_models)}\n"
+                failed = ', '.join(f"{model} ({error_type})" for model, error_type in failed_models)
+                parts.append(f"✗ PARTIAL - Failed models: {failed}\n")
         except Exception as e:
-            result += f"✗ FAILED - {str(e)}\n"
-            return json.dumps({"status": "error", "report": result})
+            parts.append(f"✗ FAILED - {str(e)}\n")
+            return orjson.dumps({"status": "error", "report": "".join(parts), "timestamp": ts}).decode()
         
-        # Test 4: Performance check
+        # Test 4: Performance check (un seul appel chronométré, hors multicall et hors cache)
         try:
-            result += "4. Performance Test: "
-            start = time.time()
-            models.execute_kw(
-                ODOO_DB, uid, ODOO_PASSWORD,
-                'res.partner', 'search_count',
-                [[]],
-                {}
-            )
-            elapsed = time.time() - start
+            parts.append("4. Performance Test: ")
+            start = time.perf_counter()
+            execute_kw('res.partner', 'search_count', [[]], {})
+            elapsed = time.perf_counter() - start
             if elapsed < 1:
-                result += f"✓ OK ({elapsed:.2f}s)\n"
+                parts.append(f"✓ OK ({elapsed:.2f}s)\n")
             elif elapsed < 5:
-                result += f"⚠ SLOW ({elapsed:.2f}s)\n"
+                parts.append(f"⚠ SLOW ({elapsed:.2f}s)\n")
+                statuses.add("warn")
             else:
-                result += f"✗ VERY SLOW ({elapsed:.2f}s)\n"
+                parts.append(f"✗ VERY SLOW ({elapsed:.2f}s)\n")
         except Exception as e:
-            result += f"✗ FAILED - {str(e)}\n"
+            parts.append(f"✗ FAILED - {str(e)}\n")
+            statuses.add("fail")
         
         # Summary
-        result += "\nSummary: "
-        if "✗ FAILED" in result:
-            result += "❌ System has issues - check failed tests above"
+        parts.append("\nSummary: ")
+        if "fail" in statuses:
+            parts.append("❌ System has issues - check failed tests above")
             status = "error"
-        elif "⚠" in result:
-            result += "⚠️ System operational with warnings"
+        elif "warn" in statuses:
+            parts.append("⚠️ System operational with warnings")
             status = "warning"
         else:
-            result += "✅ All systems operational"
+            parts.append("✅ All systems operational")
             status = "success"
         
-        return json.dumps({
+        return orjson.dumps({
             "status": status,
-            "report": result,
-            "timestamp": datetime.datetime.now().isoformat()
-        }, indent=2)
+            "report": "".join(parts),
+            "timestamp": ts
+        }).decode()
         
     except Exception as e:
-        return json.dumps({"error": f"Health check failed: {str(e)}"})
+        return orjson.dumps({"error": f"Health check failed: {str(e)}", "timestamp": ts}).decode()
+
+
+def invalidate_auth_cache() -> str:
+    """
+    Forget the cached Odoo authentication so that the next call re-authenticates.
+    Useful after changing the Odoo user's password or access rights.
+
+    Returns:
+        JSON string confirming the cache was cleared
+    """
+    try:
+        invalidate_odoo_connection()
+        return orjson.dumps({
+            "status": "success",
+            "message": "Authentication cache cleared",
+            "timestamp": datetime.datetime.now()
+        }).decode()
+    except Exception as e:
+        return orjson.dumps({"error": f"Error clearing authentication cache: {str(e)}"}).decode()
+
+
+def invalidate_fields_cache(model_name: str = "") -> str:
+    """
+    Forget cached model field definitions, e.g. after adding a custom field or
+    installing a module.
+
+    Args:
+        model_name: Technical name of the model to refresh (e.g., 'res.partner').
+            If empty, all cached fields and the list of installed models are cleared.
+
+    Returns:
+        JSON string confirming the cache was cleared
+    """
+    try:
+        if model_name:
+            _fields_cache.pop(model_name)
+        else:
+            _fields_cache.clear()
+            invalidate_model_cache()
+        return orjson.dumps({
+            "status": "success",
+            "message": f"Fields cache cleared for {model_name if model_name else 'all models'}",
+            "timestamp": datetime.datetime.now()
+        }).decode()
+    except Exception as e:
+        return orjson.dumps({"error": f"Error clearing fields cache: {str(e)}"}).decode()
 
 
 def odoo_discover_models(search_term: str = "") -> str:
@@ -173,44 +255,70 @@ def odoo_discover_models(search_term: str = "") -> str:
         JSON string with discovered models information
     """
     try:
-        models, uid = get_odoo_connection()
         domain = []
         if search_term:
             domain = ['|', ('name', 'ilike', search_term), ('info', 'ilike', search_term)]
         
-        ir_models = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
+        ir_models = execute_kw(
             'ir.model', 'search_read',
             [domain],
-            {'fields': ['name', 'model', 'info'], 'limit': 50, 'order': 'name'}
+            {
+                'fields': ['name', 'model', 'info'],
+                'limit': 50,
+                'order': 'name',
+                # Langue fixe : évite de dépendre de la langue de l'utilisateur Odoo
+                'context': {'lang': 'en_US'}
+            }
         )
         
         if not ir_models:
-            return json.dumps({
+            return orjson.dumps({
                 "status": "success",
                 "message": f"No models found matching '{search_term}'",
                 "models": []
-            })
+            }).decode()
         
         result = {
             "status": "success",
             "total_found": len(ir_models),
             "search_term": search_term if search_term else "all models",
-            "models": []
+            # info vaut False quand elle est vide côté Odoo
+            "models": [
+                {
+                    "model": model['model'],
+                    "name": model['name'],
+                    "description": model.get('info') or 'No description'
+                }
+                for model in ir_models
+            ]
         }
         
-        for model in ir_models:
-            model_info = {
-                "model": model['model'],
-                "name": model['name'],
-                "description": model.get('info', 'No description')
-            }
-            result["models"].append(model_info)
-        
-        return json.dumps(result, indent=2)
+        return orjson.dumps(result).decode()
         
     except Exception as e:
-        return json.dumps({"error": f"Error discovering models: {str(e)}"})
+        return orjson.dumps({"error": f"Error discovering models: {str(e)}"}).decode()
+
+
+def _field_info(field: dict) -> dict:
+    """Build the description of one ir.model.fields record"""
+    field_info = {
+        "name": field['name'],
+        "label": field.get('field_description', 'N/A'),
+        "type": field['ttype'],
+        "required": bool(field.get('required')),
+        "readonly": bool(field.get('readonly'))
+    }
+    
+    relation = field.get('relation')
+    if relation:
+        field_info["relation"] = relation
+        if field.get('relation_field'):
+            field_info["relation_field"] = field['relation_field']
+    
+    if field.get('help'):
+        field_info["help"] = field['help']
+    
+    return field_info
 
 
 def odoo_get_model_fields(model_name: str) -> str:
@@ -224,69 +332,43 @@ def odoo_get_model_fields(model_name: str) -> str:
         JSON string with model fields information
     """
     try:
-        models, uid = get_odoo_connection()
-        
-        # First check if model exists
-        model_exists = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'ir.model', 'search_count',
-            [[['model', '=', model_name]]],
-            {}
-        )
-        
-        if not model_exists:
-            return json.dumps({
+        # First check if model exists (cached ir.model names)
+        if not model_exists(model_name):
+            return orjson.dumps({
                 "status": "error",
                 "message": f"Model '{model_name}' not found"
-            })
+            }).decode()
         
-        # Get all fields for the model
-        fields = models.execute_kw(
-            ODOO_DB, uid, ODOO_PASSWORD,
-            'ir.model.fields', 'search_read',
-            [[('model', '=', model_name)]],
-            {
-                'fields': ['name', 'field_description', 'ttype', 'required', 
-                          'readonly', 'relation', 'relation_field', 'help'],
-                'order': 'name'
-            }
-        )
+        # Get all fields for the model (served from the cache when fresh)
+        fields = _fields_cache.get(model_name)
+        if fields is None:
+            fields = execute_kw(
+                'ir.model.fields', 'search_read',
+                [[('model', '=', model_name)]],
+                {
+                    'fields': ['name', 'field_description', 'ttype', 'required', 
+                              'readonly', 'relation', 'relation_field', 'help'],
+                    'order': 'name'
+                }
+            )
+            _fields_cache.set(model_name, fields)
         
         if not fields:
-            return json.dumps({
+            return orjson.dumps({
                 "status": "success",
                 "message": f"No fields found for model '{model_name}'",
                 "model": model_name,
                 "fields": []
-            })
+            }).decode()
         
         result = {
             "status": "success",
             "model": model_name,
             "total_fields": len(fields),
-            "fields": []
+            "fields": [_field_info(field) for field in fields]
         }
         
-        for field in fields:
-            field_info = {
-                "name": field['name'],
-                "label": field.get('field_description', 'N/A'),
-                "type": field['ttype'],
-                "required": bool(field.get('required')),
-                "readonly": bool(field.get('readonly'))
-            }
-            
-            if field.get('relation'):
-                field_info["relation"] = field['relation']
-                if field.get('relation_field'):
-                    field_info["relation_field"] = field['relation_field']
-            
-            if field.get('help'):
-                field_info["help"] = field['help']
-            
-            result["fields"].append(field_info)
-        
-        return json.dumps(result, indent=2)
+        return orjson.dumps(result).decode()
         
     except Exception as e:
-        return json.dumps({"error": f"Error getting model fields: {str(e)}"})
+        return orjson.dumps({"error": f"Error getting model fields: {str(e)}"}).decode()